@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compare screenshot throughput of the capture backends against a fake grim.
+
+The fake grim from tests/stubs.py serves a canned PNG-sized payload, either to
+the requested file or to stdout (`grim -`), so this runs without Wayland.
+
+Usage:
+    python benchmarks/bench_capture.py
+    python benchmarks/bench_capture.py --frames 200 --size-mb 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
+
+from stubs import make_fake_grim
+
+from screenclicker.screen import GrimPipeBackend, GrimTempFileBackend
+
+def bench(backend, frames, geometry="0,0 1920x1200"):
+    """Capture frames through backend and return frames/sec."""
+    backend.capture(geometry)  # Warm up page cache
+    start = time.perf_counter()
+    for _ in range(frames):
+        backend.capture(geometry)
+    elapsed = time.perf_counter() - start
+    return frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture backends")
+    parser.add_argument("--frames", type=int, default=100, help="Frames per backend (default: 100)")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Fake frame size in MB (default: 4)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        frame = b'\x89PNG\r\n\x1a\n' + os.urandom(int(args.size_mb * 1024 * 1024))
+        grim_path = make_fake_grim(directory, {'png': frame})
+
+        print(f"Fake frame: {args.size_mb} MB, {args.frames} frames per backend")
+        results = {}
+        for backend in (GrimTempFileBackend(grim_path), GrimPipeBackend(grim_path)):
+            results[backend.name] = bench(backend, args.frames)
+            print(f"  {backend.name:<16} {results[backend.name]:8.1f} frames/sec")
+
+        speedup = results['grim-pipe'] / results['grim-tempfile']
+        print(f"Speedup (pipe vs tempfile): {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
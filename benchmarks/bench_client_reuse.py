@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Measure the per-call cost of building a fresh OllamaClient versus reusing
+the shared client from get_client().
+
+A fresh client means a new httpx.Client and a new TCP connection for
+every request; the shared client keeps the connection alive. By default
+requests go to the in-process StubOllama from tests/stubs.py, which answers
+/api/chat instantly, so the numbers are pure client/connection overhead.
+Pass --host to measure against a real Ollama server (uses /api/tags).
+
+Usage:
+    python benchmarks/bench_client_reuse.py
+    python benchmarks/bench_client_reuse.py --calls 500 --threads 4
+    python benchmarks/bench_client_reuse.py --host http://localhost:11434
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
+
+from stubs import StubOllama
+
+from screenclicker.ollama_client import OllamaClient, get_client, clear_clients
+from screenclicker.tracing import percentile
+
+
+def make_call(use_real_server):
+    if use_real_server:
+        return lambda client: client.list()
+    return lambda client: client.chat("bench", [{"role": "user", "content": "hi"}], system_prompt="")
+
+
+def run(calls, threads, get, call):
+    """Time calls spread over threads; returns per-call latencies in seconds."""
+    def one(_):
+        start = time.perf_counter()
+        call(get())
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(one, range(calls)))
+
+
+def report(name, latencies, wall):
+    ordered = sorted(latencies)
+    p50, p95 = percentile(ordered, 50), percentile(ordered, 95)
+    print(f"{name:<14} {len(latencies) / wall:9.0f} calls/s  "
+          f"p50 {p50 * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms")
+    return p50
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-call Ollama clients")
+    parser.add_argument("--calls", type=int, default=300, help="Requests per mode (default: 300)")
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent callers (default: 1)")
+    parser.add_argument("--host", default=None, help="Real Ollama URL (default: in-process stub)")
+    args = parser.parse_args()
+
+    server = None
+    host = args.host
+    if host is None:
+        server = StubOllama().start()
+        host = server.url
+    call = make_call(args.host is not None)
+
+    def fresh():
+        return OllamaClient(host=host)
+
+    def shared():
+        return get_client(host)
+
+    results = {}
+    for name, get in (("fresh client", fresh), ("shared client", shared)):
+        run(min(20, args.calls), args.threads, get, call)  # Warm up
+        start = time.perf_counter()
+        latencies = run(args.calls, args.threads, get, call)
+        results[name] = report(name, latencies, time.perf_counter() - start)
+
+    saved = (results["fresh client"] - results["shared client"]) * 1000
+    print(f"Connection/client setup removed per call: {saved:.2f} ms (p50)")
+
+    clear_clients()
+    if server is not None:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
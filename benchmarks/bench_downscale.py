@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Measure VLM latency versus click accuracy at several downscale sizes.
+
+Renders synthetic game-like screens with a labelled target button among
+distractors, asks the model for the target's center at each size, maps
+the answer back with the preprocessing transform and scores it against
+the known button rectangle. Needs a running Ollama server with a vision
+model.
+
+Usage:
+    python benchmarks/bench_downscale.py
+    python benchmarks/bench_downscale.py --sizes 0 1600 1280 960 640 --trials 10
+    python benchmarks/bench_downscale.py --token-budgets 2048 1024 512 --json results.json
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PIL import Image, ImageDraw
+
+from screenclicker import OllamaClient, ImagePayload
+from screenclicker.config import get_model
+from screenclicker.coordinates import parse_coordinates
+from screenclicker.preprocess import prepare_image
+from screenclicker.screen import CapturedImage
+from screenclicker.tracing import percentile
+
+LABELS = ["stoke fire", "gather wood", "check traps", "build hut", "lodge", "tannery",
+          "smokehouse", "workshop", "trading post", "embark"]
+
+
+def render_screen(rng, width, height, target_label, button_count=8):
+    """Draw buttons at random positions; return (png bytes, target rect)."""
+    image = Image.new('RGB', (width, height), (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    labels = [target_label] + rng.sample([l for l in LABELS if l != target_label], button_count - 1)
+    placed = []
+    target = None
+    for label in labels:
+        for _ in range(100):
+            w, h = 160, 40
+            x = rng.randint(20, width - w - 20)
+            y = rng.randint(20, height - h - 20)
+            rect = (x, y, x + w, y + h)
+            if all(rect[2] < r[0] or rect[0] > r[2] or rect[3] < r[1] or rect[1] > r[3] for r in placed):
+                break
+        placed.append(rect)
+        draw.rectangle(rect, outline=(0, 0, 0), width=2)
+        draw.text((rect[0] + 12, rect[1] + 12), label, fill=(0, 0, 0))
+        if label == target_label:
+            target = rect
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return CapturedImage(buffer.getvalue(), width, height, 'png'), target
+
+
+def ask(client, model, prepared, label):
+    prompt = f"""This screenshot is {prepared.width}x{prepared.height} pixels.
+The top-left corner is (0,0), bottom-right is ({prepared.width-1},{prepared.height-1}).
+
+Task: click the "{label}" button
+
+Find the CENTER of the target element.
+Respond with ONLY x,y coordinates (e.g., 500,300):"""
+    start = time.perf_counter()
+    response = client.chat(model, [{"role": "user", "content": prompt}],
+                           images=[ImagePayload(prepared.image)], options={'temperature': 0})
+    return response['message']['content'].strip(), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latency vs accuracy across downscale sizes")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[0, 1600, 1280, 960, 640],
+                        help="Max side values to test; 0 = full resolution")
+    parser.add_argument("--token-budgets", type=int, nargs="*", default=[],
+                        help="Vision token budgets to test")
+    parser.add_argument("--trials", type=int, default=5, help="Screens per setting (default: 5)")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--model", default=None, help="Model (default: configured model)")
+    parser.add_argument("--host", default=None, help="Ollama host URL (default: configured)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    client = OllamaClient(host=args.host)
+    model = args.model or get_model()
+    settings = [('max_side', s or None) for s in args.sizes] + [('token_budget', t) for t in args.token_budgets]
+
+    rng = random.Random(args.seed)
+    labels = [rng.choice(LABELS) for _ in range(args.trials)]
+    screens = [render_screen(rng, args.width, args.height, label) for label in labels]
+
+    # Warm the model so the first setting doesn't pay the load
+    ask(client, model, prepare_image(screens[0][0], max_side=320), labels[0])
+
+    results = []
+    print(f"{'setting':<20} {'size':>11} {'p50 ms':>8} {'p95 ms':>8} {'hit %':>6} {'err px':>7}")
+    for kind, value in settings:
+        latencies, errors, hits = [], [], 0
+        for (image, rect), label in zip(screens, labels):
+            prepared = prepare_image(image, **{kind: value})
+            answer, latency = ask(client, model, prepared, label)
+            latencies.append(latency)
+            try:
+                x, y = parse_coordinates(answer, prepared.transform)
+            except ValueError:
+                errors.append(math.inf)
+                continue
+            cx, cy = (rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2
+            errors.append(math.hypot(x - cx, y - cy))
+            hits += rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]
+
+        finite = [e for e in errors if math.isfinite(e)]
+        row = {
+            'setting': f"{kind}={value or 'full'}",
+            'size': f"{prepared.width}x{prepared.height}",
+            'latency_p50_ms': percentile(sorted(latencies), 50) * 1000,
+            'latency_p95_ms': percentile(sorted(latencies), 95) * 1000,
+            'hit_rate': hits / len(screens),
+            'median_error_px': statistics.median(finite) if finite else None,
+            'parse_failures': len(errors) - len(finite),
+        }
+        results.append(row)
+        error = f"{row['median_error_px']:7.1f}" if finite else "    n/a"
+        print(f"{row['setting']:<20} {row['size']:>11} {row['latency_p50_ms']:8.0f} "
+              f"{row['latency_p95_ms']:8.0f} {row['hit_rate'] * 100:6.0f} {error}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'model': model, 'trials': args.trials, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite: no Wayland, /dev/uinput or GPU needed.
+
+Runs screenclicker against the stand-ins in tests/stubs.py (fake grim/swaymsg on
+PATH, in-memory uinput devices, a local Ollama stub with configurable
+latency) and measures throughput, latency percentiles, allocations and,
+for the end-to-end flows, per-stage timings from the tracing spans.
+
+Results are written as JSON so runs can be compared across commits:
+
+Usage:
+    python benchmarks/bench_suite.py --json before.json
+    git checkout other-branch
+    python benchmarks/bench_suite.py --json after.json --compare before.json
+    python benchmarks/bench_suite.py --only screenshot_monitor chat --latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from stubs import StubOllama, install_mock_uinput, make_fake_tools
+
+from screenclicker import tracing
+from screenclicker.config import get_config, reset_config
+from screenclicker.ollama_client import clear_clients, get_client
+from screenclicker.screen import invalidate_screen_info
+from screenclicker.tracing import percentile
+
+MESSAGES = [{"role": "user", "content": "Where is the button? Respond with x,y"}]
+
+
+def measure(fn, iterations, warmup=3, alloc_iterations=None):
+    """Time fn() per call, then measure allocations in a separate pass.
+
+    tracemalloc slows allocation-heavy code a lot, so timing and
+    allocation tracking never run together.
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_start)
+    wall = time.perf_counter() - start
+
+    alloc_iterations = alloc_iterations or max(1, iterations // 5)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in range(alloc_iterations):
+        fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / wall,
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'peak_alloc_kib': (peak - baseline) / 1024,
+        'retained_kib_per_op': (current - baseline) / 1024 / alloc_iterations,
+    }
+
+
+def with_stages(fn):
+    """Run fn with tracing on and return (result, per-span histograms)."""
+    tracing.reset()
+    tracing.enable()
+    try:
+        result = fn()
+    finally:
+        tracing.disable()
+    stages = tracing.histograms()
+    tracing.reset()
+    return result, stages
+
+
+def bench_screenshot_monitor(args):
+    from screenclicker.screen import screenshot_monitor
+    return measure(lambda: screenshot_monitor(0), args.iterations)
+
+
+def bench_screenshot_raw(args):
+    from screenclicker.screen import screenshot_monitor
+    return measure(lambda: screenshot_monitor(0, format='raw'), args.iterations)
+
+
+def bench_chat(args):
+    from screenclicker.ollama_client import ImagePayload
+    from screenclicker.screen import screenshot_monitor
+    client = get_client()
+    payload = ImagePayload(screenshot_monitor(0))
+    return measure(lambda: client.chat(args.model, MESSAGES, images=[payload]), args.iterations)
+
+
+def bench_chat_fresh_image(args):
+    """Chat with bytes each time, so base64 encoding is paid per call."""
+    from screenclicker.screen import screenshot_monitor
+    client = get_client()
+    image = screenshot_monitor(0)
+    return measure(lambda: client.chat(args.model, MESSAGES, images=[image]), args.iterations)
+
+
+def bench_left_click(args):
+    from screenclicker.mouse import left_click
+    return measure(lambda: left_click(500, 300), args.iterations * 10)
+
+
+def bench_text(args):
+    from screenclicker.keyboard import text
+    return measure(lambda: text("stoke fire", rate=1e9), args.iterations * 10)
+
+
+def bench_locate(args):
+    """Template match of a remembered target on a fresh capture."""
+    from screenclicker.frames import frame_to_array
+    from screenclicker.locator import TemplateLocator
+    from screenclicker.screen import screenshot_monitor
+    locator = TemplateLocator()
+    locator.remember("click button 0", frame_to_array(screenshot_monitor(0)), 160, 140)
+    return measure(lambda: locator.locate("click button 0", screenshot_monitor(0, format='raw').pixels),
+                   args.iterations)
+
+
+def bench_run_flow(args):
+    """run.py end to end: screenshot, sampled predictions, vote, click."""
+    import run
+    argv = ['run.py', 'click the button', '--samples', str(args.samples)]
+
+    def step():
+        saved = sys.argv
+        sys.argv = argv
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run.main()
+        finally:
+            sys.argv = saved
+
+    result = measure(step, max(3, args.iterations // 5), warmup=1, alloc_iterations=2)
+    _, result['stages'] = with_stages(lambda: [step() for _ in range(3)])
+    result['steps_per_sec'] = result.pop('ops_per_sec')
+    return result
+
+
+def bench_agent(args):
+    """Pipelined agent loop: capture, VLM policy, click."""
+    from screenclicker.agent import Agent, VLMPolicy
+
+    steps = max(5, args.iterations // 2)
+
+    def run_agent():
+        agent = Agent(VLMPolicy("click the button", model=args.model, stream=False), warmup=False)
+        agent.run(steps=steps)
+        return agent.stats()
+
+    run_agent()  # Warm up
+    stats, stages = with_stages(run_agent)
+    return {
+        'iterations': stats['steps'],
+        'steps_per_sec': stats['steps'] / stats['elapsed'] if stats['elapsed'] else 0.0,
+        'steps_per_minute': stats['steps_per_minute'],
+        'errors': stats['errors'],
+        'stages': stages,
+    }
+
+
+BENCHMARKS = {
+    'screenshot_monitor': bench_screenshot_monitor,
+    'screenshot_raw': bench_screenshot_raw,
+    'chat': bench_chat,
+    'chat_fresh_image': bench_chat_fresh_image,
+    'left_click': bench_left_click,
+    'text': bench_text,
+    'locate': bench_locate,
+    'run_flow': bench_run_flow,
+    'agent': bench_agent,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print throughput and p50 change versus an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')}):")
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        rate_key = 'ops_per_sec' if 'ops_per_sec' in result else 'steps_per_sec'
+        line = f"  {name:<20} {rate_key} {result[rate_key] / old[rate_key]:6.2f}x"
+        if 'p50_ms' in result and 'p50_ms' in old:
+            line += f"  p50 {result['p50_ms'] - old['p50_ms']:+8.2f} ms"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline screenclicker benchmarks")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), default=None,
+                        help="Benchmarks to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=50, help="Base iteration count (default: 50)")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Stub Ollama seconds per request (default: 0.02)")
+    parser.add_argument("--samples", type=int, default=3, help="run.py --samples (default: 3)")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--model", default="bench-vl")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    with tempfile.TemporaryDirectory() as directory, StubOllama(latency=args.latency) as server:
+        make_fake_tools(directory, args.width, args.height)
+        os.environ['PATH'] = directory + os.pathsep + os.environ['PATH']
+        invalidate_screen_info()
+        get_config().update(host='127.0.0.1', port=server.port, model=args.model, endpoints=None)
+        clear_clients()
+        restore_uinput = install_mock_uinput()
+
+        results = {}
+        try:
+            for name in names:
+                results[name] = BENCHMARKS[name](args)
+                r = results[name]
+                rate = r.get('ops_per_sec', r.get('steps_per_sec'))
+                detail = f"p50 {r['p50_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms" if 'p50_ms' in r else ""
+                print(f"{name:<20} {rate:10.1f}/s  {detail}")
+        finally:
+            restore_uinput()
+            clear_clients()
+            reset_config()
+
+    for name, result in results.items():
+        for stage, h in result.get('stages', {}).items():
+            print(f"  {name}/{stage:<26} p50 {h['p50_ms']:8.2f} ms  p95 {h['p95_ms']:8.2f} ms")
+
+    output = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stub_latency': args.latency,
+            'frame': f"{args.width}x{args.height}",
+        },
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(output, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
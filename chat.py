@@ -9,7 +9,7 @@ Usage:
 """
 
 import argparse
-from screenclicker import screenshot_monitor, OllamaClient
+from screenclicker import screenshot_monitor, OllamaClient, ImagePayload
 from screenclicker.config import get_model
 
 
@@ -34,7 +34,7 @@ def main():
     response = client.chat(
         get_model(),
         [{"role": "user", "content": args.prompt}],
-        images=[img]
+        images=[ImagePayload(img)]
     )
 
     print()
@@ -6,30 +6,34 @@ Usage:
     python run.py "click the fourier text"
     python run.py "click the close button"
     python run.py --monitor 1 "click the button"
+    python run.py --locator ~/.cache/screenclicker/locator.npz "click the stoke fire button"
+    python run.py --locator locator.npz --commands commands.npz "press stoke fire"
 """
 
 import sys
 import argparse
-import io
-import re
-from PIL import Image
-from screenclicker import left_click, screenshot_monitor, OllamaClient, set_target_monitor
-from screenclicker.config import get_model
-
-
-def parse_coordinates(text):
-    """Parse x,y coordinates from VLM response."""
-    # Remove common formatting
-    text = text.replace("(", "").replace(")", "").replace(" ", "")
-    # Find pattern like "123,456"
-    match = re.search(r'(\d+),(\d+)', text)
-    if match:
-        return int(match.group(1)), int(match.group(2))
-    raise ValueError(f"Could not parse coordinates from: {text}")
-
-
-def get_coordinates(client, model, img, width, height, command):
-    """Ask VLM for coordinates once."""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from screenclicker import left_click, screenshot_monitor, OllamaPool, ImagePayload, set_target_monitor
+from screenclicker.config import get_model, get_endpoints, set_endpoints
+from screenclicker.actions import action_schema
+from screenclicker.coordinates import parse_coordinates, stream_coordinates, CoordinateVoter
+from screenclicker.response_cache import ResponseCache
+from screenclicker.preprocess import prepare_image
+from screenclicker.frames import frame_to_array
+from screenclicker.locator import TemplateLocator
+from screenclicker.command_cache import CommandCache
+
+
+def get_coordinates(client, model, img, width, height, command, cache=False, stream=False,
+                    transform=None):
+    """Ask VLM for coordinates once.
+
+    With cache=True the query runs at temperature 0 and is served from the
+    client's response cache when the frame and command are unchanged.
+    With stream=True the response is streamed and cancelled as soon as an
+    x,y pair has arrived, and the parsed (x, y) in monitor coordinates is
+    returned instead of the text (raises ValueError if none arrived).
+    """
     prompt = f"""This screenshot is {width}x{height} pixels.
 The top-left corner is (0,0), bottom-right is ({width-1},{height-1}).
 
@@ -38,61 +42,209 @@ Task: {command}
 Find the CENTER of the target element.
 Respond with ONLY x,y coordinates (e.g., 500,300):"""
 
+    kwargs = {'cache': True, 'options': {'temperature': 0}} if cache else {}
+    if stream:
+        kwargs.pop('cache', None)
+        point, _ = stream_coordinates(
+            client, model, [{"role": "user", "content": prompt}], transform=transform,
+            images=[img], **kwargs
+        )
+        return point
+
     response = client.chat(
         model,
         [{"role": "user", "content": prompt}],
-        images=[img]
+        images=[img],
+        **kwargs
     )
     return response['message']['content'].strip()
 
 
+def get_click(client, model, img, width, height, command, transform, cache=False):
+    """Ask VLM for a click as schema-constrained JSON.
+
+    Invalid answers are re-asked with the same image, so a parse failure
+    doesn't cost a new screenshot. Returns (x, y) in monitor coordinates.
+    """
+    prompt = f"""This screenshot is {width}x{height} pixels.
+The top-left corner is (0,0), bottom-right is ({width-1},{height-1}).
+
+Task: {command}
+
+Find the CENTER of the target element.
+Respond with a JSON object: {{"action": "click", "x": ..., "y": ...}}"""
+
+    kwargs = {'cache': True, 'options': {'temperature': 0}} if cache else {}
+    action = client.chat_action(model, [{"role": "user", "content": prompt}], images=[img],
+                                transform=transform, schema=action_schema('click'), **kwargs)
+    return action.x, action.y
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run natural language screen commands")
     parser.add_argument("command", help="Command to execute (e.g., 'click the button')")
     parser.add_argument("--monitor", "-m", type=int, default=0, help="Monitor index (default: 0)")
-    parser.add_argument("--samples", "-n", type=int, default=3, help="Number of predictions to average (default: 3)")
+    parser.add_argument("--samples", "-n", type=int, default=3, help="Number of predictions to vote on (default: 3)")
+    parser.add_argument("--concurrency", "-c", type=int, default=None,
+                        help="Max predictions in flight at once (default: all samples)")
+    parser.add_argument("--tolerance", "-t", type=float, default=20,
+                        help="Pixel distance within which predictions agree (default: 20)")
+    parser.add_argument("--agree", type=int, default=None,
+                        help="Stop once this many predictions agree (default: majority of samples)")
+    parser.add_argument("--cache", metavar="PATH", default=None,
+                        help="SQLite response cache; queries run at temperature 0 and are reused "
+                             "for an unchanged screen (implies --samples 1)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream responses and stop each one as soon as x,y arrives")
+    parser.add_argument("--hosts", default=None,
+                        help="Comma-separated Ollama servers to spread samples over "
+                             "(default: OLLAMA_HOSTS or the configured host)")
+    parser.add_argument("--json", action="store_true",
+                        help="Request JSON answers with schema-constrained decoding")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="Downscale so the longest side is at most this many pixels")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Downscale to at most this many vision tokens (28x28 patches)")
+    parser.add_argument("--locator", metavar="PATH", default=None,
+                        help="Template file; targets the VLM found before are matched directly "
+                             "in the screenshot and the VLM is only asked when no match is confident")
+    parser.add_argument("--min-confidence", type=float, default=0.9,
+                        help="Template match score needed to skip the VLM (default: 0.9)")
+    parser.add_argument("--commands", metavar="PATH", default=None,
+                        help="Embedding index of resolved commands; paraphrases of a known command "
+                             "try its template first (needs --locator)")
+    parser.add_argument("--similarity", type=float, default=0.9,
+                        help="Cosine similarity for a paraphrase to match (default: 0.9)")
     args = parser.parse_args()
+    if args.cache:
+        # Deterministic queries give identical samples
+        args.samples = 1
+    if args.commands and not args.locator:
+        parser.error("--commands requires --locator")
+    if args.hosts is not None:
+        # Same rules as OLLAMA_HOSTS: spaces and empty entries are dropped
+        hosts = [h.strip() for h in args.hosts.split(',') if h.strip()]
+        if not hosts:
+            parser.error("--hosts needs at least one server")
+        set_endpoints(hosts)
 
     set_target_monitor(args.monitor)
     command = args.command
     print(f"Command: {command}")
     print(f"Monitor: {args.monitor}")
 
+    # Paraphrases of a resolved command try its template; the VLM gets the user's words
+    commands = CommandCache(args.commands, threshold=args.similarity) if args.commands else None
+    canonical = command  # Template to try first
+    if commands is not None:
+        try:
+            known = commands.lookup(command)
+            if commands.embed_calls:
+                commands.save()  # Keep new embeddings even if the VLM step fails
+        except Exception as e:
+            print(f"Command lookup failed - {e}")
+            known = None
+        if known is not None:
+            if known.similarity < 1.0:
+                print(f"Same as: {known.command} (similarity {known.similarity:.3f})")
+            canonical = known.command
+
     # Take screenshot
     print("Taking screenshot...")
     img = screenshot_monitor(args.monitor)
 
-    # Get dimensions
-    pil_img = Image.open(io.BytesIO(img))
-    width, height = pil_img.size
-    print(f"Screenshot size: {width}x{height}")
-
-    # Ask VLM multiple times and average
-    client = OllamaClient()
+    # Dimensions come with the capture, no need to decode the PNG
+    print(f"Screenshot size: {img.width}x{img.height}")
+
+    # Known targets are found by template matching in milliseconds
+    locator = TemplateLocator(args.locator, threshold=args.min_confidence) if args.locator else None
+    if locator is not None:
+        frame = frame_to_array(img)
+        match = locator.locate(canonical, frame)
+        if match is not None:
+            print(f"Template match: ({match.x}, {match.y}), score {match.score:.3f}, skipping VLM")
+            left_click(match.x, match.y)
+            print("Done!")
+            return
+
+    # Downscale for the model; coordinates are mapped back when parsing
+    prepared = prepare_image(img, max_side=args.max_side, token_budget=args.token_budget)
+    width, height = prepared.width, prepared.height
+    if (width, height) != (img.width, img.height):
+        print(f"Sending at: {width}x{height}")
+    # Encode once, shared by every sample
+    img = ImagePayload(prepared.image)
+
+    # Ask VLM several times concurrently and vote
+    cache = ResponseCache(path=args.cache) if args.cache else None
+    client = OllamaPool(get_endpoints(), cache=cache)
     model = get_model()
-    predictions = []
-
-    print(f"Getting {args.samples} predictions...")
-    for i in range(args.samples):
-        result = get_coordinates(client, model, img, width, height, command)
-        try:
-            x, y = parse_coordinates(result)
+    concurrency = args.concurrency or args.samples
+    agree = args.agree if args.agree is not None else args.samples // 2 + 1
+    voter = CoordinateVoter(tolerance=args.tolerance, agree=agree)
+
+    print(f"Getting {args.samples} predictions ({concurrency} at a time, {len(client.endpoints)} host(s))...")
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    if args.json:
+        futures = {
+            executor.submit(get_click, client, model, img, width, height, command,
+                            prepared.transform, cache is not None): i
+            for i in range(args.samples)
+        }
+    else:
+        futures = {
+            executor.submit(get_coordinates, client, model, img, width, height, command,
+                            cache is not None, args.stream, prepared.transform): i
+            for i in range(args.samples)
+        }
+    try:
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  #{i+1}: Request failed - {e}")
+                continue
+            if args.json or args.stream:
+                # Already parsed (and mapped back to monitor coordinates)
+                x, y = result
+            else:
+                try:
+                    x, y = parse_coordinates(result, prepared.transform)
+                except ValueError:
+                    print(f"  #{i+1}: Failed to parse - {result}")
+                    continue
             print(f"  #{i+1}: ({x}, {y})")
-            predictions.append((x, y))
-        except ValueError as e:
-            print(f"  #{i+1}: Failed to parse - {result}")
-
-    if not predictions:
+            if voter.add((x, y)):
+                print(f"  {agree} predictions agree within {args.tolerance}px, stopping early")
+                break
+    finally:
+        # Drop queued samples; in-flight requests finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not voter.points:
         print("No valid predictions received")
         sys.exit(1)
 
-    # Average the predictions
-    avg_x = sum(p[0] for p in predictions) // len(predictions)
-    avg_y = sum(p[1] for p in predictions) // len(predictions)
-
-    print(f"Average: ({avg_x}, {avg_y})")
+    target_x, target_y = voter.result()
+    print(f"Voted: ({target_x}, {target_y}) from {len(voter.points)} prediction(s)")
+    if cache is not None:
+        print(f"Cache: {cache.stats()}")
+        cache.close()
+    if voter.done or args.samples == 1:
+        # Only agreed-on targets become templates and known commands, under the
+        # user's wording: a wrong paraphrase match must not overwrite another target
+        if locator is not None and locator.remember(command, frame, target_x, target_y):
+            locator.save()
+            print(f"Saved template to {args.locator}")
+        if commands is not None:
+            try:
+                commands.add(command)
+                commands.save()
+            except Exception as e:
+                print(f"Could not index command - {e}")
     print(f"Clicking...")
-    left_click(avg_x, avg_y)
+    left_click(target_x, target_y)
     print("Done!")
 
 
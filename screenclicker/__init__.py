@@ -13,21 +13,58 @@ System dependencies:
 - ollama: For local VLM hosting (https://ollama.com)
 """
 
-from .mouse import right_click, left_click, move_mouse, set_target_monitor, get_target_monitor
-from .keyboard import text
-from .screen import screenshot, screenshot_region, get_screen_info, screenshot_monitor
+from .mouse import (
+    right_click, left_click, move_mouse, set_target_monitor, get_target_monitor,
+    VirtualMouse, get_virtual_mouse
+)
+from .keyboard import text, VirtualKeyboard, get_virtual_keyboard
+from .screen import (
+    screenshot, screenshot_region, get_screen_info, screenshot_monitor,
+    CapturedImage, RawFrame, image_size,
+    CaptureBackend, GrimPipeBackend, GrimTempFileBackend,
+    set_capture_backend, get_capture_backend,
+    MonitorTopology, get_monitor_topology, invalidate_screen_info
+)
 from .ollama_client import (
     OllamaClient,
+    AsyncOllamaClient,
+    get_client,
+    clear_clients,
+    ImagePayload,
     quick_chat,
     quick_generate,
     describe_image,
+    describe_image_batch,
     screenshot_and_describe,
     data_from_path,
-    describe_image_from_path
+    describe_image_from_path,
+    async_describe_image,
+    async_screenshot_and_describe
+)
+from .response_cache import ResponseCache
+from .pool import OllamaPool
+from .models import ModelManager
+from .frames import (
+    FrameChangeDetector, FrameChange, frame_to_array, average_hash, hamming_distance,
+    CoordinateTransform, RegionCapture, DirtyRegionCapturer
+)
+from .preprocess import prepare_image, PreparedImage, target_size
+from .coordinates import (
+    parse_coordinates, vote_coordinates, median_point, CoordinateVoter,
+    CoordinateStreamParser, stream_coordinates
 )
+from .actions import (
+    Click, RightClick, Move, Type, Wait, ACTION_SCHEMA, action_schema, parse_action, action_to_dict
+)
+from . import tracing
+from .recorder import SessionRecorder, SessionReplayer
+from .framestore import FrameStore
+from .locator import TemplateLocator, TemplateMatch, match_template
+from .command_cache import CommandCache, CommandMatch
+from .agent import Agent, Frame, VLMPolicy, execute_action
 from .config import (
     get_config, set_config, set_host, set_port, set_model, set_system_prompt,
-    get_url, get_model, get_system_prompt, reset_config
+    set_endpoints, get_endpoints, get_url, get_model, get_system_prompt, reset_config
 )
 
 __version__ = "0.2.0"
@@ -38,24 +75,104 @@ __all__ = [
     "move_mouse",
     "set_target_monitor",
     "get_target_monitor",
+    "VirtualMouse",
+    "get_virtual_mouse",
 
     # Keyboard
     "text",
+    "VirtualKeyboard",
+    "get_virtual_keyboard",
 
     # Screen capture
     "screenshot",
     "screenshot_region",
     "screenshot_monitor",
     "get_screen_info",
+    "CapturedImage",
+    "RawFrame",
+    "image_size",
+    "CaptureBackend",
+    "GrimPipeBackend",
+    "GrimTempFileBackend",
+    "set_capture_backend",
+    "get_capture_backend",
+    "MonitorTopology",
+    "get_monitor_topology",
+    "invalidate_screen_info",
 
     # VLM (Ollama)
     "OllamaClient",
+    "AsyncOllamaClient",
+    "get_client",
+    "clear_clients",
+    "ImagePayload",
     "quick_chat",
     "quick_generate",
     "describe_image",
+    "describe_image_batch",
     "screenshot_and_describe",
     "data_from_path",
     "describe_image_from_path",
+    "async_describe_image",
+    "async_screenshot_and_describe",
+    "ResponseCache",
+    "OllamaPool",
+    "ModelManager",
+
+    # Frame differencing
+    "FrameChangeDetector",
+    "FrameChange",
+    "frame_to_array",
+    "average_hash",
+    "hamming_distance",
+    "CoordinateTransform",
+    "RegionCapture",
+    "DirtyRegionCapturer",
+
+    # Preprocessing
+    "prepare_image",
+    "PreparedImage",
+    "target_size",
+
+    # Coordinates
+    "parse_coordinates",
+    "vote_coordinates",
+    "median_point",
+    "CoordinateVoter",
+    "CoordinateStreamParser",
+    "stream_coordinates",
+
+    # Template locator and command cache
+    "TemplateLocator",
+    "TemplateMatch",
+    "match_template",
+    "CommandCache",
+    "CommandMatch",
+
+    # Actions
+    "Click",
+    "RightClick",
+    "Move",
+    "Type",
+    "Wait",
+    "ACTION_SCHEMA",
+    "action_schema",
+    "parse_action",
+    "action_to_dict",
+
+    # Tracing
+    "tracing",
+
+    # Session recording
+    "SessionRecorder",
+    "SessionReplayer",
+    "FrameStore",
+
+    # Agent loop
+    "Agent",
+    "Frame",
+    "VLMPolicy",
+    "execute_action",
 
     # Config
     "get_config",
@@ -64,6 +181,8 @@ __all__ = [
     "set_port",
     "set_model",
     "set_system_prompt",
+    "set_endpoints",
+    "get_endpoints",
     "get_url",
     "get_model",
     "get_system_prompt",
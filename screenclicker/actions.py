@@ -0,0 +1,147 @@
+"""
+Typed actions the VLM can ask for, and the JSON schema used to request them.
+
+Passing ACTION_SCHEMA as Ollama's `format` constrains decoding to a JSON
+object, so answers no longer need regex scraping. parse_action() checks
+the fields each action needs and maps coordinates back to monitor space.
+"""
+
+import json
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+
+class Click(NamedTuple):
+    """Left click at (x, y)."""
+    x: int
+    y: int
+
+
+class RightClick(NamedTuple):
+    """Right click at (x, y)."""
+    x: int
+    y: int
+
+
+class Move(NamedTuple):
+    """Move the cursor to (x, y)."""
+    x: int
+    y: int
+
+
+class Type(NamedTuple):
+    """Type a string."""
+    text: str
+
+
+class Wait(NamedTuple):
+    """Do nothing for a while (e.g. until a timer runs out)."""
+    seconds: float
+
+
+Action = Union[Click, RightClick, Move, Type, Wait]
+
+ACTION_TYPES = {
+    'click': Click,
+    'right_click': RightClick,
+    'move': Move,
+    'type': Type,
+    'wait': Wait,
+}
+_ACTION_NAMES = {cls: name for name, cls in ACTION_TYPES.items()}
+_POSITIONAL = (Click, RightClick, Move)
+
+ACTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'action': {'type': 'string', 'enum': list(ACTION_TYPES)},
+        'x': {'type': 'integer'},
+        'y': {'type': 'integer'},
+        'text': {'type': 'string'},
+        'seconds': {'type': 'number'},
+    },
+    'required': ['action'],
+}
+
+ACTION_PROMPT = """Respond with a JSON object describing ONE action:
+{"action": "click", "x": 500, "y": 300}        left click
+{"action": "right_click", "x": 500, "y": 300}  right click
+{"action": "move", "x": 500, "y": 300}         move the cursor
+{"action": "type", "text": "hello"}            type text
+{"action": "wait", "seconds": 2}               wait"""
+
+
+def action_schema(*names: str) -> Dict[str, Any]:
+    """Get ACTION_SCHEMA restricted to some action types.
+
+    Args:
+        *names: Allowed action names (all if none given)
+
+    Returns:
+        JSON schema dict for the `format` option
+    """
+    if not names:
+        return ACTION_SCHEMA
+    unknown = [n for n in names if n not in ACTION_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown action types: {', '.join(unknown)}")
+    schema = json.loads(json.dumps(ACTION_SCHEMA))
+    schema['properties']['action']['enum'] = list(names)
+    return schema
+
+
+def parse_action(data: Union[str, Dict[str, Any]], transform=None,
+                 allowed: Optional[tuple] = None) -> Action:
+    """Validate a model answer and build the action.
+
+    Args:
+        data: JSON string or decoded dict
+        transform: CoordinateTransform mapping image coordinates to
+            monitor coordinates (applied to x, y)
+        allowed: Restrict to these action names
+
+    Returns:
+        Action tuple
+
+    Raises:
+        ValueError: If the answer isn't valid JSON or misses/mistypes fields
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got: {data!r}")
+
+    name = data.get('action')
+    cls = ACTION_TYPES.get(name)
+    if cls is None or (allowed is not None and name not in allowed):
+        expected = ', '.join(allowed or ACTION_TYPES)
+        raise ValueError(f"Unknown action {name!r}. Expected one of: {expected}")
+
+    values = []
+    for field in cls._fields:
+        if field not in data:
+            raise ValueError(f"Action '{name}' needs field '{field}'")
+        value = data[field]
+        expected_type = cls.__annotations__[field]
+        if expected_type is str:
+            if not isinstance(value, str):
+                raise ValueError(f"Field '{field}' must be a string, got: {value!r}")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Field '{field}' must be a number, got: {value!r}")
+        elif expected_type is int:
+            value = int(round(value))
+        values.append(value)
+
+    action = cls(*values)
+    if isinstance(action, _POSITIONAL) and transform is not None:
+        action = cls(*transform.to_monitor(action.x, action.y))
+    if isinstance(action, Wait) and action.seconds < 0:
+        raise ValueError(f"Wait seconds must be non-negative, got: {action.seconds}")
+    return action
+
+
+def action_to_dict(action: Action) -> Dict[str, Any]:
+    """Convert an action to its JSON form ({'action': name, ...fields})."""
+    return {'action': _ACTION_NAMES[type(action)], **action._asdict()}
@@ -0,0 +1,406 @@
+"""
+Agent loop: Screenshot -> VLM -> Decision -> Action -> Repeat.
+
+The loop runs as a three-stage pipeline (capture, inference, action), one
+thread per stage with bounded queues in between. Capture of frame N+1
+overlaps inference on frame N and execution of the previous action, so
+the GPU isn't left idle while the screen is grabbed or input is sent.
+A full queue blocks the stage feeding it, which keeps the pipeline from
+running ahead of the slowest stage.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .config import get_config
+
+# Wakes blocked queue operations so stages notice stop()
+_POLL_INTERVAL = 0.05
+_ERROR_BACKOFF = 0.5  # Longest pause after a failed capture
+
+
+class Frame:
+    """A captured screenshot travelling through the pipeline."""
+
+    def __init__(self, index: int, image: Any, captured_at: float, change=None):
+        self.index = index
+        self.image = image
+        self.captured_at = captured_at
+        self.change = change  # FrameChange when change detection is on
+
+    def __repr__(self) -> str:
+        return f"Frame(index={self.index}, captured_at={self.captured_at:.3f})"
+
+
+def execute_action(action, monitor_index: Optional[int] = None) -> bool:
+    """Execute an action.
+
+    Args:
+        action: Action tuple (Click, RightClick, Move, Type, Wait), its dict
+            form (e.g. {'action': 'click', 'x': 500, 'y': 300}) or None
+        monitor_index: Monitor the coordinates are relative to
+
+    Returns:
+        True if an action was performed, False for None
+    """
+    from .actions import Click, RightClick, Move, Type, Wait, parse_action
+    from .mouse import left_click, right_click, move_mouse
+    from .keyboard import text
+
+    if action is None:
+        return False
+    if isinstance(action, dict):
+        action = parse_action(action)
+    if isinstance(action, Click):
+        return left_click(action.x, action.y, monitor_index)
+    if isinstance(action, RightClick):
+        return right_click(action.x, action.y, monitor_index)
+    if isinstance(action, Move):
+        return move_mouse(action.x, action.y, monitor_index)
+    if isinstance(action, Type):
+        return text(action.text)
+    if isinstance(action, Wait):
+        time.sleep(action.seconds)
+        return True
+    raise ValueError(f"Unknown action: {action!r}")
+
+
+class VLMPolicy:
+    """Ask the VLM for the next action towards a goal.
+
+    By default the model only answers with click coordinates. Pass
+    actions=(...) to let it choose among structured actions, requested
+    as JSON with schema-constrained decoding.
+
+    Callable as policy(frame) -> action (or None if the answer couldn't
+    be parsed).
+    """
+
+    PROMPT = """This screenshot is {width}x{height} pixels.
+The top-left corner is (0,0), bottom-right is ({max_x},{max_y}).
+
+Goal: {goal}
+
+Decide the single next click that makes progress towards the goal.
+Respond with ONLY x,y coordinates of the CENTER of the element to click (e.g., 500,300):"""
+
+    STRUCTURED_PROMPT = """This screenshot is {width}x{height} pixels.
+The top-left corner is (0,0), bottom-right is ({max_x},{max_y}).
+
+Goal: {goal}
+
+Decide the single next action that makes progress towards the goal.
+For clicks and moves, use the CENTER of the target element.
+{actions}"""
+
+    def __init__(self, goal: str, client=None, model: Optional[str] = None,
+                 max_side: Optional[int] = None, stream: bool = True,
+                 actions: Optional[Sequence[str]] = None, retries: int = 2, **chat_kwargs):
+        """Initialize policy.
+
+        Args:
+            goal: What the agent should accomplish
+            client: OllamaClient (shared client for the configured host if None)
+            model: Model name (uses global config default if None)
+            max_side: Downscale screenshots to this longest side before sending
+            stream: Cancel each response as soon as x,y has arrived
+                (click-only mode)
+            actions: Action types the model may choose, e.g.
+                ('click', 'type', 'wait'); None = click coordinates only
+            retries: Re-asks after an invalid structured answer
+            **chat_kwargs: Extra arguments for client.chat() (options, ...)
+        """
+        from .ollama_client import get_client
+        self.goal = goal
+        self.client = client if client is not None else get_client()
+        self.model = model if model is not None else get_config().model
+        self.max_side = max_side
+        self.stream = stream
+        self.actions = tuple(actions) if actions else None
+        self.retries = retries
+        self.chat_kwargs = chat_kwargs
+
+    def warmup(self, keep_alive="30m") -> float:
+        """Load the model before the first frame; returns seconds spent."""
+        from .models import ModelManager
+        return ModelManager(self.model, self.client, keep_alive=keep_alive, ping_interval=None).warmup()
+
+    def __call__(self, frame: Frame):
+        from .actions import ACTION_PROMPT, Click, action_schema
+        from .coordinates import parse_coordinates, stream_coordinates
+        from .ollama_client import ImagePayload
+        from .preprocess import prepare_image
+
+        prepared = prepare_image(frame.image, max_side=self.max_side)
+        size = dict(width=prepared.width, height=prepared.height,
+                    max_x=prepared.width - 1, max_y=prepared.height - 1, goal=self.goal)
+        images = [ImagePayload(prepared.image)]
+
+        try:
+            if self.actions:
+                prompt = self.STRUCTURED_PROMPT.format(actions=ACTION_PROMPT, **size)
+                return self.client.chat_action(self.model, [{"role": "user", "content": prompt}],
+                                               images=images, transform=prepared.transform,
+                                               schema=action_schema(*self.actions),
+                                               retries=self.retries, **self.chat_kwargs)
+
+            messages = [{"role": "user", "content": self.PROMPT.format(**size)}]
+            if self.stream:
+                (x, y), _ = stream_coordinates(self.client, self.model, messages,
+                                               prepared.transform, images=images, **self.chat_kwargs)
+            else:
+                response = self.client.chat(self.model, messages, images=images, **self.chat_kwargs)
+                x, y = parse_coordinates(response['message']['content'], prepared.transform)
+        except ValueError:
+            return None
+        return Click(x, y)
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total / self.count * 1000 if self.count else 0.0
+
+
+class Agent:
+    """Pipelined agent loop.
+
+    Usage:
+        agent = Agent(VLMPolicy("Keep the fire burning"), max_rate=0.5)
+        agent.run(steps=20)
+        print(agent.stats())
+    """
+
+    def __init__(self, policy: Callable[[Frame], Any], monitor_index: int = 0,
+                 max_rate: Optional[float] = None, queue_size: int = 1,
+                 capture: Optional[Callable[[], Any]] = None,
+                 execute: Optional[Callable[[Any], Any]] = None,
+                 skip_unchanged: bool = False, detector=None, warmup: bool = True):
+        """Initialize agent.
+
+        Args:
+            policy: Callable(frame) -> action for execute (None = do nothing)
+            monitor_index: Monitor to capture and act on
+            max_rate: Max captured frames per second (None = unlimited)
+            queue_size: Frames/actions buffered between stages
+            capture: Callable() -> image (default: screenshot_monitor(monitor_index))
+            execute: Callable(action) (default: execute_action on monitor_index)
+            skip_unchanged: Drop frames the FrameChangeDetector sees as unchanged
+            detector: FrameChangeDetector to use with skip_unchanged
+            warmup: Call policy.warmup() (if it has one) in a background
+                thread from start(), so the first frame is less likely to
+                wait for a cold model load; failures count as errors
+        """
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1, got: {queue_size}")
+        self.policy = policy
+        self.monitor_index = monitor_index
+        self.max_rate = max_rate
+        self.capture = capture if capture is not None else self._capture_monitor
+        self.execute = execute if execute is not None else (
+            lambda action: execute_action(action, monitor_index))
+        self.skip_unchanged = skip_unchanged
+        if skip_unchanged and detector is None:
+            from .frames import FrameChangeDetector
+            detector = FrameChangeDetector()
+        self.detector = detector
+        self.warmup = warmup
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._actions = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._max_steps = None
+        self._started_at = None
+        self._stopped_at = None
+        self.steps = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error = None
+        self._stage_stats = {'capture': _StageStats(), 'infer': _StageStats(), 'act': _StageStats()}
+
+    def _capture_monitor(self):
+        from .screen import screenshot_monitor
+        return screenshot_monitor(self.monitor_index)
+
+    @property
+    def running(self) -> bool:
+        """True while the pipeline threads are running."""
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self, steps: Optional[int] = None):
+        """Start the pipeline in background threads.
+
+        Args:
+            steps: Stop after this many executed actions (None = until stop())
+        """
+        if self.running:
+            raise RuntimeError("Agent is already running")
+        self._stop.clear()
+        self._max_steps = steps
+        self._started_at = time.monotonic()
+        self._stopped_at = None
+        self._threads = [
+            threading.Thread(target=target, name=f"screenclicker-agent-{name}", daemon=True)
+            for name, target in (('capture', self._capture_loop),
+                                 ('infer', self._infer_loop),
+                                 ('act', self._act_loop))
+        ]
+        policy_warmup = getattr(self.policy, 'warmup', None)
+        if self.warmup and policy_warmup is not None:
+            # Not a pipeline stage: an unreachable server shows up in errors, not start()
+            threading.Thread(target=self._warmup, args=(policy_warmup,),
+                             name="screenclicker-agent-warmup", daemon=True).start()
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Signal all stages to stop and wait for them."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._stopped_at is None:
+            self._stopped_at = time.monotonic()
+
+    def run(self, steps: Optional[int] = None, duration: Optional[float] = None):
+        """Run the pipeline in the foreground until done.
+
+        Args:
+            steps: Stop after this many executed actions
+            duration: Stop after this many seconds
+        """
+        self.start(steps)
+        deadline = time.monotonic() + duration if duration is not None else None
+        try:
+            while self.running and not self._stop.is_set():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._stop.wait(_POLL_INTERVAL)
+        finally:
+            self.stop()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up when the agent stops (backpressure)."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return None
+
+    def _record_error(self, error: Exception):
+        with self._lock:
+            self.errors += 1
+            self.last_error = error
+
+    def _warmup(self, policy_warmup: Callable[[], Any]):
+        try:
+            policy_warmup()
+        except Exception as e:
+            self._record_error(e)
+
+    def _capture_loop(self):
+        interval = 1.0 / self.max_rate if self.max_rate else 0.0
+        index = 0
+        next_capture = time.monotonic()
+        while not self._stop.is_set():
+            if interval:
+                delay = next_capture - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                next_capture = max(next_capture + interval, time.monotonic())
+
+            start = time.monotonic()
+            try:
+                image = self.capture()
+                change = self.detector.update(image) if self.detector is not None else None
+            except Exception as e:
+                self._record_error(e)
+                # A persistently failing backend would otherwise spin without max_rate
+                if self._stop.wait(min(_ERROR_BACKOFF, interval or _ERROR_BACKOFF)):
+                    break
+                continue
+            self._stage_stats['capture'].add(time.monotonic() - start)
+
+            if self.skip_unchanged and change is not None and not change.changed:
+                with self._lock:
+                    self.skipped += 1
+                continue
+            if not self._put(self._frames, Frame(index, image, start, change)):
+                break
+            index += 1
+
+    def _infer_loop(self):
+        while not self._stop.is_set():
+            frame = self._get(self._frames)
+            if frame is None:
+                break
+            start = time.monotonic()
+            try:
+                action = self.policy(frame)
+            except Exception as e:
+                self._record_error(e)
+                continue
+            self._stage_stats['infer'].add(time.monotonic() - start)
+            if action is not None and not self._put(self._actions, action):
+                break
+
+    def _act_loop(self):
+        while not self._stop.is_set():
+            action = self._get(self._actions)
+            if action is None:
+                break
+            start = time.monotonic()
+            try:
+                self.execute(action)
+            except Exception as e:
+                self._record_error(e)
+                continue
+            self._stage_stats['act'].add(time.monotonic() - start)
+            with self._lock:
+                self.steps += 1
+                if self._max_steps is not None and self.steps >= self._max_steps:
+                    self._stopped_at = time.monotonic()
+                    self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get throughput and per-stage timing.
+
+        Returns:
+            Dict with steps, skipped, errors, elapsed seconds, steps_per_minute
+            and mean milliseconds per stage
+        """
+        with self._lock:
+            if self._started_at is None:
+                elapsed = 0.0
+            else:
+                end = self._stopped_at if self._stopped_at is not None else time.monotonic()
+                elapsed = end - self._started_at
+            return {
+                'steps': self.steps,
+                'skipped': self.skipped,
+                'errors': self.errors,
+                'elapsed': elapsed,
+                'steps_per_minute': self.steps / elapsed * 60 if elapsed else 0.0,
+                'stage_ms': {name: stats.mean_ms for name, stats in self._stage_stats.items()},
+            }
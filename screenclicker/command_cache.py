@@ -0,0 +1,167 @@
+"""
+Map paraphrased commands onto ones that were already resolved.
+
+"click the close button" and "press close" should reuse the same target.
+CommandCache embeds each distinct command once (via the Ollama embeddings
+endpoint), keeps the commands that led to a successful click in a NumPy
+cosine-similarity index, and answers lookups with the nearest resolved
+command. Callers then look that command up in the template locator,
+which checks that the frame still matches, so a paraphrase costs one
+embedding call the first time and nothing after.
+"""
+
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .locator import normalize_command
+
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+
+class CommandMatch(NamedTuple):
+    """Nearest resolved command and its cosine similarity."""
+    command: str
+    similarity: float
+
+
+class CommandCache:
+    """Embedding index over resolved commands, persisted between runs.
+
+    Usage:
+        commands = CommandCache("~/.cache/screenclicker/commands.npz")
+        match = commands.lookup("press close")
+        ...  # Locate match.command (if any); on a miss ask the VLM with "press close"
+        commands.add("press close")
+        commands.save()
+    """
+
+    def __init__(self, path: Optional[str] = None, client=None, model: str = DEFAULT_EMBED_MODEL,
+                 threshold: float = 0.9):
+        """Initialize command cache.
+
+        Args:
+            path: .npz file the index is loaded from and saved to (memory only if None)
+            client: OllamaClient or OllamaPool for embeddings (shared client if None)
+            model: Embedding model; a saved index from another model is ignored
+            threshold: Minimum cosine similarity for a lookup to match
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.client = client
+        self.model = model
+        self.threshold = threshold
+        self.embed_calls = 0
+        self._vectors: Dict[str, np.ndarray] = {}  # Every command embedded so far
+        self._resolved: List[str] = []
+        self._matrix = None                        # Unit rows for _resolved
+        self._lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            self._load()
+
+    def __contains__(self, command):
+        return normalize_command(command) in self._resolved
+
+    def __len__(self):
+        return len(self._resolved)
+
+    def embed(self, command: str) -> np.ndarray:
+        """Unit-length embedding of a command, computed once per normalized command."""
+        command = normalize_command(command)
+        with self._lock:
+            vector = self._vectors.get(command)
+        if vector is not None:
+            return vector
+
+        if self.client is None:
+            from .ollama_client import get_client
+            self.client = get_client()
+        response = self.client.embeddings(self.model, command)
+        vector = np.asarray(response['embedding'], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            raise RuntimeError(f"Empty embedding for command: {command!r}")
+        vector /= norm
+        with self._lock:
+            self.embed_calls += 1
+            self._vectors[command] = vector
+        return vector
+
+    def add(self, command: str):
+        """Index a command whose target was resolved."""
+        vector = self.embed(command)
+        command = normalize_command(command)
+        with self._lock:
+            if command in self._resolved:
+                return
+            self._resolved.append(command)
+            rows = vector[np.newaxis]
+            self._matrix = rows if self._matrix is None else np.vstack([self._matrix, rows])
+
+    def discard(self, command: str) -> bool:
+        """Remove a command from the index. Returns True if it was indexed."""
+        command = normalize_command(command)
+        with self._lock:
+            if command not in self._resolved:
+                return False
+            index = self._resolved.index(command)
+            del self._resolved[index]
+            self._matrix = np.delete(self._matrix, index, axis=0) if self._resolved else None
+            return True
+
+    def lookup(self, command: str) -> Optional[CommandMatch]:
+        """Find the resolved command closest in meaning.
+
+        Returns:
+            CommandMatch (similarity 1.0 for the same normalized command),
+            or None if nothing reaches the threshold
+        """
+        normalized = normalize_command(command)
+        with self._lock:
+            if normalized in self._resolved:
+                return CommandMatch(normalized, 1.0)
+            if self._matrix is None:
+                return None
+        vector = self.embed(normalized)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                return None
+            similarities = self._matrix @ vector
+            index = int(np.argmax(similarities))
+            similarity = float(similarities[index])
+            if similarity < self.threshold:
+                return None
+            return CommandMatch(self._resolved[index], similarity)
+
+    def save(self, path: Optional[str] = None):
+        """Write embeddings and the resolved index to an .npz file."""
+        path = os.path.expanduser(path) if path else self.path
+        if path is None:
+            raise ValueError("No path to save the command cache to")
+        with self._lock:
+            commands = list(self._vectors)
+            vectors = np.stack([self._vectors[c] for c in commands]) if commands else np.zeros((0, 0), np.float32)
+            resolved = list(self._resolved)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, model=np.array(self.model), commands=np.array(commands, dtype=str),
+                 vectors=vectors, resolved=np.array(resolved, dtype=str))
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        with np.load(self.path) as data:
+            if str(data['model']) != self.model:
+                return
+            for command, vector in zip(data['commands'].tolist(), data['vectors']):
+                self._vectors[command] = vector
+            self._resolved = [c for c in data['resolved'].tolist() if c in self._vectors]
+        if self._resolved:
+            self._matrix = np.stack([self._vectors[c] for c in self._resolved])
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of embedded and resolved commands and embedding requests made."""
+        return {'embedded': len(self._vectors), 'resolved': len(self._resolved),
+                'embed_calls': self.embed_calls}
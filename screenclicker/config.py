@@ -3,7 +3,7 @@ Configuration management for ScreenClicker Ollama integration.
 """
 
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class OllamaConfig:
@@ -21,6 +21,7 @@ class OllamaConfig:
         self._port = None
         self._model = None
         self._system_prompt = None
+        self._endpoints = None
         self._load_from_env()
     
     def _load_from_env(self):
@@ -37,6 +38,10 @@ class OllamaConfig:
             self._model = os.environ['OLLAMA_MODEL']
         if 'OLLAMA_SYSTEM_PROMPT' in os.environ:
             self._system_prompt = os.environ['OLLAMA_SYSTEM_PROMPT']
+        if 'OLLAMA_HOSTS' in os.environ:
+            hosts = [h.strip() for h in os.environ['OLLAMA_HOSTS'].split(',') if h.strip()]
+            if hosts:
+                self.endpoints = hosts
     
     @property
     def host(self) -> str:
@@ -89,12 +94,38 @@ class OllamaConfig:
         """Get full Ollama server URL."""
         return f"http://{self.host}:{self.port}"
     
+    @property
+    def endpoints(self) -> List[str]:
+        """Get Ollama server URLs for pooled clients (defaults to [url])."""
+        return list(self._endpoints) if self._endpoints is not None else [self.url]
+    
+    @endpoints.setter
+    def endpoints(self, value: Optional[List[str]]):
+        """Set Ollama server URLs; entries may be URLs, host:port or bare hosts."""
+        if value is None:
+            self._endpoints = None
+            return
+        if isinstance(value, str) or not value or not all(isinstance(v, str) and v for v in value):
+            raise ValueError(f"Endpoints must be a non-empty list of strings, got: {value}")
+        self._endpoints = [self._normalize_endpoint(v) for v in value]
+    
+    def _normalize_endpoint(self, endpoint: str) -> str:
+        """Turn 'gpu1', 'gpu1:11434' or 'http://gpu1:11434/' into a full URL."""
+        endpoint = endpoint.strip().rstrip('/')
+        if '://' not in endpoint:
+            endpoint = f"http://{endpoint}"
+        scheme, rest = endpoint.split('://', 1)
+        if ':' not in rest.split('/', 1)[0]:
+            endpoint = f"{scheme}://{rest}:{self.DEFAULT_PORT}"
+        return endpoint
+    
     def reset(self):
         """Reset all configuration to defaults."""
         self._host = None
         self._port = None
         self._model = None
         self._system_prompt = None
+        self._endpoints = None
         self._load_from_env()  # Reload from environment
     
     def update(self, **kwargs):
@@ -105,6 +136,7 @@ class OllamaConfig:
             port: Ollama server port
             model: Default model name
             system_prompt: Default system prompt
+            endpoints: Ollama server URLs for pooled clients
         """
         if 'host' in kwargs:
             self.host = kwargs['host']
@@ -114,6 +146,8 @@ class OllamaConfig:
             self.model = kwargs['model']
         if 'system_prompt' in kwargs:
             self.system_prompt = kwargs['system_prompt']
+        if 'endpoints' in kwargs:
+            self.endpoints = kwargs['endpoints']
     
     def to_dict(self) -> Dict[str, Any]:
         """Get configuration as dictionary."""
@@ -122,7 +156,8 @@ class OllamaConfig:
             'port': self.port,
             'model': self.model,
             'system_prompt': self.system_prompt,
-            'url': self.url
+            'url': self.url,
+            'endpoints': self.endpoints
         }
     
     def __repr__(self) -> str:
@@ -173,6 +208,16 @@ def set_config(host: Optional[str] = None, port: Optional[int] = None, model: Op
         ollama_config.system_prompt = system_prompt
 
 
+def set_endpoints(endpoints: Optional[List[str]]):
+    """Set the Ollama server URLs used by pooled clients (None = just the URL)."""
+    ollama_config.endpoints = endpoints
+
+
+def get_endpoints() -> List[str]:
+    """Get the Ollama server URLs used by pooled clients."""
+    return ollama_config.endpoints
+
+
 def get_url() -> str:
     """Get the full Ollama server URL."""
     return ollama_config.url
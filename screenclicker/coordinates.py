@@ -0,0 +1,249 @@
+"""
+Coordinate parsing and multi-sample voting for VLM click predictions.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+Point = Tuple[int, int]
+
+
+def parse_coordinates(text: str, transform=None) -> Point:
+    """Parse x,y coordinates from VLM response.
+
+    Args:
+        text: Model output containing a pair like "123,456" or "(123, 456)"
+        transform: CoordinateTransform of the image the model saw (crop
+            and/or downscale); if given, the result is in monitor space
+
+    Returns:
+        Tuple of (x, y)
+
+    Raises:
+        ValueError: If no coordinate pair is found
+    """
+    # Remove common formatting
+    text = text.replace("(", "").replace(")", "").replace(" ", "")
+    # Find pattern like "123,456"
+    match = re.search(r'(\d+),(\d+)', text)
+    if match:
+        x, y = int(match.group(1)), int(match.group(2))
+        if transform is not None:
+            return transform.to_monitor(x, y)
+        return x, y
+    raise ValueError(f"Could not parse coordinates from: {text}")
+
+
+class CoordinateStreamParser:
+    """Incrementally recognize an x,y pair in streamed model output.
+
+    A pair is only accepted once a non-digit follows the y value (or the
+    stream ends), so "12,34" arriving as "12,3" + "4" is not cut short.
+    Text inside <think>...</think> blocks is ignored.
+
+    Usage:
+        parser = CoordinateStreamParser()
+        for chunk in stream:
+            point = parser.feed(chunk['message']['content'])
+            if point is not None:
+                break
+        else:
+            point = parser.finish()
+    """
+
+    _PAIR = re.compile(r'(\d+),(\d+)(?=\D)')
+
+    def __init__(self, transform=None):
+        """Initialize parser.
+
+        Args:
+            transform: CoordinateTransform applied to the parsed pair
+        """
+        self.transform = transform
+        self.text = ""
+        self.point: Optional[Point] = None
+
+    def _visible(self) -> str:
+        """Text outside think blocks, with formatting removed."""
+        text = re.sub(r'<think>.*?</think>', '', self.text, flags=re.DOTALL)
+        if '<think>' in text:
+            text = text[:text.index('<think>')]
+        return text.replace("(", "").replace(")", "").replace(" ", "")
+
+    def _result(self, x: int, y: int) -> Point:
+        self.point = self.transform.to_monitor(x, y) if self.transform is not None else (x, y)
+        return self.point
+
+    def feed(self, chunk: str) -> Optional[Point]:
+        """Add streamed text.
+
+        Returns:
+            The (x, y) pair once recognized, otherwise None
+        """
+        if self.point is not None:
+            return self.point
+        self.text += chunk
+        match = self._PAIR.search(self._visible())
+        if match:
+            return self._result(int(match.group(1)), int(match.group(2)))
+        return None
+
+    def finish(self) -> Point:
+        """Parse whatever arrived once the stream has ended.
+
+        Raises:
+            ValueError: If no coordinate pair was found
+        """
+        if self.point is not None:
+            return self.point
+        x, y = parse_coordinates(self._visible())
+        return self._result(x, y)
+
+
+def stream_coordinates(client, model: str, messages: List[Dict[str, Any]], transform=None,
+                       **kwargs) -> Tuple[Point, str]:
+    """Stream a chat request and stop as soon as an x,y pair is recognized.
+
+    Closing the response stream early disconnects from Ollama, which
+    cancels the rest of the generation and frees the server.
+
+    Args:
+        client: OllamaClient
+        model: Model name
+        messages: Chat messages
+        transform: CoordinateTransform of the image the model saw
+        **kwargs: Passed to client.chat() (images, options, ...)
+
+    Returns:
+        Tuple of ((x, y), text received so far)
+
+    Raises:
+        ValueError: If the stream ended without a coordinate pair
+    """
+    parser = CoordinateStreamParser(transform)
+    stream = client.chat(model, messages, stream=True, **kwargs)
+    try:
+        for chunk in stream:
+            point = parser.feed(chunk['message']['content'])
+            if point is not None:
+                return point, parser.text
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+    return parser.finish(), parser.text
+
+
+def _median(values: List[int]) -> int:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) // 2
+
+
+def median_point(points: List[Point]) -> Point:
+    """Per-axis median of points; robust to a single outlier.
+
+    Raises:
+        ValueError: If points is empty
+    """
+    if not points:
+        raise ValueError("No points to aggregate")
+    return _median([p[0] for p in points]), _median([p[1] for p in points])
+
+
+def _neighbours(points: List[Point], center: Point, tolerance: float) -> List[Point]:
+    tolerance_sq = tolerance * tolerance
+    return [p for p in points
+            if (p[0] - center[0]) ** 2 + (p[1] - center[1]) ** 2 <= tolerance_sq]
+
+
+def largest_cluster(points: List[Point], tolerance: float) -> List[Point]:
+    """Find the largest group of points within tolerance pixels of one of them.
+
+    Ties go to the earliest point, so the result is deterministic.
+    """
+    best = []
+    for center in points:
+        members = _neighbours(points, center, tolerance)
+        if len(members) > len(best):
+            best = members
+    return best
+
+
+def vote_coordinates(points: List[Point], tolerance: float = 20) -> Point:
+    """Aggregate predictions by cluster voting.
+
+    Takes the largest cluster of agreeing predictions and returns its
+    median, so stray outliers cannot drag the result across the screen.
+
+    Args:
+        points: Predicted (x, y) pairs
+        tolerance: Max distance in pixels for two predictions to agree
+
+    Returns:
+        Tuple of (x, y)
+
+    Raises:
+        ValueError: If points is empty
+    """
+    if not points:
+        raise ValueError("No points to aggregate")
+    return median_point(largest_cluster(points, tolerance))
+
+
+class CoordinateVoter:
+    """Thread-safe incremental voter for predictions arriving one at a time.
+
+    Usage:
+        voter = CoordinateVoter(tolerance=20, agree=2)
+        for point in predictions:
+            if voter.add(point):
+                break  # Enough samples agree
+        x, y = voter.result()
+    """
+
+    def __init__(self, tolerance: float = 20, agree: Optional[int] = None):
+        """Initialize voter.
+
+        Args:
+            tolerance: Max distance in pixels for two predictions to agree
+            agree: Number of agreeing predictions that ends voting early
+                (None = never end early)
+        """
+        self.tolerance = tolerance
+        self.agree = agree
+        self.points: List[Point] = []
+        self._lock = threading.Lock()
+
+    def add(self, point: Point) -> bool:
+        """Record a prediction.
+
+        Returns:
+            True once at least `agree` predictions are within tolerance
+        """
+        with self._lock:
+            self.points.append(point)
+            return self._has_consensus()
+
+    def _has_consensus(self) -> bool:
+        if self.agree is None or len(self.points) < self.agree:
+            return False
+        return len(largest_cluster(self.points, self.tolerance)) >= self.agree
+
+    @property
+    def done(self) -> bool:
+        """True if enough predictions agree."""
+        with self._lock:
+            return self._has_consensus()
+
+    def result(self) -> Point:
+        """Voted (x, y) from the predictions so far.
+
+        Raises:
+            ValueError: If no predictions were added
+        """
+        with self._lock:
+            return vote_coordinates(self.points, self.tolerance)
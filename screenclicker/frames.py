@@ -0,0 +1,320 @@
+"""
+Frame differencing for skipping VLM calls on unchanged screens.
+
+Frames are reduced to a small grayscale grid with NumPy, compared tile by
+tile against the previous frame, and summarized as a FrameChange listing
+which regions changed. DirtyRegionCapturer uses this to send only the
+changed part of the screen to the VLM.
+"""
+
+import io
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+Region = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def frame_to_array(frame) -> np.ndarray:
+    """Get an (height, width, 3) uint8 array for a captured frame.
+
+    Args:
+        frame: RawFrame, NumPy array, ImagePayload or encoded image bytes
+            (PPM is decoded directly; PNG/JPEG via Pillow)
+
+    Returns:
+        NumPy array of pixels
+    """
+    from .screen import RawFrame, _parse_ppm_header
+
+    if isinstance(frame, RawFrame):
+        return frame.pixels
+    if isinstance(frame, np.ndarray):
+        return frame
+    data = getattr(frame, 'data', frame)  # ImagePayload
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        raise TypeError(f"Unsupported frame type: {type(frame)}")
+
+    data = bytes(data)
+    if data[:2] == b'P6':
+        width, height, offset = _parse_ppm_header(data)
+        return np.frombuffer(data, dtype=np.uint8, count=width * height * 3,
+                             offset=offset).reshape(height, width, 3)
+
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+def downsample(pixels: np.ndarray, factor: int) -> np.ndarray:
+    """Block-average pixels into a grayscale float32 grid.
+
+    Trailing rows/columns that don't fill a whole block are dropped.
+    """
+    if pixels.ndim == 3:
+        gray = pixels[..., :3].mean(axis=2, dtype=np.float32)
+    else:
+        gray = pixels.astype(np.float32)
+    if factor <= 1:
+        return gray
+    height = gray.shape[0] // factor * factor
+    width = gray.shape[1] // factor * factor
+    blocks = gray[:height, :width].reshape(height // factor, factor, width // factor, factor)
+    return blocks.mean(axis=(1, 3))
+
+
+def average_hash(pixels: np.ndarray, size: int = 8) -> int:
+    """Perceptual average hash: size x size grid, one bit per cell above the mean."""
+    gray = downsample(pixels, 1)
+    rows = np.array_split(np.arange(gray.shape[0]), size)
+    cols = np.array_split(np.arange(gray.shape[1]), size)
+    grid = np.array([[gray[r[0]:r[-1] + 1, c[0]:c[-1] + 1].mean() for c in cols] for r in rows])
+    bits = (grid > grid.mean()).flatten()
+    return int(''.join('1' if b else '0' for b in bits), 2)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count('1')
+
+
+class FrameChange(NamedTuple):
+    """Result of comparing a frame to the previous one."""
+    changed: bool
+    score: float  # Fraction of tiles that changed (1.0 for the first frame)
+    regions: List[Region]  # Changed tiles in full-resolution pixel coordinates
+    width: int
+    height: int
+
+    @property
+    def bounding_box(self) -> Optional[Region]:
+        """Smallest region covering every changed tile, or None."""
+        if not self.regions:
+            return None
+        left = min(r[0] for r in self.regions)
+        top = min(r[1] for r in self.regions)
+        right = max(r[0] + r[2] for r in self.regions)
+        bottom = max(r[1] + r[3] for r in self.regions)
+        return left, top, right - left, bottom - top
+
+
+class FrameChangeDetector:
+    """Detect whether and where the screen changed between frames.
+
+    Usage:
+        detector = FrameChangeDetector()
+        while True:
+            frame = screenshot_monitor(0, format='raw')
+            change = detector.update(frame)
+            if not change.changed:
+                continue  # Skip the VLM call
+            ...
+    """
+
+    def __init__(self, tile_size: int = 32, threshold: float = 6.0,
+                 downsample_factor: int = 4, min_changed_tiles: int = 1):
+        """Initialize detector.
+
+        Args:
+            tile_size: Tile edge in full-resolution pixels (multiple of
+                downsample_factor)
+            threshold: Mean absolute gray-level difference (0-255) above
+                which a tile counts as changed
+            downsample_factor: Block size averaged into one cell before diffing
+            min_changed_tiles: Changed tiles needed to report a change
+        """
+        if tile_size % downsample_factor:
+            raise ValueError(f"tile_size ({tile_size}) must be a multiple of downsample_factor ({downsample_factor})")
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.downsample_factor = downsample_factor
+        self.min_changed_tiles = min_changed_tiles
+        self._previous = None
+        self._size = None
+
+    def reset(self):
+        """Forget the previous frame; the next update reports a full change."""
+        self._previous = None
+        self._size = None
+
+    def tile_differences(self, grid: np.ndarray) -> np.ndarray:
+        """Mean absolute difference per tile between grid and the previous grid."""
+        cells = self.tile_size // self.downsample_factor
+        diff = np.abs(grid - self._previous)
+        rows = -(-diff.shape[0] // cells)
+        cols = -(-diff.shape[1] // cells)
+        # Pad partial edge tiles with NaN so they average over real cells only
+        padded = np.full((rows * cells, cols * cells), np.nan, dtype=np.float32)
+        padded[:diff.shape[0], :diff.shape[1]] = diff
+        return np.nanmean(padded.reshape(rows, cells, cols, cells), axis=(1, 3))
+
+    def update(self, frame) -> FrameChange:
+        """Compare a frame with the previous one and remember it.
+
+        Args:
+            frame: RawFrame, NumPy array, ImagePayload or encoded image bytes
+
+        Returns:
+            FrameChange describing what changed
+        """
+        pixels = frame_to_array(frame)
+        height, width = pixels.shape[:2]
+        grid = downsample(pixels, self.downsample_factor)
+
+        if self._previous is None or self._size != (width, height):
+            self._previous = grid
+            self._size = (width, height)
+            return FrameChange(True, 1.0, [(0, 0, width, height)], width, height)
+
+        tile_diff = self.tile_differences(grid)
+        self._previous = grid
+
+        changed_tiles = np.argwhere(tile_diff > self.threshold)
+        regions = []
+        for row, col in changed_tiles:
+            x = int(col) * self.tile_size
+            y = int(row) * self.tile_size
+            regions.append((x, y, min(self.tile_size, width - x), min(self.tile_size, height - y)))
+
+        score = len(regions) / tile_diff.size if tile_diff.size else 0.0
+        return FrameChange(len(regions) >= self.min_changed_tiles, score, regions, width, height)
+
+    def has_changed(self, frame) -> bool:
+        """Shortcut for update(frame).changed."""
+        return self.update(frame).changed
+
+
+class CoordinateTransform(NamedTuple):
+    """Maps coordinates in a cropped and/or scaled image back to monitor space.
+
+    image = (monitor - offset) * scale, so to_monitor() divides by the
+    scale and adds the crop offset back.
+    """
+    offset_x: int = 0
+    offset_y: int = 0
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+
+    def to_monitor(self, x, y) -> Tuple[int, int]:
+        """Convert image coordinates to monitor-relative coordinates."""
+        return (self.offset_x + int(round(x / self.scale_x)),
+                self.offset_y + int(round(y / self.scale_y)))
+
+    def from_monitor(self, x, y) -> Tuple[int, int]:
+        """Convert monitor-relative coordinates to image coordinates."""
+        return (int(round((x - self.offset_x) * self.scale_x)),
+                int(round((y - self.offset_y) * self.scale_y)))
+
+    def scaled(self, scale_x: float, scale_y: float) -> 'CoordinateTransform':
+        """Transform for this image after resizing it by (scale_x, scale_y)."""
+        return self._replace(scale_x=self.scale_x * scale_x, scale_y=self.scale_y * scale_y)
+
+
+class RegionCapture(NamedTuple):
+    """Image of a changed screen region plus how to map its coordinates back."""
+    image: bytes  # CapturedImage of the region
+    transform: CoordinateTransform
+    change: FrameChange
+
+    @property
+    def region(self) -> Region:
+        """Captured region (x, y, width, height) relative to the monitor."""
+        return (self.transform.offset_x, self.transform.offset_y,
+                self.image.width, self.image.height)
+
+
+def pad_region(region: Region, padding: int, width: int, height: int, min_size: int = 0) -> Region:
+    """Grow a region by padding (and up to min_size), clamped to width x height."""
+    x, y, w, h = region
+    left, top = x - padding, y - padding
+    right, bottom = x + w + padding, y + h + padding
+
+    # Grow symmetrically to the minimum size
+    if right - left < min_size:
+        extra = min_size - (right - left)
+        left -= extra // 2
+        right += extra - extra // 2
+    if bottom - top < min_size:
+        extra = min_size - (bottom - top)
+        top -= extra // 2
+        bottom += extra - extra // 2
+
+    # Shift back inside the bounds before clamping, to keep the size
+    if left < 0:
+        right, left = right - left, 0
+    if top < 0:
+        bottom, top = bottom - top, 0
+    if right > width:
+        left, right = max(0, left - (right - width)), width
+    if bottom > height:
+        top, bottom = max(0, top - (bottom - height)), height
+    return left, top, right - left, bottom - top
+
+
+class DirtyRegionCapturer:
+    """Capture only the part of a monitor that changed since the last frame.
+
+    Each capture() grabs one raw frame for diffing, pads the bounding box
+    of the changed tiles, and crops and encodes just that area in memory
+    (no second grim call). Coordinates the VLM returns for the cropped
+    image map back to monitor space with the RegionCapture's transform:
+
+        capturer = DirtyRegionCapturer(monitor_index=0)
+        capture = capturer.capture()
+        if capture is not None:
+            x, y = parse_coordinates(answer_for(capture.image))
+            left_click(*capture.transform.to_monitor(x, y))
+    """
+
+    def __init__(self, monitor_index: int = 0, padding: int = 32, min_size: int = 128,
+                 full_frame_ratio: float = 0.6, format: str = 'png',
+                 detector: Optional[FrameChangeDetector] = None):
+        """Initialize capturer.
+
+        Args:
+            monitor_index: Monitor to watch
+            padding: Pixels of context added around the changed area
+            min_size: Minimum width/height of the captured region
+            full_frame_ratio: Capture the whole monitor once the region
+                covers more than this fraction of its area
+            format: Encoding of the cropped region ('png', 'jpeg', 'ppm' or 'raw')
+            detector: FrameChangeDetector to use (creates one if None)
+        """
+        self.monitor_index = monitor_index
+        self.padding = padding
+        self.min_size = min_size
+        self.full_frame_ratio = full_frame_ratio
+        self.format = format
+        self.detector = detector if detector is not None else FrameChangeDetector()
+
+    def capture(self, force: bool = False) -> Optional[RegionCapture]:
+        """Capture the changed region.
+
+        Args:
+            force: Return the full monitor even if nothing changed
+
+        Returns:
+            RegionCapture, or None if the screen is unchanged (and not forced)
+        """
+        from .screen import RawFrame, screenshot_monitor
+
+        frame = screenshot_monitor(self.monitor_index, format='raw')
+        change = self.detector.update(frame)
+        if not change.changed and not force:
+            return None
+
+        width, height = change.width, change.height
+        bbox = change.bounding_box if change.changed else None
+        if bbox is None:
+            bbox = (0, 0, width, height)
+        x, y, w, h = pad_region(bbox, self.padding, width, height, self.min_size)
+        if w * h > self.full_frame_ratio * width * height:
+            x, y, w, h = 0, 0, width, height
+
+        crop = np.ascontiguousarray(frame.pixels[y:y + h, x:x + w])
+        if self.format == 'raw':
+            image = RawFrame(crop, w, h)
+        else:
+            from .preprocess import prepare_image
+            image = prepare_image(crop, format=self.format).image
+        return RegionCapture(image, CoordinateTransform(x, y), change)
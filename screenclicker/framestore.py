@@ -0,0 +1,344 @@
+"""
+Deduplicating on-disk store for captured frames.
+
+Frames are split into fixed-size RGB tiles. Each distinct tile is written
+once to a pack file and shared by every frame containing it, so a run of
+near-identical screenshots costs one full frame plus the tiles that
+changed. Consecutive frames of the same size are diffed with NumPy and
+only changed tiles are hashed.
+
+Frames are keyed by a hash of their pixel content (the same screen
+captured as PNG or PPM gets the same key). Reads go through a shared
+read-only mmap of the pack file, so replay, caches and debugging tools
+can open the same store instead of each holding decoded copies. The store
+has a byte cap over unique tile data with LRU eviction of whole frames.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+PACK_FILE = 'tiles.pack'
+INDEX_FILE = 'index.json'
+
+# Freed pack space is reclaimed once it exceeds the live data and this floor
+_COMPACT_MIN_BYTES = 16 * 1024 * 1024
+
+
+def _tile_hash(tile: np.ndarray) -> str:
+    digest = hashlib.blake2b(tile.tobytes(), digest_size=16)
+    digest.update(f"{tile.shape[0]}x{tile.shape[1]}".encode())
+    return digest.hexdigest()
+
+
+def _changed_tiles(previous: np.ndarray, current: np.ndarray, tile_size: int) -> np.ndarray:
+    """Boolean (rows, cols) grid of tiles whose pixels differ."""
+    height, width = current.shape[:2]
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    # Compare whole rows of bytes; a tile spans tile_size * 3 bytes of a row
+    diff = (previous != current).reshape(height, width * 3)
+    padded = np.zeros((rows * tile_size, cols * tile_size * 3), dtype=bool)
+    padded[:height, :width * 3] = diff
+    return padded.reshape(rows, tile_size, cols, tile_size * 3).any(axis=(1, 3))
+
+
+class FrameStore:
+    """Tile-deduplicated frame store with LRU eviction.
+
+    Usage:
+        store = FrameStore("~/.cache/screenclicker/frames", max_bytes=256 * 1024 * 1024)
+        key = store.put(screenshot_monitor(0))
+        pixels = store.get(key)             # (height, width, 3) uint8
+        image = store.get_image(key, 'png')  # CapturedImage
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = 256 * 1024 * 1024,
+                 tile_size: int = 64):
+        """Initialize frame store.
+
+        Args:
+            path: Store directory, reopened if it exists (temporary directory
+                removed on close if None)
+            max_bytes: Cap on unique tile bytes; least recently used frames
+                are evicted beyond it (None = unbounded)
+            tile_size: Tile edge in pixels (fixed when the store is created)
+        """
+        self._temporary = path is None
+        self.path = tempfile.mkdtemp(prefix='screenclicker-frames-') if path is None else os.path.expanduser(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.tile_size = tile_size
+        self.evictions = 0
+
+        self._frames = OrderedDict()  # key -> {'width', 'height', 'tiles': [tile ids]}
+        self._tiles = {}              # tile id -> [hash, offset, nbytes, refs]
+        self._tile_ids = {}           # hash -> tile id
+        self._next_id = 0
+        self._pack_size = 0
+        self._live_bytes = 0
+        self._last = None             # (pixels, tile ids) of the previous put
+        self._map = None
+        self._lock = threading.RLock()
+
+        self._load_index()
+        self._pack = open(os.path.join(self.path, PACK_FILE), 'ab')
+        self._pack_size = self._pack.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def _load_index(self):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path) as f:
+            index = json.load(f)
+        self.tile_size = index['tile_size']
+        for tile_id, entry in index['tiles'].items():
+            tile_id = int(tile_id)
+            self._tiles[tile_id] = entry
+            self._tile_ids[entry[0]] = tile_id
+            self._live_bytes += entry[2]
+        self._next_id = max(self._tiles, default=-1) + 1
+        for key, frame in index['frames']:
+            self._frames[key] = frame
+
+    def flush(self):
+        """Write buffered tiles and the index to disk."""
+        with self._lock:
+            self._pack.flush()
+            index = {
+                'tile_size': self.tile_size,
+                'tiles': {str(tile_id): entry for tile_id, entry in self._tiles.items()},
+                'frames': list(self._frames.items()),
+            }
+            index_path = os.path.join(self.path, INDEX_FILE)
+            with open(index_path + '.tmp', 'w') as f:
+                json.dump(index, f)
+            os.replace(index_path + '.tmp', index_path)
+
+    def close(self):
+        """Flush and release the pack file (deleting a temporary store)."""
+        with self._lock:
+            if self._pack.closed:
+                return
+            if not self._temporary:
+                self.flush()
+            self._pack.close()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._temporary:
+                shutil.rmtree(self.path, ignore_errors=True)
+
+    def _add_tile(self, tile: np.ndarray) -> int:
+        digest = _tile_hash(tile)
+        tile_id = self._tile_ids.get(digest)
+        if tile_id is not None:
+            self._tiles[tile_id][3] += 1
+            return tile_id
+        data = np.ascontiguousarray(tile).tobytes()
+        tile_id = self._next_id
+        self._next_id += 1
+        self._tiles[tile_id] = [digest, self._pack_size, len(data), 1]
+        self._tile_ids[digest] = tile_id
+        self._pack.write(data)
+        self._pack_size += len(data)
+        self._live_bytes += len(data)
+        return tile_id
+
+    def _release_tile(self, tile_id: int):
+        entry = self._tiles[tile_id]
+        entry[3] -= 1
+        if entry[3] <= 0:
+            del self._tiles[tile_id]
+            del self._tile_ids[entry[0]]
+            self._live_bytes -= entry[2]
+
+    def put(self, frame) -> str:
+        """Store a frame, sharing tiles with frames already stored.
+
+        Args:
+            frame: Anything frame_to_array accepts (CapturedImage, RawFrame,
+                encoded bytes, ImagePayload, NumPy array)
+
+        Returns:
+            Content hash identifying the frame
+        """
+        from .frames import frame_to_array
+
+        source = frame_to_array(frame)
+        pixels = np.ascontiguousarray(source[..., :3], dtype=np.uint8)
+        if np.shares_memory(pixels, source):
+            # Kept for the next diff; the caller may reuse its buffer in place
+            pixels = pixels.copy()
+        height, width = pixels.shape[:2]
+        size = self.tile_size
+        with self._lock:
+            changed = None
+            if self._last is not None and self._last[0].shape == pixels.shape:
+                changed = _changed_tiles(self._last[0], pixels, size)
+                previous_ids = self._last[1]
+
+            tile_ids = []
+            hashes = []
+            for y in range(0, height, size):
+                for x in range(0, width, size):
+                    position = len(tile_ids)
+                    if changed is not None and not changed[y // size, x // size] \
+                            and previous_ids[position] in self._tiles:
+                        tile_id = previous_ids[position]
+                        self._tiles[tile_id][3] += 1
+                    else:
+                        tile_id = self._add_tile(pixels[y:y + size, x:x + size])
+                    tile_ids.append(tile_id)
+                    hashes.append(self._tiles[tile_id][0])
+
+            key = hashlib.blake2b(f"{width}x{height}:{size}:{''.join(hashes)}".encode(),
+                                  digest_size=20).hexdigest()
+            if key in self._frames:
+                for tile_id in tile_ids:
+                    self._release_tile(tile_id)
+                self._frames.move_to_end(key)
+                tile_ids = self._frames[key]['tiles']
+            else:
+                self._frames[key] = {'width': width, 'height': height, 'tiles': tile_ids}
+            self._last = (pixels, tile_ids)
+            self._evict(keep=key)
+        return key
+
+    def _evict(self, keep: str):
+        if self.max_bytes is None:
+            return
+        while self._live_bytes > self.max_bytes and len(self._frames) > 1:
+            key = next(iter(self._frames))
+            if key == keep:
+                self._frames.move_to_end(key)
+                continue
+            for tile_id in self._frames.pop(key)['tiles']:
+                self._release_tile(tile_id)
+            self.evictions += 1
+        free_bytes = self._pack_size - self._live_bytes
+        if free_bytes > max(self._live_bytes, _COMPACT_MIN_BYTES):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the pack file with only live tiles."""
+        self._pack.flush()
+        view = self._view()
+        pack_path = os.path.join(self.path, PACK_FILE)
+        offset = 0
+        with open(pack_path + '.tmp', 'wb') as f:
+            for entry in sorted(self._tiles.values(), key=lambda e: e[1]):
+                f.write(view[entry[1]:entry[1] + entry[2]])
+                entry[1] = offset
+                offset += entry[2]
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._pack.close()
+        os.replace(pack_path + '.tmp', pack_path)
+        self._pack = open(pack_path, 'ab')
+        self._pack_size = offset
+        if not self._temporary:
+            self.flush()
+
+    def _view(self) -> mmap.mmap:
+        """Read-only map of the pack file covering every written tile."""
+        if self._map is None or len(self._map) < self._pack_size:
+            self._pack.flush()
+            if self._map is not None:
+                self._map.close()
+            with open(os.path.join(self.path, PACK_FILE), 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def get(self, key: str) -> np.ndarray:
+        """Reassemble a stored frame.
+
+        Returns:
+            (height, width, 3) uint8 array
+
+        Raises:
+            KeyError: If the frame is not stored (or was evicted)
+        """
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                raise KeyError(f"Frame {key} not in store")
+            self._frames.move_to_end(key)
+            width, height, size = frame['width'], frame['height'], self.tile_size
+            view = self._view()
+            pixels = np.empty((height, width, 3), dtype=np.uint8)
+            tile_ids = iter(frame['tiles'])
+            for y in range(0, height, size):
+                for x in range(0, width, size):
+                    _, offset, _, _ = self._tiles[next(tile_ids)]
+                    tile_h, tile_w = min(size, height - y), min(size, width - x)
+                    pixels[y:y + tile_h, x:x + tile_w] = np.frombuffer(
+                        view, dtype=np.uint8, count=tile_h * tile_w * 3, offset=offset
+                    ).reshape(tile_h, tile_w, 3)
+            return pixels
+
+    def get_image(self, key: str, format: str = 'ppm'):
+        """Get a stored frame encoded as a CapturedImage ('ppm', 'png' or 'jpeg')."""
+        from .screen import CapturedImage
+
+        pixels = self.get(key)
+        height, width = pixels.shape[:2]
+        if format == 'ppm':
+            data = f"P6\n{width} {height}\n255\n".encode() + pixels.tobytes()
+        else:
+            import io
+            from PIL import Image
+            buffer = io.BytesIO()
+            Image.fromarray(pixels).save(buffer, format=format.upper())
+            data = buffer.getvalue()
+        return CapturedImage(data, width, height, format)
+
+    def keys(self) -> List[str]:
+        """Stored frame keys, least recently used first."""
+        with self._lock:
+            return list(self._frames)
+
+    def discard(self, key: str) -> bool:
+        """Remove a frame. Returns True if it was stored."""
+        with self._lock:
+            frame = self._frames.pop(key, None)
+            if frame is None:
+                return False
+            for tile_id in frame['tiles']:
+                self._release_tile(tile_id)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame and tile counts, stored bytes and deduplication ratio."""
+        with self._lock:
+            logical = sum(frame['width'] * frame['height'] * 3 for frame in self._frames.values())
+            return {
+                'frames': len(self._frames),
+                'tiles': len(self._tiles),
+                'stored_bytes': self._live_bytes,
+                'pack_bytes': self._pack_size,
+                'logical_bytes': logical,
+                'dedup_ratio': logical / self._live_bytes if self._live_bytes else 0.0,
+                'evictions': self.evictions,
+            }
@@ -1,86 +1,236 @@
 """Keyboard operations for ScreenClicker."""
 
 import time
+import atexit
+import threading
 import uinput
 
+from . import recorder, tracing
+
+# Default typing rate in keys per second
+DEFAULT_RATE = 200.0
+
+# Keys typed between rate-limiting sleeps
+DEFAULT_BATCH_SIZE = 8
+
+_LETTERS = {chr(c): getattr(uinput, f'KEY_{chr(c).upper()}') for c in range(ord('a'), ord('z') + 1)}
+_DIGITS = {str(d): getattr(uinput, f'KEY_{d}') for d in range(10)}
+
+# Character -> (key, needs_shift), US layout. Built once at import.
+_KEY_MAP = {}
+_KEY_MAP.update({char: (key, False) for char, key in _LETTERS.items()})
+_KEY_MAP.update({char.upper(): (key, True) for char, key in _LETTERS.items()})
+_KEY_MAP.update({char: (key, False) for char, key in _DIGITS.items()})
+_KEY_MAP.update({
+    ' ': (uinput.KEY_SPACE, False), '\n': (uinput.KEY_ENTER, False), '\t': (uinput.KEY_TAB, False),
+    "'": (uinput.KEY_APOSTROPHE, False), ',': (uinput.KEY_COMMA, False), '.': (uinput.KEY_DOT, False),
+    '-': (uinput.KEY_MINUS, False), '=': (uinput.KEY_EQUAL, False), '/': (uinput.KEY_SLASH, False),
+    ';': (uinput.KEY_SEMICOLON, False), '[': (uinput.KEY_LEFTBRACE, False), ']': (uinput.KEY_RIGHTBRACE, False),
+    '\\': (uinput.KEY_BACKSLASH, False), '`': (uinput.KEY_GRAVE, False),
+    '!': (uinput.KEY_1, True), '@': (uinput.KEY_2, True), '#': (uinput.KEY_3, True),
+    '$': (uinput.KEY_4, True), '%': (uinput.KEY_5, True), '^': (uinput.KEY_6, True),
+    '&': (uinput.KEY_7, True), '*': (uinput.KEY_8, True), '(': (uinput.KEY_9, True),
+    ')': (uinput.KEY_0, True), '"': (uinput.KEY_APOSTROPHE, True), '<': (uinput.KEY_COMMA, True),
+    '>': (uinput.KEY_DOT, True), '_': (uinput.KEY_MINUS, True), '+': (uinput.KEY_EQUAL, True),
+    '?': (uinput.KEY_SLASH, True), ':': (uinput.KEY_SEMICOLON, True), '{': (uinput.KEY_LEFTBRACE, True),
+    '}': (uinput.KEY_RIGHTBRACE, True), '|': (uinput.KEY_BACKSLASH, True), '~': (uinput.KEY_GRAVE, True),
+})
+
+# Every key the virtual keyboard can emit
+_DEVICE_KEYS = sorted(
+    {key for key, _ in _KEY_MAP.values()}
+    | {uinput.KEY_LEFTSHIFT, uinput.KEY_RIGHTSHIFT, uinput.KEY_BACKSPACE}
+)
+
 
 def _create_keyboard_device():
     """Create virtual keyboard device."""
     try:
-        return uinput.Device([
-            uinput.KEY_A, uinput.KEY_B, uinput.KEY_C, uinput.KEY_D, uinput.KEY_E,
-            uinput.KEY_F, uinput.KEY_G, uinput.KEY_H, uinput.KEY_I, uinput.KEY_J,
-            uinput.KEY_K, uinput.KEY_L, uinput.KEY_M, uinput.KEY_N, uinput.KEY_O,
-            uinput.KEY_P, uinput.KEY_Q, uinput.KEY_R, uinput.KEY_S, uinput.KEY_T,
-            uinput.KEY_U, uinput.KEY_V, uinput.KEY_W, uinput.KEY_X, uinput.KEY_Y,
-            uinput.KEY_Z,
-            uinput.KEY_0, uinput.KEY_1, uinput.KEY_2, uinput.KEY_3, uinput.KEY_4,
-            uinput.KEY_5, uinput.KEY_6, uinput.KEY_7, uinput.KEY_8, uinput.KEY_9,
-            uinput.KEY_SPACE, uinput.KEY_ENTER, uinput.KEY_BACKSPACE,
-            uinput.KEY_LEFTSHIFT, uinput.KEY_RIGHTSHIFT,
-            uinput.KEY_APOSTROPHE, uinput.KEY_COMMA, uinput.KEY_DOT,
-            uinput.KEY_MINUS, uinput.KEY_EQUAL, uinput.KEY_SLASH,
-            uinput.KEY_SEMICOLON, uinput.KEY_LEFTBRACE, uinput.KEY_RIGHTBRACE,
-        ])
+        return uinput.Device(_DEVICE_KEYS)
     except PermissionError:
         raise PermissionError("uinput keyboard access denied. Check permissions.")
     except Exception as e:
         raise RuntimeError(f"Failed to create keyboard device: {e}")
 
 
-def _uinput_type_char(device, char):
-    """Type a single character using uinput."""
-    char_map = {
-        'a': uinput.KEY_A, 'b': uinput.KEY_B, 'c': uinput.KEY_C, 'd': uinput.KEY_D, 'e': uinput.KEY_E,
-        'f': uinput.KEY_F, 'g': uinput.KEY_G, 'h': uinput.KEY_H, 'i': uinput.KEY_I, 'j': uinput.KEY_J,
-        'k': uinput.KEY_K, 'l': uinput.KEY_L, 'm': uinput.KEY_M, 'n': uinput.KEY_N, 'o': uinput.KEY_O,
-        'p': uinput.KEY_P, 'q': uinput.KEY_Q, 'r': uinput.KEY_R, 's': uinput.KEY_S, 't': uinput.KEY_T,
-        'u': uinput.KEY_U, 'v': uinput.KEY_V, 'w': uinput.KEY_W, 'x': uinput.KEY_X, 'y': uinput.KEY_Y,
-        'z': uinput.KEY_Z,
-        '0': uinput.KEY_0, '1': uinput.KEY_1, '2': uinput.KEY_2, '3': uinput.KEY_3, '4': uinput.KEY_4,
-        '5': uinput.KEY_5, '6': uinput.KEY_6, '7': uinput.KEY_7, '8': uinput.KEY_8, '9': uinput.KEY_9,
-        ' ': uinput.KEY_SPACE, "'": uinput.KEY_APOSTROPHE, ',': uinput.KEY_COMMA,
-        '.': uinput.KEY_DOT, '-': uinput.KEY_MINUS, '=': uinput.KEY_EQUAL, '/': uinput.KEY_SLASH,
-        ';': uinput.KEY_SEMICOLON, '[': uinput.KEY_LEFTBRACE, ']': uinput.KEY_RIGHTBRACE,
-    }
-    
-    # Handle uppercase letters (need shift)
-    if char.isupper():
-        char_lower = char.lower()
-        if char_lower in char_map:
-            device.emit(uinput.KEY_LEFTSHIFT, 1)
-            device.emit(char_map[char_lower], 1)
-            device.syn()
-            time.sleep(0.01)
-            device.emit(char_map[char_lower], 0)
-            device.emit(uinput.KEY_LEFTSHIFT, 0)
-            device.syn()
-            return True
-    
-    # Handle regular characters
-    if char in char_map:
-        device.emit(char_map[char], 1)
-        device.syn()
-        time.sleep(0.01)
-        device.emit(char_map[char], 0)
-        device.syn()
-        return True
-    
-    # Skip unsupported characters
-    return False
-
-
-def text(string):
-    """Type text string using uinput."""
-    device = _create_keyboard_device()
+def _uinput_type_char(device, char, press_delay=0.01):
+    """Type a single character using uinput (press and release synced separately)."""
+    mapping = _KEY_MAP.get(char)
+    if mapping is None:
+        # Skip unsupported characters
+        return False
+
+    key, shift = mapping
+    if shift:
+        device.emit(uinput.KEY_LEFTSHIFT, 1, syn=False)
+    device.emit(key, 1)
+    if press_delay:
+        time.sleep(press_delay)
+    device.emit(key, 0, syn=False)
+    if shift:
+        device.emit(uinput.KEY_LEFTSHIFT, 0, syn=False)
+    device.syn()
+    return True
+
+
+class VirtualKeyboard:
+    """Long-lived uinput keyboard device.
+
+    The device is created once and reused for every call. Typing is
+    batched: releasing one key and pressing the next share a single sync,
+    and the rate limit sleeps once per batch instead of per key.
+
+    Usage:
+        with VirtualKeyboard(rate=500) as kb:
+            kb.type("hello world")
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 init_delay: float = 0.05):
+        """Initialize virtual keyboard.
+
+        Args:
+            rate: Typing rate in keys per second (None or 0 = unthrottled)
+            batch_size: Keys emitted between rate-limiting sleeps
+            init_delay: Seconds to wait after creating the device (paid once)
+        """
+        self.rate = rate
+        self.batch_size = batch_size
+        self.init_delay = init_delay
+        self._device = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Create the device now instead of on first use."""
+        with self._lock:
+            self._ensure_device()
+
+    def close(self):
+        """Destroy the underlying uinput device."""
+        with self._lock:
+            if self._device is not None:
+                try:
+                    self._device.destroy()
+                finally:
+                    self._device = None
+
+    def _ensure_device(self):
+        if self._device is None:
+            self._device = _create_keyboard_device()
+            if self.init_delay:
+                time.sleep(self.init_delay)
+        return self._device
+
+    def type(self, string: str, rate: float = None, batched: bool = True) -> int:
+        """Type a string.
+
+        Args:
+            string: Text to type; unsupported characters are skipped
+            rate: Keys per second (uses the keyboard default if None)
+            batched: Share syncs between consecutive keys. If False, every
+                press and release is synced separately with a short hold.
+
+        Returns:
+            Number of characters typed
+        """
+        rate = self.rate if rate is None else rate
+        with self._lock:
+            device = self._ensure_device()
+            if batched:
+                return self._type_batched(device, string, rate)
+
+            typed = 0
+            interval = 1.0 / rate if rate else 0.0
+            for char in string:
+                if _uinput_type_char(device, char):
+                    typed += 1
+                    if interval:
+                        time.sleep(interval)
+            return typed
+
+    def _type_batched(self, device, string, rate):
+        batch_period = self.batch_size / rate if rate else 0.0
+        batch_start = time.monotonic()
+        held_key = None
+        shift_down = False
+        typed = 0
+
+        try:
+            for char in string:
+                mapping = _KEY_MAP.get(char)
+                if mapping is None:
+                    continue
+                key, shift = mapping
+
+                # Release the previous key in the same frame as the next press
+                if held_key is not None:
+                    device.emit(held_key, 0, syn=False)
+                    if held_key == key:
+                        device.syn()  # Same key again needs its own frame
+                if shift != shift_down:
+                    device.emit(uinput.KEY_LEFTSHIFT, int(shift), syn=False)
+                    shift_down = shift
+                device.emit(key, 1, syn=False)
+                device.syn()
+                held_key = key
+                typed += 1
+
+                if batch_period and typed % self.batch_size == 0:
+                    remaining = batch_start + batch_period - time.monotonic()
+                    if remaining > 0:
+                        time.sleep(remaining)
+                    batch_start = time.monotonic()
+        finally:
+            if held_key is not None:
+                device.emit(held_key, 0, syn=False)
+            if shift_down:
+                device.emit(uinput.KEY_LEFTSHIFT, 0, syn=False)
+            if held_key is not None or shift_down:
+                device.syn()
+        return typed
+
+
+# Shared device used by text(), created on first use
+_virtual_keyboard = None
+_virtual_keyboard_lock = threading.Lock()
+
+
+def get_virtual_keyboard() -> VirtualKeyboard:
+    """Get the shared VirtualKeyboard used by text()."""
+    global _virtual_keyboard
+    with _virtual_keyboard_lock:
+        if _virtual_keyboard is None:
+            _virtual_keyboard = VirtualKeyboard()
+            atexit.register(_virtual_keyboard.close)
+        return _virtual_keyboard
+
+
+def text(string, rate=None):
+    """Type text string using the shared uinput keyboard.
+
+    Args:
+        string: Text to type; unsupported characters are skipped
+        rate: Keys per second (default: DEFAULT_RATE)
+
+    Returns:
+        True if typed, False if writing key events failed
+
+    Raises:
+        PermissionError, RuntimeError: If the uinput device can't be created
+    """
+    keyboard = get_virtual_keyboard()
+    keyboard.open()  # Device setup errors propagate, as before
     try:
-        for char in string:
-            if not _uinput_type_char(device, char):
-                # Skip unsupported characters silently
-                continue
-            time.sleep(0.02)  # Small delay between characters
-        return True
-    except Exception as e:
+        with tracing.span('input.text', chars=len(string)):
+            keyboard.type(string, rate)
+    except OSError:
         return False
-    finally:
-        device.destroy()
\ No newline at end of file
+    recorder.record_action('type', text=string)
+    return True
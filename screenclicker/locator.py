@@ -0,0 +1,312 @@
+"""
+Template matching for targets the VLM has already found.
+
+After a VLM locates an element, TemplateLocator keeps a small crop of the
+frame around the clicked point, keyed by the command. The next time the
+same command runs, the crop is searched for in the fresh frame with
+normalized cross-correlation (NumPy FFTs): first near where it was last
+seen, then across a subsampled copy of the whole frame. A confident match
+costs milliseconds; anything below the threshold falls back to the VLM.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .frames import frame_to_array
+
+# Coarse peaks refined at full resolution in the whole-frame search
+_COARSE_CANDIDATES = 4
+
+
+class TemplateMatch(NamedTuple):
+    """Located target in monitor coordinates."""
+    x: int
+    y: int
+    score: float
+
+
+def normalize_command(command: str) -> str:
+    """Lowercase and collapse whitespace so trivial variations share templates."""
+    return re.sub(r'\s+', ' ', command.strip().lower())
+
+
+def _gray(pixels: np.ndarray) -> np.ndarray:
+    if pixels.ndim == 2:
+        return pixels.astype(np.float32)
+    return (pixels[..., 0].astype(np.float32) + pixels[..., 1] + pixels[..., 2]) / 3
+
+
+def _fast_length(n: int) -> int:
+    """Smallest 5-smooth number >= n (FFT sizes with large prime factors are slow)."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _window_sums(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Sum of every height x width window (valid positions) via an integral image."""
+    integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.float64), axis=1, out=integral[1:, 1:])
+    return (integral[height:, width:] - integral[:-height, width:]
+            - integral[height:, :-width] + integral[:-height, :-width])
+
+
+def match_template(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """Zero-mean normalized cross-correlation of template over image.
+
+    Args:
+        image: 2D grayscale array
+        template: 2D grayscale array no larger than image
+
+    Returns:
+        Scores in [-1, 1] for every position where the template fits,
+        shape (H - h + 1, W - w + 1); flat windows score 0
+    """
+    image = image.astype(np.float64)
+    template = template.astype(np.float64)
+    h, w = template.shape
+    H, W = image.shape
+    if h > H or w > W:
+        return np.zeros((0, 0))
+
+    centered = template - template.mean()
+    template_norm = np.sqrt((centered ** 2).sum())
+    if template_norm == 0:
+        return np.zeros((H - h + 1, W - w + 1))
+
+    shape = (_fast_length(H), _fast_length(W))
+    spectrum = np.fft.rfft2(image, shape) * np.conj(np.fft.rfft2(centered, shape))
+    numerator = np.fft.irfft2(spectrum, shape)[:H - h + 1, :W - w + 1]
+
+    count = h * w
+    sums = _window_sums(image, h, w)
+    squares = _window_sums(image ** 2, h, w)
+    variance = np.maximum(squares - sums ** 2 / count, 0)
+    denominator = np.sqrt(variance) * template_norm
+    scores = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=scores, where=denominator > 1e-6 * template_norm)
+    return scores
+
+
+def _peaks(scores: np.ndarray, shape, count: int):
+    """Up to count (x, y, score) maxima at least half a template apart."""
+    if scores.size == 0:
+        return []
+    scores = scores.copy()
+    h, w = shape
+    peaks = []
+    for _ in range(count):
+        row, col = np.unravel_index(np.argmax(scores), scores.shape)
+        score = float(scores[row, col])
+        if score <= 0:
+            break
+        peaks.append((int(col), int(row), score))
+        scores[max(0, row - h // 2):row + h // 2 + 1, max(0, col - w // 2):col + w // 2 + 1] = -1
+    return peaks
+
+
+class TemplateLocator:
+    """Command -> template crops, matched against fresh frames.
+
+    Usage:
+        locator = TemplateLocator("~/.cache/screenclicker/locator.npz")
+        match = locator.locate("click the stoke fire button", frame)
+        if match is None:
+            x, y = ask_vlm(...)
+            locator.remember("click the stoke fire button", frame, x, y)
+            locator.save()
+    """
+
+    def __init__(self, path: Optional[str] = None, radius: int = 32, threshold: float = 0.9,
+                 search_margin: int = 96, scale: int = 4, max_templates: int = 4,
+                 min_margin: float = 0.05):
+        """Initialize locator.
+
+        Args:
+            path: .npz file templates are loaded from and saved to (memory only if None)
+            radius: Half the side of the crop kept around a clicked point
+            threshold: Minimum correlation score to trust a match
+            search_margin: Pixels around the last known position searched first
+            scale: Subsampling factor for the coarse whole-frame search
+            max_templates: Crops kept per command (oldest dropped first)
+            min_margin: Lead the best whole-frame match needs over any other
+                position; repeated elements (rows of identical buttons)
+                are ambiguous and left to the VLM
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.radius = radius
+        self.threshold = threshold
+        self.search_margin = search_margin
+        self.scale = max(1, scale)
+        self.max_templates = max_templates
+        self.min_margin = min_margin
+        self.hits = 0
+        self.misses = 0
+        # command -> list of {'template', 'offset': (dx, dy), 'point': (x, y)}
+        self._entries: Dict[str, List[dict]] = {}
+        self._lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            self._load()
+
+    def __contains__(self, command):
+        return normalize_command(command) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def remember(self, command: str, frame, x: int, y: int) -> bool:
+        """Keep a crop around (x, y) as a template for command.
+
+        Args:
+            command: Natural-language command the point answers
+            frame: Frame the point was found on (anything frame_to_array accepts)
+            x, y: Target in frame (monitor) coordinates
+
+        Returns:
+            False if the crop has no texture to match on (not stored)
+        """
+        pixels = frame_to_array(frame)
+        height, width = pixels.shape[:2]
+        left, top = max(0, x - self.radius), max(0, y - self.radius)
+        right, bottom = min(width, x + self.radius), min(height, y + self.radius)
+        if right - left < 8 or bottom - top < 8:
+            return False
+        template = np.round(_gray(pixels[top:bottom, left:right])).astype(np.uint8)
+        if template.std() < 2:
+            return False  # Flat crops match anywhere
+
+        entry = {'template': template, 'offset': (x - left, y - top), 'point': (x, y)}
+        with self._lock:
+            entries = self._entries.setdefault(normalize_command(command), [])
+            entries.insert(0, entry)
+            del entries[self.max_templates:]
+        return True
+
+    def forget(self, command: str) -> bool:
+        """Drop templates for command. Returns True if there were any."""
+        with self._lock:
+            return self._entries.pop(normalize_command(command), None) is not None
+
+    def locate(self, command: str, frame) -> Optional[TemplateMatch]:
+        """Find a remembered target in frame.
+
+        Args:
+            command: Command passed to remember()
+            frame: Fresh frame (anything frame_to_array accepts)
+
+        Returns:
+            TemplateMatch in monitor coordinates, or None if there is no
+            template or no match reaches the threshold
+        """
+        with self._lock:
+            entries = list(self._entries.get(normalize_command(command), ()))
+        if not entries:
+            return None
+
+        pixels = frame_to_array(frame)
+        coarse = []  # Downscaled frame, built once if any template needs it
+        best = None
+        for entry in entries:
+            match = self._search_near(pixels, entry)
+            if match is None or match.score < self.threshold:
+                match = self._search_frame(pixels, entry, coarse)
+            if match is not None and (best is None or match.score > best.score):
+                best = match
+            if best is not None and best.score >= self.threshold:
+                break
+
+        if best is None or best.score < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return best
+
+    def _search_near(self, pixels: np.ndarray, entry: dict) -> Optional[TemplateMatch]:
+        template = entry['template']
+        dx, dy = entry['offset']
+        x, y = entry['point']
+        h, w = template.shape
+        left = max(0, x - dx - self.search_margin)
+        top = max(0, y - dy - self.search_margin)
+        window = pixels[top:y - dy + h + self.search_margin, left:x - dx + w + self.search_margin]
+        return self._best(_gray(window), template, left, top, dx, dy)
+
+    def _search_frame(self, pixels: np.ndarray, entry: dict, coarse: list) -> Optional[TemplateMatch]:
+        template = entry['template']
+        dx, dy = entry['offset']
+        s = self.scale
+        if s == 1 or min(template.shape) < 4 * s:
+            matches = _peaks(match_template(_gray(pixels), template), template.shape, 2)
+            matches = [TemplateMatch(x + dx, y + dy, score) for x, y, score in matches]
+        else:
+            # Coarse candidates on subsampled copies, each refined at full resolution
+            if not coarse:
+                coarse.append(_gray(pixels[::s, ::s]))
+            small = template[::s, ::s]
+            h, w = template.shape
+            matches = []
+            for x, y, _ in _peaks(match_template(coarse[0], small), small.shape, _COARSE_CANDIDATES):
+                left, top = max(0, x * s - s), max(0, y * s - s)
+                window = pixels[top:top + h + 2 * s, left:left + w + 2 * s]
+                match = self._best(_gray(window), template, left, top, dx, dy)
+                if match is not None and all((m.x, m.y) != (match.x, match.y) for m in matches):
+                    matches.append(match)
+        if not matches:
+            return None
+        matches.sort(key=lambda m: m.score, reverse=True)
+        if len(matches) > 1 and matches[1].score > matches[0].score - self.min_margin:
+            return None  # Ambiguous: another position matches about as well
+        return matches[0]
+
+    @staticmethod
+    def _best(image, template, left, top, dx, dy) -> Optional[TemplateMatch]:
+        scores = match_template(image, template)
+        if scores.size == 0:
+            return None
+        row, col = np.unravel_index(np.argmax(scores), scores.shape)
+        return TemplateMatch(int(left + col + dx), int(top + row + dy), float(scores[row, col]))
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and number of remembered commands."""
+        return {'commands': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def save(self, path: Optional[str] = None):
+        """Write templates to an .npz file (the locator's path by default)."""
+        path = os.path.expanduser(path) if path else self.path
+        if path is None:
+            raise ValueError("No path to save templates to")
+        arrays = {}
+        meta = {}
+        with self._lock:
+            for command, entries in self._entries.items():
+                meta[command] = []
+                for entry in entries:
+                    name = f"t{len(arrays)}"
+                    arrays[name] = entry['template']
+                    meta[command].append({'array': name, 'offset': entry['offset'], 'point': entry['point']})
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, __meta__=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        with np.load(self.path) as data:
+            meta = json.loads(str(data['__meta__']))
+            for command, entries in meta.items():
+                self._entries[command] = [
+                    {'template': data[e['array']], 'offset': tuple(e['offset']), 'point': tuple(e['point'])}
+                    for e in entries
+                ]
+
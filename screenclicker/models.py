@@ -0,0 +1,182 @@
+"""
+Keep the VLM resident in Ollama so requests never pay a cold load.
+
+Ollama unloads a model after its keep_alive expires (5 minutes by
+default) and the next request waits for it to load again. ModelManager
+preloads the model with a longer keep_alive, refreshes it with empty
+requests from a background thread, and reports what is loaded.
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any, List, Union
+
+from .config import get_config
+
+
+def _normalize_model(name: str) -> str:
+    """'llava' and 'llava:latest' name the same model."""
+    return name if ':' in name else f"{name}:latest"
+
+
+class ModelManager:
+    """Preload a model and keep it loaded.
+
+    Usage:
+        manager = ModelManager(keep_alive="30m", ping_interval=240)
+        manager.warmup()   # At agent start; blocks until the model is loaded
+        manager.start()    # Background keep-alive pings
+        ...
+        manager.stop()
+    """
+
+    def __init__(self, model: Optional[str] = None, client=None,
+                 keep_alive: Union[float, str] = "30m", ping_interval: Optional[float] = 240.0):
+        """Initialize manager.
+
+        Args:
+            model: Model to keep loaded (uses global config default if None, which
+                is also what describe_image() and run.py use)
+            client: OllamaClient or OllamaPool (shared client for the configured host if None)
+            keep_alive: How long Ollama keeps the model after each request
+                (seconds, duration string like "30m", or -1 for forever)
+            ping_interval: Seconds between keep-alive pings (None disables the thread)
+        """
+        from .ollama_client import get_client
+        self.model = model if model is not None else get_config().model
+        self.client = client if client is not None else get_client()
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self.last_load_time = None
+        self.last_ping = None
+        self.ping_errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.warmup()
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _clients(self) -> list:
+        """Every server behind the client (one per OllamaPool endpoint)."""
+        endpoints = getattr(self.client, 'endpoints', None)
+        return [endpoint.client for endpoint in endpoints] if endpoints else [self.client]
+
+    def preload(self) -> float:
+        """Load the model (no-op if loaded) and reset its keep_alive timer.
+
+        An empty prompt makes Ollama load the model without generating.
+        With an OllamaPool every endpoint is preloaded.
+
+        Returns:
+            Seconds the request took (includes load time if it was cold)
+
+        Raises:
+            RuntimeError: If the request fails
+        """
+        start = time.monotonic()
+        try:
+            for client in self._clients():
+                client.generate(self.model, "", system_prompt="", keep_alive=self.keep_alive)
+        except Exception as e:
+            raise RuntimeError(f"Failed to preload model {self.model}: {e}")
+        self.last_ping = time.monotonic()
+        return self.last_ping - start
+
+    def warmup(self, image=None) -> float:
+        """Load the model and optionally run one tiny vision request.
+
+        The vision request also warms the image encoder path, so the first
+        real screenshot query runs at steady-state speed.
+
+        Args:
+            image: Image (ImagePayload, bytes, ...) for a one-token warm request
+
+        Returns:
+            Seconds spent warming up
+        """
+        elapsed = self.preload()
+        if image is not None:
+            start = time.monotonic()
+            try:
+                self.client.generate(self.model, "Describe the image in one word.", system_prompt="",
+                                     images=[image], keep_alive=self.keep_alive,
+                                     options={'num_predict': 1})
+            except Exception as e:
+                raise RuntimeError(f"Failed to warm up model {self.model}: {e}")
+            elapsed += time.monotonic() - start
+        self.last_load_time = elapsed
+        return elapsed
+
+    def unload(self):
+        """Ask Ollama to unload the model now."""
+        self.stop()
+        try:
+            for client in self._clients():
+                client.generate(self.model, "", system_prompt="", keep_alive=0)
+        except Exception as e:
+            raise RuntimeError(f"Failed to unload model {self.model}: {e}")
+
+    def loaded_models(self) -> List[Dict[str, Any]]:
+        """Get the models Ollama currently has in memory (via ps)."""
+        return list(self.client.ps()['models'])
+
+    def is_loaded(self) -> bool:
+        """True if the managed model is currently in memory."""
+        target = _normalize_model(self.model)
+        return any(_normalize_model(entry['model']) == target for entry in self.loaded_models())
+
+    def status(self) -> Dict[str, Any]:
+        """Report load state of the managed model.
+
+        Returns:
+            Dict with model, loaded, expires_at and size_vram (from ps),
+            capabilities (from show), pinging and last_load_time
+        """
+        target = _normalize_model(self.model)
+        entry = next((m for m in self.loaded_models() if _normalize_model(m['model']) == target), None)
+        try:
+            capabilities = self.client.show(self.model).get('capabilities')
+        except Exception:
+            capabilities = None
+        return {
+            'model': self.model,
+            'loaded': entry is not None,
+            'expires_at': entry.get('expires_at') if entry is not None else None,
+            'size_vram': entry.get('size_vram') if entry is not None else None,
+            'capabilities': capabilities,
+            'pinging': self.running,
+            'last_load_time': self.last_load_time,
+        }
+
+    @property
+    def running(self) -> bool:
+        """True while the keep-alive thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start periodic keep-alive pings in a background thread."""
+        if self.ping_interval is None or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._ping_loop, name="screenclicker-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the keep-alive thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _ping_loop(self):
+        while not self._stop.wait(self.ping_interval):
+            try:
+                self.preload()
+            except RuntimeError:
+                # Server may be restarting; the next ping reloads the model
+                self.ping_errors += 1
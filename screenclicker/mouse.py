@@ -9,9 +9,13 @@ The click functions automatically offset to global screen coordinates.
 """
 
 import time
+import atexit
+import threading
 import uinput
 import subprocess
 
+from . import recorder, tracing
+
 # Default monitor index (0 = first monitor in list)
 _target_monitor = 0
 
@@ -27,10 +31,11 @@ def get_target_monitor() -> int:
     return _target_monitor
 
 
-def _get_monitor_info(monitor_index: int = None):
+def _get_monitor_info(monitor_index: int = None, screen_info=None):
     """Get monitor info including global offset."""
-    from .screen import get_screen_info
-    screen_info = get_screen_info()
+    if screen_info is None:
+        from .screen import get_screen_info
+        screen_info = get_screen_info()
 
     if not screen_info['monitors']:
         return {'x': 0, 'y': 0, 'width': 1920, 'height': 1200}
@@ -42,10 +47,11 @@ def _get_monitor_info(monitor_index: int = None):
     return screen_info['monitors'][idx]
 
 
-def _get_total_screen_size():
+def _get_total_screen_size(screen_info=None):
     """Get total screen dimensions across all monitors."""
-    from .screen import get_screen_info
-    screen_info = get_screen_info()
+    if screen_info is None:
+        from .screen import get_screen_info
+        screen_info = get_screen_info()
 
     if not screen_info['monitors']:
         return 1920, 1200
@@ -59,10 +65,11 @@ def _get_total_screen_size():
     return max_x, max_y
 
 
-def _create_mouse_device():
+def _create_mouse_device(max_x=None, max_y=None):
     """Create virtual mouse device with total screen dimensions."""
     try:
-        max_x, max_y = _get_total_screen_size()
+        if max_x is None or max_y is None:
+            max_x, max_y = _get_total_screen_size()
 
         return uinput.Device([
             uinput.BTN_LEFT,
@@ -76,33 +83,140 @@ def _create_mouse_device():
         raise RuntimeError(f"Failed to create mouse device: {e}")
 
 
+class VirtualMouse:
+    """Long-lived uinput mouse device.
+
+    The device is created once, sized to the combined monitor layout, and
+    only rebuilt when the monitor topology changes. The init delay is paid
+    once at creation instead of on every click.
+
+    Usage:
+        with VirtualMouse() as mouse:
+            mouse.click(100, 200)
+    """
+
+    def __init__(self, init_delay: float = 0.1, move_delay: float = 0.0, press_delay: float = 0.0):
+        """Initialize virtual mouse.
+
+        Args:
+            init_delay: Seconds to wait after creating the device so the
+                compositor picks it up (paid once per device)
+            move_delay: Seconds between moving and pressing
+            press_delay: Seconds between press and release
+        """
+        self.init_delay = init_delay
+        self.move_delay = move_delay
+        self.press_delay = press_delay
+        self._device = None
+        self._size = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Create the device now instead of on first use."""
+        from .screen import get_monitor_topology
+        with self._lock:
+            self._ensure_device(get_monitor_topology())
+
+    def close(self):
+        """Destroy the underlying uinput device."""
+        with self._lock:
+            self._destroy_device()
+
+    def _destroy_device(self):
+        if self._device is not None:
+            try:
+                self._device.destroy()
+            finally:
+                self._device = None
+                self._size = None
+
+    def _ensure_device(self, topology):
+        """Return current screen info, rebuilding the device if the layout changed."""
+        screen_info = topology.get()
+        if self._device is not None and topology.generation == self._generation:
+            return screen_info
+
+        size = _get_total_screen_size(screen_info)
+        if self._device is None or size != self._size:
+            self._destroy_device()
+            self._device = _create_mouse_device(*size)
+            self._size = size
+            if self.init_delay:
+                time.sleep(self.init_delay)  # Let device initialize
+        self._generation = topology.generation
+        return screen_info
+
+    def move(self, x, y, monitor_index=None):
+        """Move the pointer to coordinates relative to the target monitor."""
+        from .screen import get_monitor_topology
+        with self._lock:
+            screen_info = self._ensure_device(get_monitor_topology())
+            self._move(x, y, monitor_index, screen_info)
+        return True
+
+    def _move(self, x, y, monitor_index, screen_info):
+        monitor = _get_monitor_info(monitor_index, screen_info)
+        self._device.emit(uinput.ABS_X, monitor['x'] + x, syn=False)
+        self._device.emit(uinput.ABS_Y, monitor['y'] + y, syn=True)
+
+    def click(self, x, y, button=uinput.BTN_LEFT, monitor_index=None):
+        """Click at coordinates relative to the target monitor.
+
+        Args:
+            x, y: Coordinates relative to target monitor
+            button: uinput button constant
+            monitor_index: Override target monitor (uses default if None)
+        """
+        from .screen import get_monitor_topology
+        with self._lock:
+            screen_info = self._ensure_device(get_monitor_topology())
+            self._move(x, y, monitor_index, screen_info)
+            if self.move_delay:
+                time.sleep(self.move_delay)
+
+            self._device.emit(button, 1)  # Press
+            if self.press_delay:
+                time.sleep(self.press_delay)
+            self._device.emit(button, 0)  # Release
+        return True
+
+
+# Shared device used by left_click/right_click, created on first click
+_virtual_mouse = None
+_virtual_mouse_lock = threading.Lock()
+
+
+def get_virtual_mouse() -> VirtualMouse:
+    """Get the shared VirtualMouse used by the click functions."""
+    global _virtual_mouse
+    with _virtual_mouse_lock:
+        if _virtual_mouse is None:
+            _virtual_mouse = VirtualMouse()
+            atexit.register(_virtual_mouse.close)
+        return _virtual_mouse
+
+
 def _click_uinput(x, y, button, monitor_index=None):
-    """Click at coordinates using uinput virtual device.
+    """Click at coordinates using the shared uinput virtual device.
 
     Args:
         x, y: Coordinates relative to target monitor
         button: uinput button constant
         monitor_index: Override target monitor (uses default if None)
     """
-    # Get monitor offset
-    monitor = _get_monitor_info(monitor_index)
-    global_x = monitor['x'] + x
-    global_y = monitor['y'] + y
-
-    device = _create_mouse_device()
-    time.sleep(0.1)  # Let device initialize
-
-    # Move to global position
-    device.emit(uinput.ABS_X, global_x, syn=False)
-    device.emit(uinput.ABS_Y, global_y, syn=True)
-    time.sleep(0.05)
-
-    # Click
-    device.emit(button, 1)  # Press
-    time.sleep(0.02)
-    device.emit(button, 0)  # Release
-
-    return True
+    with tracing.span('input.click', x=x, y=y):
+        result = get_virtual_mouse().click(x, y, button, monitor_index)
+    recorder.record_action('right_click' if button == uinput.BTN_RIGHT else 'click',
+                           x=x, y=y, monitor=monitor_index)
+    return result
 
 
 def right_click(x, y, monitor_index=None):
@@ -142,6 +256,7 @@ def move_mouse(x, y, monitor_index=None):
         )
         if result.returncode != 0:
             raise RuntimeError(f"ydotool failed (is ydotoold running?): {result.stderr}")
+        recorder.record_action('move', x=x, y=y, monitor=monitor_index)
         return True
     except FileNotFoundError:
         raise RuntimeError("ydotool not found. Install with: sudo apt install ydotool")
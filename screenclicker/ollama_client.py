@@ -4,27 +4,292 @@ Ollama client module for local LLM interactions.
 
 import ollama
 import base64
-from typing import Optional, Dict, Any, List, Union
+import hashlib
+import asyncio
+import json
+import threading
+import time
+from typing import Optional, Dict, Any, List, Union, Sequence
 from .config import get_config
+from .response_cache import ResponseCache
+from . import recorder, tracing
+from .actions import ACTION_SCHEMA, Action, parse_action
+
+
+class ImagePayload:
+    """Image bytes with a memoized base64 form and content hash.
+    
+    Wrap a screenshot once and pass the payload to every VLM call on that
+    frame; the base64 encoding and hash are computed on first use only.
+    
+    Usage:
+        payload = ImagePayload(screenshot_monitor(0))
+        client.chat(model, messages, images=[payload])
+    """
+    
+    def __init__(self, data: bytes):
+        """Initialize payload.
+        
+        Args:
+            data: Encoded image bytes (e.g. PNG); kept without copying
+        """
+        if isinstance(data, ImagePayload):
+            data = data.data
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError(f"Image data must be bytes, got: {type(data)}")
+        self.data = data
+        self._base64 = None
+        self._hash = None
+    
+    @classmethod
+    def from_path(cls, file_path: str) -> 'ImagePayload':
+        """Load a payload from an image file."""
+        return cls(data_from_path(file_path))
+    
+    @classmethod
+    def from_base64(cls, encoded: str) -> 'ImagePayload':
+        """Create a payload from an already base64-encoded image."""
+        payload = cls(base64.b64decode(encoded))
+        payload._base64 = encoded
+        return payload
+    
+    @property
+    def base64(self) -> str:
+        """Base64 form of the image, encoded once."""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.data).decode('ascii')
+        return self._base64
+    
+    @property
+    def hash(self) -> str:
+        """SHA-256 hex digest of the image bytes, computed once."""
+        if self._hash is None:
+            self._hash = hashlib.sha256(self.data).hexdigest()
+        return self._hash
+    
+    @property
+    def width(self) -> Optional[int]:
+        """Image width if the data carries it (e.g. CapturedImage)."""
+        return getattr(self.data, 'width', None)
+    
+    @property
+    def height(self) -> Optional[int]:
+        """Image height if the data carries it (e.g. CapturedImage)."""
+        return getattr(self.data, 'height', None)
+    
+    def __bytes__(self) -> bytes:
+        return bytes(self.data)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ImagePayload):
+            return NotImplemented
+        return self.hash == other.hash
+    
+    def __hash__(self) -> int:
+        return hash(self.hash)
+    
+    def __repr__(self) -> str:
+        return f"ImagePayload(size={len(self.data)}, hash='{self.hash[:12]}')"
+
+
+# Anything accepted as an image by the functions in this module
+ImageInput = Union[ImagePayload, bytes, str]
+
+
+def _encode_images(images: List[ImageInput]) -> List[str]:
+    """Get base64 strings for images.
+    
+    ImagePayloads reuse their memoized encoding, bytes are encoded, and
+    strings are assumed to be base64 already.
+    """
+    with tracing.span('encode.base64', images=len(images)):
+        return [
+            image.base64 if isinstance(image, ImagePayload)
+            else base64.b64encode(image).decode('ascii') if isinstance(image, (bytes, bytearray, memoryview))
+            else image
+            for image in images
+        ]
+
+
+def _prepare_messages(messages: List[Dict[str, Any]], system_prompt: Optional[str],
+                      images: Optional[List[ImageInput]]) -> List[Dict[str, Any]]:
+    """Apply the system prompt and attach images to the last user message.
+    
+    Images already on earlier messages (ImagePayload, bytes or base64 str)
+    are encoded the same way. The caller's message list and dicts are
+    left untouched.
+    """
+    config = get_config()
+    actual_system_prompt = system_prompt if system_prompt is not None else config.system_prompt
+    
+    # Prepare messages with system prompt
+    actual_messages = [
+        {**message, 'images': _encode_images(message['images'])} if message.get('images') else message
+        for message in messages
+    ]
+    if actual_system_prompt:
+        # Check if first message is already a system message
+        if not actual_messages or actual_messages[0].get('role') != 'system':
+            actual_messages.insert(0, {'role': 'system', 'content': actual_system_prompt})
+        else:
+            # Replace existing system message
+            actual_messages[0] = {'role': 'system', 'content': actual_system_prompt}
+    
+    # Handle images - encode as base64 and add to the last user message
+    if images:
+        encoded_images = _encode_images(images)
+        
+        # Find the last user message and add images to it
+        for i in reversed(range(len(actual_messages))):
+            if actual_messages[i].get('role') == 'user':
+                actual_messages[i] = {**actual_messages[i], 'images': encoded_images}
+                break
+        else:
+            # No user message found, create one
+            actual_messages.append({
+                'role': 'user',
+                'content': 'Please analyze this image.',
+                'images': encoded_images
+            })
+    return actual_messages
+
+
+def _prepare_generate(prompt: str, system_prompt: Optional[str], images: Optional[List[ImageInput]],
+                      kwargs: Dict[str, Any]):
+    """Build the prompt and request kwargs for a generate call."""
+    config = get_config()
+    actual_system_prompt = system_prompt if system_prompt is not None else config.system_prompt
+    
+    # Prepare prompt with system prompt
+    actual_prompt = prompt
+    if actual_system_prompt:
+        actual_prompt = f"{actual_system_prompt}\n\n{prompt}"
+    
+    # Handle images - encode as base64
+    request_kwargs = kwargs.copy()
+    if images:
+        request_kwargs['images'] = _encode_images(images)
+    return actual_prompt, request_kwargs
+
+
+def _image_hash(image: ImageInput) -> str:
+    """Content hash of an image input (memoized for ImagePayload)."""
+    if isinstance(image, ImagePayload):
+        return image.hash
+    if isinstance(image, str):
+        image = image.encode('ascii')
+    return hashlib.sha256(image).hexdigest()
+
+
+def _cache_key(kind: str, model: str, request: Any, system_prompt: Optional[str],
+               images: Optional[List[ImageInput]], kwargs: Dict[str, Any]) -> str:
+    """Build a ResponseCache key for a chat or generate request."""
+    actual_system_prompt = system_prompt if system_prompt is not None else get_config().system_prompt
+    image_hashes = [_image_hash(image) for image in images] if images else None
+    if kind == 'chat':
+        # Images carried on earlier turns are keyed by content hash too
+        request = [
+            {**message, 'images': [_image_hash(image) for image in message['images']]}
+            if message.get('images') else message
+            for message in request
+        ]
+    return ResponseCache.make_key(kind, model, request, actual_system_prompt, image_hashes, kwargs)
+
+
+def _action_retry_messages(messages: List[Dict[str, Any]], answer: str, error: Exception) -> List[Dict[str, Any]]:
+    """Append a rejected answer and a correction request to the conversation."""
+    return messages + [
+        {'role': 'assistant', 'content': answer},
+        {'role': 'user', 'content': f"That answer was invalid ({error}). "
+                                    "Respond again with ONLY a JSON object matching the schema."},
+    ]
+
+
+class _ActionRequest:
+    """State shared by the sync and async chat_action() retry loops."""
+
+    def __init__(self, client, model: str, messages: List[Dict[str, Any]],
+                 images: Optional[List[ImageInput]], transform, schema: Optional[Dict[str, Any]],
+                 retries: int, kwargs: Dict[str, Any]):
+        if retries < 0:
+            raise ValueError(f"retries must be >= 0, got {retries}")
+        schema = schema if schema is not None else ACTION_SCHEMA
+        self.chat_kwargs = dict(kwargs, format=schema)
+        use_cache = bool(self.chat_kwargs.pop('cache', False)) and getattr(client, 'cache', None) is not None
+        self.system_prompt = self.chat_kwargs.pop('system_prompt', None)
+        self.messages = messages
+        self.images = images
+        self._cache = client.cache if use_cache else None
+        self._transform = transform
+        self._allowed = _schema_actions(schema)
+        self._attempts = retries + 1
+        self._failures = 0
+        # Valid answers are cached under the original request; invalid ones never are,
+        # so a temperature-0 retry can't be served the same bad answer
+        self._key = (_cache_key('chat', model, messages, self.system_prompt, images, self.chat_kwargs)
+                     if use_cache else None)
+
+    def cached(self) -> Optional[Action]:
+        """Return a valid cached action, or None."""
+        if self._key is None:
+            return None
+        cached = self._cache.get(self._key)
+        if cached is None:
+            return None
+        try:
+            return parse_action(cached['message']['content'], self._transform, self._allowed)
+        except ValueError:
+            return None
+
+    def accept(self, response: Dict[str, Any]) -> Optional[Action]:
+        """Parse a response; None means retry with the updated messages.
+
+        Raises:
+            ValueError: If the last attempt was invalid too
+        """
+        answer = response['message']['content']
+        try:
+            action = parse_action(answer, self._transform, self._allowed)
+        except ValueError as e:
+            self._failures += 1
+            if self._failures == self._attempts:
+                raise ValueError(f"No valid action after {self._attempts} attempts: {e}") from None
+            self.messages = _action_retry_messages(self.messages, answer, e)
+            return None
+        if self._key is not None:
+            self._cache.put(self._key, response)
+        return action
+
+
+def _schema_actions(schema: Dict[str, Any]) -> Optional[tuple]:
+    """Action names a schema allows, for validating the answer against it."""
+    enum = schema.get('properties', {}).get('action', {}).get('enum')
+    return tuple(enum) if enum else None
 
 
 class OllamaClient:
     """Client for interacting with locally hosted Ollama server."""
     
-    def __init__(self, host: Optional[str] = None, **kwargs):
+    def __init__(self, host: Optional[str] = None, cache: Optional[ResponseCache] = None, **kwargs):
         """Initialize Ollama client.
         
         Args:
             host: Ollama server host URL (uses global config if None)
+            cache: ResponseCache for calls made with cache=True
             **kwargs: Additional arguments passed to ollama.Client
         """
         config = get_config()
         self.host = host if host is not None else config.url
+        self.cache = cache
         self.client = ollama.Client(host=self.host, **kwargs)
     
     def chat(self, model: str, messages: List[Dict[str, str]], 
              stream: bool = False, system_prompt: Optional[str] = None, 
-             images: Optional[List[bytes]] = None, **kwargs) -> Union[Dict[str, Any], Any]:
+             images: Optional[List[ImageInput]] = None, cache: bool = False,
+             **kwargs) -> Union[Dict[str, Any], Any]:
         """Send chat completion request to Ollama.
         
         Args:
@@ -32,59 +297,53 @@ class OllamaClient:
             messages: List of message dicts with 'role' and 'content'
             stream: Whether to stream response
             system_prompt: System prompt to use (overrides global config)
-            images: List of image bytes to send (for vision models)
+            images: Images to send (ImagePayload, bytes or base64 str)
+            cache: Serve/store the response via the client's ResponseCache
+                (ignored when streaming or when the client has no cache)
             **kwargs: Additional parameters (options, tools, etc.)
             
         Returns:
             Response dict from Ollama or iterator if stream=True
         """
-        config = get_config()
-        actual_system_prompt = system_prompt if system_prompt is not None else config.system_prompt
-        
-        # Prepare messages with system prompt
-        actual_messages = messages.copy()
-        if actual_system_prompt:
-            # Check if first message is already a system message
-            if not actual_messages or actual_messages[0].get('role') != 'system':
-                actual_messages.insert(0, {'role': 'system', 'content': actual_system_prompt})
-            else:
-                # Replace existing system message
-                actual_messages[0] = {'role': 'system', 'content': actual_system_prompt}
-        
-        # Handle images - encode as base64 and add to the last user message
-        if images:
-            encoded_images = []
-            for image_bytes in images:
-                if isinstance(image_bytes, bytes):
-                    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-                    encoded_images.append(encoded_image)
-                else:
-                    # Assume it's already base64 encoded
-                    encoded_images.append(image_bytes)
-            
-            # Find the last user message and add images to it
-            for i in reversed(range(len(actual_messages))):
-                if actual_messages[i].get('role') == 'user':
-                    actual_messages[i]['images'] = encoded_images
-                    break
-            else:
-                # No user message found, create one
-                actual_messages.append({
-                    'role': 'user',
-                    'content': 'Please analyze this image.',
-                    'images': encoded_images
-                })
-        
-        return self.client.chat(
-            model=model,
-            messages=actual_messages,
-            stream=stream,
-            **kwargs
-        )
+        key = None
+        if cache and not stream and self.cache is not None:
+            key = _cache_key('chat', model, messages, system_prompt, images, kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        actual_messages = _prepare_messages(messages, system_prompt, images)
+        
+        start = time.perf_counter()
+        if stream:
+            # The request runs while the stream is consumed, so that is what gets timed
+            response = tracing.trace_stream('ollama.chat', self.client.chat(
+                model=model,
+                messages=actual_messages,
+                stream=True,
+                **kwargs
+            ), model=model, stream=True)
+            response = recorder.record_stream('chat', model, messages, system_prompt, images,
+                                              kwargs, response, start)
+        else:
+            with tracing.span('ollama.chat', model=model, stream=False):
+                response = self.client.chat(
+                    model=model,
+                    messages=actual_messages,
+                    stream=False,
+                    **kwargs
+                )
+            tracing.record_server_timings(response)
+            recorder.record_request('chat', model, messages, system_prompt, images,
+                                    kwargs, response, time.perf_counter() - start)
+        if key is not None:
+            self.cache.put(key, response)
+        return response
     
     def generate(self, model: str, prompt: str, 
                  stream: bool = False, system_prompt: Optional[str] = None,
-                 images: Optional[List[bytes]] = None, **kwargs) -> Union[Dict[str, Any], Any]:
+                 images: Optional[List[ImageInput]] = None, cache: bool = False,
+                 **kwargs) -> Union[Dict[str, Any], Any]:
         """Generate text completion.
         
         Args:
@@ -92,39 +351,81 @@ class OllamaClient:
             prompt: Input prompt
             stream: Whether to stream response
             system_prompt: System prompt to use (overrides global config)
-            images: List of image bytes to send (for vision models)
+            images: Images to send (ImagePayload, bytes or base64 str)
+            cache: Serve/store the response via the client's ResponseCache
+                (ignored when streaming or when the client has no cache)
             **kwargs: Additional parameters (options, context, etc.)
             
         Returns:
             Response dict from Ollama or iterator if stream=True
         """
-        config = get_config()
-        actual_system_prompt = system_prompt if system_prompt is not None else config.system_prompt
+        key = None
+        if cache and not stream and self.cache is not None:
+            key = _cache_key('generate', model, prompt, system_prompt, images, kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         
-        # Prepare prompt with system prompt
-        actual_prompt = prompt
-        if actual_system_prompt:
-            actual_prompt = f"{actual_system_prompt}\n\n{prompt}"
+        actual_prompt, request_kwargs = _prepare_generate(prompt, system_prompt, images, kwargs)
         
-        # Handle images - encode as base64
-        request_kwargs = kwargs.copy()
-        if images:
-            encoded_images = []
-            for image_bytes in images:
-                if isinstance(image_bytes, bytes):
-                    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-                    encoded_images.append(encoded_image)
-                else:
-                    # Assume it's already base64 encoded
-                    encoded_images.append(image_bytes)
-            request_kwargs['images'] = encoded_images
-        
-        return self.client.generate(
-            model=model,
-            prompt=actual_prompt,
-            stream=stream,
-            **request_kwargs
-        )
+        start = time.perf_counter()
+        if stream:
+            response = tracing.trace_stream('ollama.generate', self.client.generate(
+                model=model,
+                prompt=actual_prompt,
+                stream=True,
+                **request_kwargs
+            ), model=model, stream=True)
+            response = recorder.record_stream('generate', model, prompt, system_prompt, images,
+                                              kwargs, response, start)
+        else:
+            with tracing.span('ollama.generate', model=model, stream=False):
+                response = self.client.generate(
+                    model=model,
+                    prompt=actual_prompt,
+                    stream=False,
+                    **request_kwargs
+                )
+            tracing.record_server_timings(response)
+            recorder.record_request('generate', model, prompt, system_prompt, images,
+                                    kwargs, response, time.perf_counter() - start)
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+    
+    def chat_action(self, model: str, messages: List[Dict[str, str]],
+                    images: Optional[List[ImageInput]] = None, transform=None,
+                    schema: Optional[Dict[str, Any]] = None, retries: int = 2,
+                    **kwargs) -> Action:
+        """Ask for a structured action using JSON-schema constrained decoding.
+        
+        The schema is sent as Ollama's `format`. If the answer still fails
+        validation, the request is repeated with the same images (the
+        capture and encoding are reused) plus a note about the error.
+        
+        Args:
+            model: Model name
+            messages: List of message dicts with 'role' and 'content'
+            images: Images to send (ImagePayload, bytes or base64 str)
+            transform: CoordinateTransform mapping answers to monitor space
+            schema: JSON schema (default: ACTION_SCHEMA; see action_schema())
+            retries: Extra attempts after an invalid answer (>= 0)
+            **kwargs: Additional parameters for chat() (options, cache, etc.);
+                with cache=True only answers that parse are cached
+            
+        Returns:
+            Action tuple (Click, RightClick, Move, Type or Wait)
+            
+        Raises:
+            ValueError: If retries is negative or no valid action was
+                returned after all retries
+        """
+        request = _ActionRequest(self, model, messages, images, transform, schema, retries, kwargs)
+        action = request.cached()
+        while action is None:
+            action = request.accept(self.chat(model, request.messages, system_prompt=request.system_prompt,
+                                                  images=request.images, **request.chat_kwargs))
+        return action
     
     def list(self) -> Dict[str, List[Dict[str, Any]]]:
         """List available models.
@@ -134,6 +435,14 @@ class OllamaClient:
         """
         return self.client.list()
     
+    def ps(self) -> Dict[str, List[Dict[str, Any]]]:
+        """List models currently loaded in memory.
+        
+        Returns:
+            Dict with 'models' key containing loaded model info (expires_at, size_vram, ...)
+        """
+        return self.client.ps()
+    
     def show(self, name: str) -> Dict[str, Any]:
         """Show model details.
         
@@ -184,8 +493,272 @@ class OllamaClient:
             return False
 
 
+class AsyncOllamaClient:
+    """Asynchronous client for a locally hosted Ollama server.
+    
+    Same surface as OllamaClient, built on ollama.AsyncClient, so capture,
+    inference and input can run concurrently in one event loop.
+    """
+    
+    def __init__(self, host: Optional[str] = None, cache: Optional[ResponseCache] = None, **kwargs):
+        """Initialize async Ollama client.
+        
+        Args:
+            host: Ollama server host URL (uses global config if None)
+            cache: ResponseCache for calls made with cache=True
+            **kwargs: Additional arguments passed to ollama.AsyncClient
+        """
+        config = get_config()
+        self.host = host if host is not None else config.url
+        self.cache = cache
+        self.client = ollama.AsyncClient(host=self.host, **kwargs)
+    
+    async def chat(self, model: str, messages: List[Dict[str, str]], 
+                   stream: bool = False, system_prompt: Optional[str] = None, 
+                   images: Optional[List[ImageInput]] = None, cache: bool = False,
+                   **kwargs) -> Union[Dict[str, Any], Any]:
+        """Send chat completion request to Ollama.
+        
+        Args:
+            model: Model name (e.g., 'llama2', 'mistral')
+            messages: List of message dicts with 'role' and 'content'
+            stream: Whether to stream response
+            system_prompt: System prompt to use (overrides global config)
+            images: Images to send (ImagePayload, bytes or base64 str)
+            cache: Serve/store the response via the client's ResponseCache
+                (ignored when streaming or when the client has no cache)
+            **kwargs: Additional parameters (options, tools, etc.)
+            
+        Returns:
+            Response dict from Ollama or async iterator if stream=True
+        """
+        key = None
+        if cache and not stream and self.cache is not None:
+            key = _cache_key('chat', model, messages, system_prompt, images, kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        actual_messages = _prepare_messages(messages, system_prompt, images)
+        
+        start = time.perf_counter()
+        if stream:
+            response = tracing.trace_async_stream('ollama.chat', await self.client.chat(
+                model=model,
+                messages=actual_messages,
+                stream=True,
+                **kwargs
+            ), model=model, stream=True)
+            response = recorder.record_async_stream('chat', model, messages, system_prompt, images,
+                                                    kwargs, response, start)
+        else:
+            with tracing.span('ollama.chat', model=model, stream=False):
+                response = await self.client.chat(
+                    model=model,
+                    messages=actual_messages,
+                    stream=False,
+                    **kwargs
+                )
+            tracing.record_server_timings(response)
+            recorder.record_request('chat', model, messages, system_prompt, images,
+                                    kwargs, response, time.perf_counter() - start)
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+    
+    async def generate(self, model: str, prompt: str, 
+                       stream: bool = False, system_prompt: Optional[str] = None,
+                       images: Optional[List[ImageInput]] = None, cache: bool = False,
+                       **kwargs) -> Union[Dict[str, Any], Any]:
+        """Generate text completion.
+        
+        Args:
+            model: Model name
+            prompt: Input prompt
+            stream: Whether to stream response
+            system_prompt: System prompt to use (overrides global config)
+            images: Images to send (ImagePayload, bytes or base64 str)
+            cache: Serve/store the response via the client's ResponseCache
+                (ignored when streaming or when the client has no cache)
+            **kwargs: Additional parameters (options, context, etc.)
+            
+        Returns:
+            Response dict from Ollama or async iterator if stream=True
+        """
+        key = None
+        if cache and not stream and self.cache is not None:
+            key = _cache_key('generate', model, prompt, system_prompt, images, kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        actual_prompt, request_kwargs = _prepare_generate(prompt, system_prompt, images, kwargs)
+        
+        start = time.perf_counter()
+        if stream:
+            response = tracing.trace_async_stream('ollama.generate', await self.client.generate(
+                model=model,
+                prompt=actual_prompt,
+                stream=True,
+                **request_kwargs
+            ), model=model, stream=True)
+            response = recorder.record_async_stream('generate', model, prompt, system_prompt, images,
+                                                    kwargs, response, start)
+        else:
+            with tracing.span('ollama.generate', model=model, stream=False):
+                response = await self.client.generate(
+                    model=model,
+                    prompt=actual_prompt,
+                    stream=False,
+                    **request_kwargs
+                )
+            tracing.record_server_timings(response)
+            recorder.record_request('generate', model, prompt, system_prompt, images,
+                                    kwargs, response, time.perf_counter() - start)
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+    
+    async def chat_action(self, model: str, messages: List[Dict[str, str]],
+                          images: Optional[List[ImageInput]] = None, transform=None,
+                          schema: Optional[Dict[str, Any]] = None, retries: int = 2,
+                          **kwargs) -> Action:
+        """Ask for a structured action using JSON-schema constrained decoding.
+        
+        The schema is sent as Ollama's `format`. If the answer still fails
+        validation, the request is repeated with the same images (the
+        capture and encoding are reused) plus a note about the error.
+        
+        Args:
+            model: Model name
+            messages: List of message dicts with 'role' and 'content'
+            images: Images to send (ImagePayload, bytes or base64 str)
+            transform: CoordinateTransform mapping answers to monitor space
+            schema: JSON schema (default: ACTION_SCHEMA; see action_schema())
+            retries: Extra attempts after an invalid answer (>= 0)
+            **kwargs: Additional parameters for chat() (options, cache, etc.);
+                with cache=True only answers that parse are cached
+            
+        Returns:
+            Action tuple (Click, RightClick, Move, Type or Wait)
+            
+        Raises:
+            ValueError: If retries is negative or no valid action was
+                returned after all retries
+        """
+        request = _ActionRequest(self, model, messages, images, transform, schema, retries, kwargs)
+        action = request.cached()
+        while action is None:
+            action = request.accept(await self.chat(model, request.messages, system_prompt=request.system_prompt,
+                                                  images=request.images, **request.chat_kwargs))
+        return action
+    
+    async def list(self) -> Dict[str, List[Dict[str, Any]]]:
+        """List available models.
+        
+        Returns:
+            Dict with 'models' key containing list of model info
+        """
+        return await self.client.list()
+    
+    async def ps(self) -> Dict[str, List[Dict[str, Any]]]:
+        """List models currently loaded in memory.
+        
+        Returns:
+            Dict with 'models' key containing loaded model info (expires_at, size_vram, ...)
+        """
+        return await self.client.ps()
+    
+    async def show(self, name: str) -> Dict[str, Any]:
+        """Show model details.
+        
+        Args:
+            name: Model name
+            
+        Returns:
+            Model details dict
+        """
+        return await self.client.show(name)
+    
+    async def pull(self, name: str, stream: bool = False) -> Union[Dict[str, Any], Any]:
+        """Pull a model from registry.
+        
+        Args:
+            name: Model name to pull
+            stream: Whether to stream progress
+            
+        Returns:
+            Pull response or async iterator if stream=True
+        """
+        return await self.client.pull(name=name, stream=stream)
+    
+    async def embeddings(self, model: str, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Generate embeddings for text.
+        
+        Args:
+            model: Model name
+            prompt: Input text
+            **kwargs: Additional parameters
+            
+        Returns:
+            Dict with 'embedding' array
+        """
+        return await self.client.embeddings(model=model, prompt=prompt, **kwargs)
+    
+    async def is_connected(self) -> bool:
+        """Check if Ollama server is accessible.
+        
+        Returns:
+            True if server is reachable, False otherwise
+        """
+        try:
+            await self.client.list()
+            return True
+        except Exception:
+            return False
+
+
+# Shared clients keyed by host URL; ollama.Client wraps an httpx.Client,
+# which is thread-safe and keeps connections alive between calls
+_clients: Dict[str, OllamaClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(host: Optional[str] = None) -> OllamaClient:
+    """Get the process-wide OllamaClient for a host.
+    
+    Clients are created on first use and reused afterwards, so repeated
+    calls share one HTTP connection pool instead of reconnecting.
+    
+    Args:
+        host: Ollama server host URL (uses global config URL if None)
+        
+    Returns:
+        Shared OllamaClient
+    """
+    url = host if host is not None else get_config().url
+    client = _clients.get(url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(url)
+            if client is None:
+                client = _clients[url] = OllamaClient(host=url)
+    return client
+
+
+def clear_clients():
+    """Drop all shared clients (closing their connections)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        http = getattr(client.client, '_client', None)
+        if http is not None:
+            http.close()
+
+
 # Convenience functions for quick usage
-def quick_chat(model: Optional[str] = None, prompt: str = "", host: Optional[str] = None, system_prompt: Optional[str] = None, images: Optional[List[bytes]] = None) -> str:
+def quick_chat(model: Optional[str] = None, prompt: str = "", host: Optional[str] = None, system_prompt: Optional[str] = None, images: Optional[List[ImageInput]] = None) -> str:
     """Quick chat completion.
     
     Args:
@@ -193,48 +766,22 @@ def quick_chat(model: Optional[str] = None, prompt: str = "", host: Optional[str
         prompt: User prompt
         host: Ollama server host (uses global config if None)
         system_prompt: System prompt (overrides global config)
-        images: List of image bytes to send (for vision models)
+        images: Images to send (ImagePayload, bytes or base64 str)
         
     Returns:
         Generated response text
     """
-    config = get_config()
-    actual_model = model if model is not None else config.model
-    
-    if host is not None:
-        # Use custom host
-        client = OllamaClient(host=host)
-        response = client.chat(actual_model, [{"role": "user", "content": prompt}], system_prompt=system_prompt, images=images)
-    else:
-        # Use global config and system prompt
-        config = get_config()
-        actual_system_prompt = system_prompt if system_prompt is not None else config.system_prompt
-        messages = [{"role": "user", "content": prompt}]
-        
-        # Add system message if system prompt provided
-        if actual_system_prompt:
-            messages.insert(0, {"role": "system", "content": actual_system_prompt})
-        
-        # Handle images for direct ollama.chat call
-        if images:
-            encoded_images = []
-            for image_bytes in images:
-                if isinstance(image_bytes, bytes):
-                    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-                    encoded_images.append(encoded_image)
-                else:
-                    encoded_images.append(image_bytes)
-            # Add images to the user message
-            messages[-1]['images'] = encoded_images
-            
-        response = ollama.chat(
-            model=actual_model,
-            messages=messages
-        )
+    actual_model = model if model is not None else get_config().model
+    response = get_client(host).chat(
+        actual_model,
+        [{"role": "user", "content": prompt}],
+        system_prompt=system_prompt,
+        images=images
+    )
     return response['message']['content']
 
 
-def quick_generate(model: Optional[str] = None, prompt: str = "", host: Optional[str] = None, system_prompt: Optional[str] = None, images: Optional[List[bytes]] = None) -> str:
+def quick_generate(model: Optional[str] = None, prompt: str = "", host: Optional[str] = None, system_prompt: Optional[str] = None, images: Optional[List[ImageInput]] = None) -> str:
     """Quick text generation.
     
     Args:
@@ -242,41 +789,13 @@ def quick_generate(model: Optional[str] = None, prompt: str = "", host: Optional
         prompt: Input prompt
         host: Ollama server host (uses global config if None)
         system_prompt: System prompt (overrides global config)
-        images: List of image bytes to send (for vision models)
+        images: Images to send (ImagePayload, bytes or base64 str)
         
     Returns:
         Generated text
     """
-    config = get_config()
-    actual_model = model if model is not None else config.model
-    
-    if host is not None:
-        # Use custom host
-        client = OllamaClient(host=host)
-        response = client.generate(actual_model, prompt, system_prompt=system_prompt, images=images)
-    else:
-        # Use global config and system prompt
-        config = get_config()
-        actual_system_prompt = system_prompt if system_prompt is not None else config.system_prompt
-        actual_prompt = prompt
-        
-        # Prepend system prompt if provided
-        if actual_system_prompt:
-            actual_prompt = f"{actual_system_prompt}\n\n{prompt}"
-        
-        # Handle images for direct ollama.generate call
-        generate_kwargs = {}
-        if images:
-            encoded_images = []
-            for image_bytes in images:
-                if isinstance(image_bytes, bytes):
-                    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-                    encoded_images.append(encoded_image)
-                else:
-                    encoded_images.append(image_bytes)
-            generate_kwargs['images'] = encoded_images
-            
-        response = ollama.generate(model=actual_model, prompt=actual_prompt, **generate_kwargs)
+    actual_model = model if model is not None else get_config().model
+    response = get_client(host).generate(actual_model, prompt, system_prompt=system_prompt, images=images)
     return response['response']
 
 
@@ -299,14 +818,14 @@ def data_from_path(file_path: str) -> bytes:
         raise RuntimeError(f"Failed to read image from {file_path}: {e}")
 
 
-def describe_image(image_bytes: bytes, prompt: str = "What do you see in this image?", 
+def describe_image(image_bytes: ImageInput, prompt: str = "What do you see in this image?", 
                    model: Optional[str] = None, system_prompt: Optional[str] = None) -> str:
     """Describe an image using a vision language model.
     
     Uses gemma3:27b by default, which supports multimodal input (images + text).
     
     Args:
-        image_bytes: Raw image data as bytes
+        image_bytes: Image as ImagePayload, raw bytes or base64 str
         prompt: Question/prompt about the image (default: "What do you see in this image?")
         model: Model to use (uses global config default gemma3:27b if None)
         system_prompt: System prompt for the model
@@ -337,6 +856,139 @@ def describe_image(image_bytes: bytes, prompt: str = "What do you see in this im
         raise RuntimeError(f"Failed to describe image with model {actual_model}: {e}")
 
 
+BATCH_MODES = ('structured', 'conversation')
+
+_BATCH_PROMPT = """Answer each of the following questions about the image.
+Respond with a JSON object with one string answer per key.
+
+{questions}"""
+
+
+def _batch_questions(prompts: Union[Sequence[str], Dict[str, str]]) -> Dict[str, str]:
+    """Normalize prompts to an ordered {key: prompt} dict."""
+    if isinstance(prompts, dict):
+        return dict(prompts)
+    return {prompt: prompt for prompt in prompts}
+
+
+def _batch_schema(keys: List[str]) -> Dict[str, Any]:
+    """JSON schema requiring one string answer per question key."""
+    return {
+        'type': 'object',
+        'properties': {key: {'type': 'string'} for key in keys},
+        'required': list(keys),
+    }
+
+
+def _ask_structured(client: 'OllamaClient', model: str, questions: Dict[str, str],
+                    image: 'ImagePayload', system_prompt: Optional[str],
+                    kwargs: Dict[str, Any]) -> Dict[str, str]:
+    """Ask every question in one schema-constrained request.
+    
+    Returns the answers that came back valid; missing keys are left out.
+    """
+    # Short keys keep the schema small and avoid quoting long prompts
+    keys = {f"q{i + 1}": key for i, key in enumerate(questions)}
+    listing = "\n".join(f"{short}: {questions[key]}" for short, key in keys.items())
+    response = client.chat(
+        model,
+        [{"role": "user", "content": _BATCH_PROMPT.format(questions=listing)}],
+        system_prompt=system_prompt,
+        images=[image],
+        format=_batch_schema(list(keys)),
+        **kwargs
+    )
+    try:
+        data = json.loads(response['message']['content'])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {key: str(data[short]) for short, key in keys.items() if short in data}
+
+
+def _ask_conversation(client: 'OllamaClient', model: str, questions: Dict[str, str],
+                      image: 'ImagePayload', system_prompt: Optional[str],
+                      kwargs: Dict[str, Any]) -> Dict[str, str]:
+    """Ask the questions one by one in a single growing conversation.
+    
+    The image rides on the first user message only, so every request
+    shares the same prompt prefix and Ollama can reuse the evaluated
+    image tokens while the model stays loaded. It is passed as images=
+    on the first turn and kept on that message afterwards, so caching,
+    tracing and recording see it like any other image.
+    """
+    answers = {}
+    messages = []
+    for key, prompt in questions.items():
+        images = None if messages else [image]
+        messages.append({"role": "user", "content": prompt})
+        response = client.chat(model, messages, system_prompt=system_prompt, images=images, **kwargs)
+        if images:
+            messages[0] = {**messages[0], 'images': images}
+        answer = response['message']['content']
+        messages.append({"role": "assistant", "content": answer})
+        answers[key] = answer
+    return answers
+
+
+def describe_image_batch(image: ImageInput, prompts: Union[Sequence[str], Dict[str, str]],
+                         model: Optional[str] = None, system_prompt: Optional[str] = None,
+                         mode: str = 'structured', client: Optional['OllamaClient'] = None,
+                         keep_alive: Optional[Union[float, str]] = None,
+                         **kwargs) -> Dict[str, str]:
+    """Answer several questions about one image.
+    
+    The image is encoded once for all questions. In 'structured' mode all
+    questions go out in a single request whose answer is constrained to a
+    JSON object (questions it leaves out are asked in conversation mode).
+    In 'conversation' mode each question is a follow-up turn on the same
+    image, so the server can reuse the prompt prefix.
+    
+    Args:
+        image: Image as ImagePayload, raw bytes or base64 str
+        prompts: List of questions, or dict of {name: question}
+        model: Model to use (uses global config default if None)
+        system_prompt: System prompt for the model
+        mode: 'structured' or 'conversation'
+        client: OllamaClient to use (shared client for the configured host if None)
+        keep_alive: How long the model stays loaded after the batch
+        **kwargs: Additional parameters for chat() (options, etc.)
+        
+    Returns:
+        Dict mapping each question (or name) to its answer
+        
+    Raises:
+        RuntimeError: If the request fails
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unsupported mode '{mode}'. Expected one of: {', '.join(BATCH_MODES)}")
+    actual_model = model if model is not None else get_config().model
+    questions = _batch_questions(prompts)
+    if not questions:
+        return {}
+    
+    if isinstance(image, str):
+        image = ImagePayload.from_base64(image)
+    elif not isinstance(image, ImagePayload):
+        image = ImagePayload(image)
+    if keep_alive is not None:
+        kwargs['keep_alive'] = keep_alive
+    
+    try:
+        if client is None:
+            client = get_client()
+        answers = {}
+        if mode == 'structured':
+            answers = _ask_structured(client, actual_model, questions, image, system_prompt, kwargs)
+        missing = {key: prompt for key, prompt in questions.items() if key not in answers}
+        if missing:
+            answers.update(_ask_conversation(client, actual_model, missing, image, system_prompt, kwargs))
+        return {key: answers[key] for key in questions}
+    except Exception as e:
+        raise RuntimeError(f"Failed to describe image with model {actual_model}: {e}")
+
+
 def screenshot_and_describe(prompt: str = "What do you see in this screenshot?", 
                            monitor: int = 0, model: Optional[str] = None, 
                            system_prompt: Optional[str] = None) -> str:
@@ -391,4 +1043,69 @@ def describe_image_from_path(file_path: str, prompt: str = "What do you see in t
         image_bytes = data_from_path(file_path)
         return describe_image(image_bytes, prompt, model, system_prompt)
     except Exception as e:
-        raise RuntimeError(f"Failed to describe image from {file_path}: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Failed to describe image from {file_path}: {e}")
+
+
+async def async_describe_image(image_bytes: ImageInput, prompt: str = "What do you see in this image?", 
+                               model: Optional[str] = None, system_prompt: Optional[str] = None,
+                               client: Optional[AsyncOllamaClient] = None) -> str:
+    """Async version of describe_image().
+    
+    Args:
+        image_bytes: Image as ImagePayload, raw bytes or base64 str
+        prompt: Question/prompt about the image (default: "What do you see in this image?")
+        model: Model to use (uses global config default if None)
+        system_prompt: System prompt for the model
+        client: AsyncOllamaClient to use (creates one for the configured host if None)
+        
+    Returns:
+        Text description from the vision model
+        
+    Raises:
+        RuntimeError: If the request fails
+    """
+    actual_model = model if model is not None else get_config().model
+    
+    try:
+        if client is None:
+            client = AsyncOllamaClient()
+        response = await client.chat(
+            actual_model,
+            [{"role": "user", "content": prompt}],
+            system_prompt=system_prompt,
+            images=[image_bytes]
+        )
+        return response['message']['content']
+    except Exception as e:
+        raise RuntimeError(f"Failed to describe image with model {actual_model}: {e}")
+
+
+async def async_screenshot_and_describe(prompt: str = "What do you see in this screenshot?", 
+                                        monitor: int = 0, model: Optional[str] = None, 
+                                        system_prompt: Optional[str] = None,
+                                        client: Optional[AsyncOllamaClient] = None) -> str:
+    """Async version of screenshot_and_describe().
+    
+    The screenshot runs in the default executor so the event loop stays free.
+    
+    Args:
+        prompt: Question/prompt about the screenshot
+        monitor: Monitor index to capture (default: 0 for primary monitor)
+        model: Model to use (uses global config default if None)
+        system_prompt: System prompt for the model
+        client: AsyncOllamaClient to use (creates one for the configured host if None)
+        
+    Returns:
+        Text description of the screenshot
+        
+    Raises:
+        RuntimeError: If screenshot fails or model request fails
+    """
+    from .screen import screenshot_monitor
+    
+    try:
+        loop = asyncio.get_running_loop()
+        image_bytes = await loop.run_in_executor(None, screenshot_monitor, monitor)
+        return await async_describe_image(image_bytes, prompt, model, system_prompt, client)
+    except Exception as e:
+        raise RuntimeError(f"Failed to screenshot and describe: {e}")
@@ -0,0 +1,281 @@
+"""
+Pooled Ollama client spreading requests over several servers.
+
+Each request goes to the endpoint with the fewest requests in flight
+(or the next one in turn with strategy='round_robin'). An endpoint that
+fails to connect or answers 502/503/504 is ejected for a cooldown
+period and the request is retried on another one; after the
+cooldown it is probed with is_connected() before taking traffic again.
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any, List, Union
+
+import ollama
+
+from .config import get_config
+from .ollama_client import OllamaClient
+from .response_cache import ResponseCache
+
+STRATEGIES = ('least_outstanding', 'round_robin')
+
+
+# Statuses from a server (or the proxy in front of it) that is down or overloaded;
+# other 5xx (e.g. a model failing to load) would fail on any host
+_HOST_FAILURE_STATUSES = (502, 503, 504)
+
+
+def _is_host_failure(error: Exception) -> bool:
+    """True for errors that say the server is down rather than the request bad."""
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code in _HOST_FAILURE_STATUSES
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def _close(stream):
+    close = getattr(stream, 'close', None)
+    if close is not None:
+        close()
+
+
+class _PoolStream:
+    """Iterator proxy keeping its endpoint counted as busy until the stream ends or is closed."""
+
+    def __init__(self, pool: 'OllamaPool', endpoint: 'PoolEndpoint', stream, first: list):
+        self._pool = pool
+        self._endpoint = endpoint
+        self._stream = stream
+        self._pending = first  # Chunk pulled to detect host failures before returning
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._pending:
+            return self._pending.pop()
+        if self._endpoint is None:
+            raise StopIteration
+        try:
+            return next(self._stream)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Close the underlying stream and release the endpoint (idempotent)."""
+        endpoint, self._endpoint = self._endpoint, None
+        self._pending = []
+        if endpoint is not None:
+            _close(self._stream)
+            self._pool._release(endpoint)
+
+    def __del__(self):
+        self.close()
+
+
+class PoolEndpoint:
+    """One server in an OllamaPool with its load and health state."""
+
+    def __init__(self, client: OllamaClient):
+        self.client = client
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    @property
+    def url(self) -> str:
+        return self.client.host
+
+    def ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def __repr__(self) -> str:
+        return f"PoolEndpoint(url='{self.url}', outstanding={self.outstanding})"
+
+
+class OllamaPool:
+    """Drop-in OllamaClient replacement dispatching over several hosts.
+
+    Usage:
+        pool = OllamaPool(["http://gpu1:11434", "http://gpu2:11434"])
+        pool.chat("qwen3-vl:4b", messages, images=[payload])
+        print(pool.stats())
+    """
+
+    def __init__(self, endpoints: Optional[List[str]] = None, strategy: str = 'least_outstanding',
+                 eject_seconds: float = 30.0, cache: Optional[ResponseCache] = None, **kwargs):
+        """Initialize pool.
+
+        Args:
+            endpoints: Ollama server URLs (uses global config endpoints if None)
+            strategy: 'least_outstanding' or 'round_robin'
+            eject_seconds: How long a failed endpoint is kept out of rotation
+            cache: ResponseCache shared by all endpoints
+            **kwargs: Additional arguments passed to each ollama.Client
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported strategy '{strategy}'. Expected one of: {', '.join(STRATEGIES)}")
+        urls = endpoints if endpoints is not None else get_config().endpoints
+        if not urls:
+            raise ValueError("OllamaPool needs at least one endpoint")
+        self.strategy = strategy
+        self.eject_seconds = eject_seconds
+        self.cache = cache
+        self.endpoints = [PoolEndpoint(OllamaClient(host=url, cache=cache, **kwargs)) for url in urls]
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def host(self) -> str:
+        """Comma-separated endpoint URLs."""
+        return ','.join(endpoint.url for endpoint in self.endpoints)
+
+    def _revive(self, endpoint: PoolEndpoint) -> bool:
+        """Probe an endpoint whose cooldown expired; re-eject it if still down."""
+        if endpoint.client.is_connected():
+            return True
+        with self._lock:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+        return False
+
+    def _pick(self, exclude: List[PoolEndpoint]) -> Optional[PoolEndpoint]:
+        """Reserve the next endpoint to use, or None if all are out."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [e for e in self.endpoints if e not in exclude and not e.ejected(now)]
+                if not candidates:
+                    return None
+                # Rotate the starting point so ties (and round robin) spread evenly
+                start = self._next % len(self.endpoints)
+                order = self.endpoints[start:] + self.endpoints[:start]
+                candidates.sort(key=order.index)
+                if self.strategy == 'least_outstanding':
+                    endpoint = min(candidates, key=lambda e: e.outstanding)
+                else:
+                    endpoint = candidates[0]
+                self._next = self.endpoints.index(endpoint) + 1
+                probe = endpoint.failures > 0
+                endpoint.outstanding += 1
+                endpoint.requests += 1
+            if not probe or self._revive(endpoint):
+                return endpoint
+            self._release(endpoint)
+            exclude = exclude + [endpoint]
+
+    def _release(self, endpoint: PoolEndpoint):
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def _eject(self, endpoint: PoolEndpoint):
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+
+    def _mark_healthy(self, endpoint: PoolEndpoint):
+        with self._lock:
+            endpoint.failures = 0
+            endpoint.ejected_until = 0.0
+
+    def _call(self, method: str, *args, **kwargs):
+        """Run a client method on the best endpoint, failing over on host errors."""
+        tried = []
+        error = None
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            result = None
+            try:
+                result = getattr(endpoint.client, method)(*args, **kwargs)
+                if kwargs.get('stream'):
+                    # Streams are lazy: the request only fails on the first chunk
+                    result = iter(result)
+                    first = [next(result)]
+            except StopIteration:
+                first = []
+            except Exception as e:
+                _close(result)
+                self._release(endpoint)
+                if not _is_host_failure(e):
+                    raise
+                self._eject(endpoint)
+                error = e
+                continue
+            if endpoint.failures:
+                self._mark_healthy(endpoint)
+            if kwargs.get('stream'):
+                return _PoolStream(self, endpoint, result, first)
+            self._release(endpoint)
+            return result
+        if error is None:
+            raise RuntimeError(f"No healthy Ollama endpoints (all ejected): {self.host}")
+        raise RuntimeError(f"All Ollama endpoints failed: {error}")
+
+    def chat(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Union[Dict[str, Any], Any]:
+        """OllamaClient.chat() on the least busy healthy endpoint."""
+        return self._call('chat', model, messages, **kwargs)
+
+    def generate(self, model: str, prompt: str, **kwargs) -> Union[Dict[str, Any], Any]:
+        """OllamaClient.generate() on the least busy healthy endpoint."""
+        return self._call('generate', model, prompt, **kwargs)
+
+    # Each attempt goes through self.chat(), so retries can land on another host
+    chat_action = OllamaClient.chat_action
+
+    def embeddings(self, model: str, prompt: str, **kwargs) -> Dict[str, Any]:
+        """OllamaClient.embeddings() on the least busy healthy endpoint."""
+        return self._call('embeddings', model, prompt, **kwargs)
+
+    def list(self) -> Dict[str, List[Dict[str, Any]]]:
+        """List models on the least busy healthy endpoint."""
+        return self._call('list')
+
+    def show(self, name: str) -> Dict[str, Any]:
+        """Show model details from the least busy healthy endpoint."""
+        return self._call('show', name)
+
+    def ps(self) -> Dict[str, List[Dict[str, Any]]]:
+        """List loaded models on the least busy healthy endpoint."""
+        return self._call('ps')
+
+    def check_health(self) -> Dict[str, bool]:
+        """Probe every endpoint now, ejecting or restoring it.
+
+        Returns:
+            Dict of {url: healthy}
+        """
+        health = {}
+        for endpoint in self.endpoints:
+            healthy = endpoint.client.is_connected()
+            if healthy:
+                self._mark_healthy(endpoint)
+            else:
+                self._eject(endpoint)
+            health[endpoint.url] = healthy
+        return health
+
+    def is_connected(self) -> bool:
+        """True if at least one endpoint is reachable."""
+        return any(self.check_health().values())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get per-endpoint load and health."""
+        with self._lock:
+            now = time.monotonic()
+            return [{
+                'url': endpoint.url,
+                'outstanding': endpoint.outstanding,
+                'requests': endpoint.requests,
+                'failures': endpoint.failures,
+                'healthy': not endpoint.ejected(now),
+            } for endpoint in self.endpoints]
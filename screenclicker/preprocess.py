@@ -0,0 +1,121 @@
+"""
+Image preprocessing between capture and the VLM.
+
+Vision encoders resize images internally, so uploading more pixels than
+the model keeps only costs bandwidth and encode time. prepare_image()
+downscales to a max side or vision-token budget and records the scale in
+a CoordinateTransform so predicted coordinates map back to the monitor.
+"""
+
+import io
+import math
+from typing import NamedTuple, Optional, Tuple
+
+from .frames import CoordinateTransform, frame_to_array
+from .screen import CapturedImage, _sniff_format, image_size
+
+# Qwen-VL style encoders cut images into 28x28 pixel patches
+DEFAULT_PATCH_SIZE = 28
+
+_PIL_FORMATS = {'png': 'PNG', 'jpeg': 'JPEG', 'ppm': 'PPM'}
+
+
+class PreparedImage(NamedTuple):
+    """Image ready for the VLM plus the mapping back to monitor space."""
+    image: CapturedImage
+    transform: CoordinateTransform
+    original_width: int
+    original_height: int
+
+    @property
+    def width(self) -> int:
+        return self.image.width
+
+    @property
+    def height(self) -> int:
+        return self.image.height
+
+
+def target_size(width: int, height: int, max_side: Optional[int] = None,
+                token_budget: Optional[int] = None,
+                patch_size: int = DEFAULT_PATCH_SIZE) -> Tuple[int, int]:
+    """Compute the downscaled size for an image (never upscales).
+
+    Args:
+        width, height: Original size
+        max_side: Longest side limit in pixels
+        token_budget: Max vision tokens, one per patch_size x patch_size patch;
+            the result is snapped down to whole patches
+        patch_size: Encoder patch edge in pixels
+
+    Returns:
+        Tuple of (width, height)
+    """
+    scale = 1.0
+    if max_side is not None and max(width, height) > max_side:
+        scale = min(scale, max_side / max(width, height))
+    if token_budget is not None:
+        max_pixels = token_budget * patch_size * patch_size
+        if width * height * scale * scale > max_pixels:
+            scale = min(scale, math.sqrt(max_pixels / (width * height)))
+
+    new_width = max(1, int(width * scale))
+    new_height = max(1, int(height * scale))
+    if token_budget is not None and scale < 1.0:
+        new_width = max(patch_size, new_width // patch_size * patch_size)
+        new_height = max(patch_size, new_height // patch_size * patch_size)
+    return new_width, new_height
+
+
+def prepare_image(image, max_side: Optional[int] = None, token_budget: Optional[int] = None,
+                  patch_size: int = DEFAULT_PATCH_SIZE, format: str = 'png',
+                  quality: int = 85, transform: Optional[CoordinateTransform] = None) -> PreparedImage:
+    """Downscale an image for the VLM and record the coordinate transform.
+
+    Images that are already small enough (and in the requested format)
+    are passed through without re-encoding.
+
+    Args:
+        image: CapturedImage/bytes, RawFrame, NumPy array or ImagePayload
+        max_side: Longest side limit in pixels
+        token_budget: Max vision tokens (see target_size())
+        patch_size: Encoder patch edge in pixels
+        format: Output encoding: 'png', 'jpeg' or 'ppm'
+        quality: JPEG quality
+        transform: Existing transform of the input (e.g. a crop offset)
+
+    Returns:
+        PreparedImage
+    """
+    if format not in _PIL_FORMATS:
+        raise ValueError(f"Unsupported format '{format}'. Expected one of: {', '.join(_PIL_FORMATS)}")
+    transform = transform if transform is not None else CoordinateTransform()
+
+    data = getattr(image, 'data', image)  # ImagePayload
+    encoded = isinstance(data, (bytes, bytearray))
+    if encoded:
+        width, height = image_size(data)
+    else:
+        pixels = frame_to_array(image)
+        height, width = pixels.shape[:2]
+
+    new_width, new_height = target_size(width, height, max_side, token_budget, patch_size)
+    source_format = (getattr(data, 'format', None) or _sniff_format(data)) if encoded else None
+    if (new_width, new_height) == (width, height) and source_format == format:
+        if not isinstance(data, CapturedImage):
+            data = CapturedImage(data, width, height, format)
+        return PreparedImage(data, transform, width, height)
+
+    from PIL import Image
+    pil_image = Image.fromarray(frame_to_array(image) if encoded else pixels)
+    if (new_width, new_height) != (width, height):
+        pil_image = pil_image.resize((new_width, new_height), Image.BILINEAR)
+
+    buffer = io.BytesIO()
+    save_kwargs = {'quality': quality} if format == 'jpeg' else {}
+    pil_image.convert('RGB').save(buffer, format=_PIL_FORMATS[format], **save_kwargs)
+
+    scaled = transform.scaled(new_width / width, new_height / height)
+    return PreparedImage(CapturedImage(buffer.getvalue(), new_width, new_height, format),
+                         scaled, width, height)
+
@@ -0,0 +1,530 @@
+"""
+Record agent sessions and replay them without a display.
+
+While a SessionRecorder is active, screenshots, VLM requests (prompt,
+images, response text, server timings) and mouse/keyboard actions are
+appended to `events.jsonl` in the session directory. Images are stored
+once per content hash under `blobs/`, so a static screen costs one file
+however many times it is captured. The record_* hooks called by the
+capture, client and input functions return immediately when no recorder
+is active.
+
+SessionReplayer re-sends the recorded VLM requests to any client (a stub
+or another model) and compares throughput and answers with the original
+run:
+
+    with SessionRecorder("sessions/fire"):
+        agent.run(steps=50)
+
+    report = SessionReplayer("sessions/fire").replay(OllamaClient(), model="qwen3-vl:8b")
+"""
+
+import base64
+import hashlib
+import json
+import math
+import os
+import statistics
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+EVENTS_FILE = 'events.jsonl'
+BLOB_DIR = 'blobs'
+FRAME_STORE_DIR = 'frames'
+
+# Formats that are already compressed are stored as-is
+_COMPRESSED_FORMATS = ('png', 'jpeg')
+
+# Response fields kept as server timings
+_TIMING_FIELDS = ('total_duration', 'load_duration', 'prompt_eval_count',
+                  'prompt_eval_duration', 'eval_count', 'eval_duration')
+
+# Recorder currently receiving events, if any
+_active = None
+
+
+def active_recorder() -> Optional['SessionRecorder']:
+    """Get the recorder receiving events, or None."""
+    return _active
+
+
+def _blob_format(data: bytes) -> str:
+    """Format used in blob file names ('bin' if unrecognized)."""
+    from .screen import _sniff_format
+    return _sniff_format(data) or 'bin'
+
+
+def _blob_name(digest: str, format: str) -> str:
+    suffix = '' if format in _COMPRESSED_FORMATS else '.z'
+    return f"{digest}.{format}{suffix}"
+
+
+def _image_bytes(image) -> bytes:
+    """Raw bytes of an ImagePayload, bytes or base64 string."""
+    data = getattr(image, 'data', image)
+    if isinstance(data, str):
+        return base64.b64decode(data)
+    return bytes(data)
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip through JSON so recorded kwargs are plain data."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _timings(response: Any) -> Dict[str, Any]:
+    timings = {}
+    for field in _TIMING_FIELDS:
+        try:
+            value = response[field]
+        except (KeyError, TypeError):
+            value = getattr(response, field, None)
+        if value is not None:
+            timings[field] = value
+    return timings
+
+
+class SessionRecorder:
+    """Append session events to a directory.
+
+    Usage:
+        recorder = SessionRecorder("sessions/run1")
+        recorder.start()
+        ...
+        recorder.stop()
+    """
+
+    def __init__(self, path: str, tiled: bool = False):
+        """Initialize recorder.
+
+        Args:
+            path: Session directory (created if missing; appended to if it exists)
+            tiled: Store screenshots in a tile-deduplicated FrameStore
+                instead of one blob per distinct frame. Much smaller for
+                long sessions, but decodes each frame on capture.
+        """
+        self.path = path
+        self.steps = 0
+        self.frame_store = None
+        if tiled:
+            from .framestore import FrameStore
+            self.frame_store = FrameStore(os.path.join(path, FRAME_STORE_DIR), max_bytes=None)
+        self._blobs = set()
+        self._lock = threading.Lock()
+        self._file = None
+        self._start = None
+        os.makedirs(os.path.join(path, BLOB_DIR), exist_ok=True)
+        for name in os.listdir(os.path.join(path, BLOB_DIR)):
+            self._blobs.add(name.split('.', 1)[0])
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Open the event log and start receiving events."""
+        global _active
+        if _active is not None and _active is not self:
+            raise RuntimeError("Another SessionRecorder is already active")
+        with self._lock:
+            if self._file is None:
+                self._file = open(os.path.join(self.path, EVENTS_FILE), 'a')
+            self._start = time.monotonic()
+        _active = self
+
+    def stop(self):
+        """Stop receiving events and close the event log."""
+        global _active
+        if _active is self:
+            _active = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.frame_store is not None:
+            self.frame_store.flush()
+
+    def store_blob(self, data: bytes, format: Optional[str] = None) -> str:
+        """Store image bytes once per content hash.
+
+        Returns:
+            SHA-256 hex digest identifying the blob
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._blobs:
+            return digest
+        format = format or _blob_format(data)
+        payload = data if format in _COMPRESSED_FORMATS else zlib.compress(data, 1)
+        path = os.path.join(self.path, BLOB_DIR, _blob_name(digest, format))
+        tmp_path = f"{path}.tmp{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._blobs.add(digest)
+        return digest
+
+    def _store_image(self, image) -> str:
+        digest = getattr(image, 'hash', None)  # ImagePayload memoizes it
+        if digest is not None and digest in self._blobs:
+            return digest
+        return self.store_blob(_image_bytes(image))
+
+    def _write(self, event: Dict[str, Any]):
+        with self._lock:
+            if self._file is None:
+                return
+            event['t'] = time.monotonic() - self._start
+            self._file.write(json.dumps(event, default=str) + '\n')
+            self._file.flush()
+
+    def record_frame(self, data: bytes, format: Optional[str] = None, region: Optional[str] = None):
+        """Record a captured screenshot (encoded PNG/PPM/JPEG bytes)."""
+        from .screen import _sniff_format, image_size
+        width, height = image_size(data)
+        event = {'type': 'frame'}
+        if self.frame_store is not None:
+            event.update(hash=self.frame_store.put(data), store='tiles')
+        else:
+            event['hash'] = self.store_blob(bytes(data), format)
+        event.update(width=width, height=height, format=format or _sniff_format(data), region=region)
+        self._write(event)
+
+    def record_request(self, kind: str, model: str, request: Any, system_prompt: Optional[str],
+                       images: Optional[List[Any]], kwargs: Dict[str, Any], text: str,
+                       response: Any, elapsed: float, stream: bool = False):
+        """Record a chat/generate request and its answer."""
+        if kind == 'chat':
+            messages = []
+            for message in request:
+                message = dict(message)
+                if message.get('images'):
+                    message['images'] = [self._store_image(image) for image in message['images']]
+                messages.append(message)
+            request = messages
+        self._write({
+            'type': kind,
+            'model': model,
+            'request': request,
+            'system_prompt': system_prompt,
+            'images': [self._store_image(image) for image in images or []],
+            'kwargs': _jsonable(kwargs),
+            'stream': stream,
+            'response': text,
+            'elapsed': elapsed,
+            'timings': _timings(response),
+        })
+
+    def record_action(self, action: str, **fields):
+        """Record an input action (click, right_click, move, type)."""
+        self.steps += 1
+        self._write({'type': 'action', 'action': action, **fields})
+
+
+def record_frame(data: bytes, format: Optional[str] = None, region: Optional[str] = None):
+    """Hook for capture functions; no-op unless a recorder is active."""
+    recorder = _active
+    if recorder is not None:
+        recorder.record_frame(data, format, region)
+
+
+def _effective_system_prompt(system_prompt: Optional[str]) -> str:
+    """System prompt the client actually sends (None means the configured default)."""
+    if system_prompt is not None:
+        return system_prompt
+    from .config import get_config
+    return get_config().system_prompt or ''
+
+
+def record_request(kind: str, model: str, request: Any, system_prompt: Optional[str],
+                   images: Optional[List[Any]], kwargs: Dict[str, Any], response: Any,
+                   elapsed: float):
+    """Hook for non-streamed VLM calls; no-op unless a recorder is active."""
+    recorder = _active
+    if recorder is None:
+        return
+    text = response['message']['content'] if kind == 'chat' else response['response']
+    recorder.record_request(kind, model, request, _effective_system_prompt(system_prompt),
+                            images, kwargs, text, response, elapsed)
+
+
+def record_stream(kind: str, model: str, request: Any, system_prompt: Optional[str],
+                  images: Optional[List[Any]], kwargs: Dict[str, Any], stream, start: float):
+    """Wrap a response stream so its text is recorded when it ends or is closed.
+
+    Returns the stream unchanged unless a recorder is active.
+    """
+    recorder = _active
+    if recorder is None:
+        return stream
+    return _RecordedStream(recorder, kind, model, request, _effective_system_prompt(system_prompt),
+                           images, kwargs, stream, start)
+
+
+def record_async_stream(kind: str, model: str, request: Any, system_prompt: Optional[str],
+                        images: Optional[List[Any]], kwargs: Dict[str, Any], stream, start: float):
+    """record_stream() for the async iterators returned by AsyncOllamaClient."""
+    recorder = _active
+    if recorder is None:
+        return stream
+    return _RecordedAsyncStream(recorder, kind, model, request, _effective_system_prompt(system_prompt),
+                                images, kwargs, stream, start)
+
+
+class _RecordedStream:
+    """Iterator proxy collecting streamed text for the recorder."""
+
+    def __init__(self, recorder, kind, model, request, system_prompt, images, kwargs, stream, start):
+        self._recorder = recorder
+        self._args = (kind, model, request, system_prompt, images, kwargs)
+        self._stream = stream
+        self._start = start
+        self._pieces = []
+        self._last = None
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._stream)
+        except StopIteration:
+            self._finish()
+            raise
+        return self._collect(chunk)
+
+    def _collect(self, chunk):
+        kind = self._args[0]
+        self._pieces.append(chunk['message']['content'] if kind == 'chat' else chunk['response'])
+        self._last = chunk
+        return chunk
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        kind, model, request, system_prompt, images, kwargs = self._args
+        self._recorder.record_request(kind, model, request, system_prompt, images, kwargs,
+                                      ''.join(self._pieces), self._last,
+                                      time.perf_counter() - self._start, stream=True)
+
+    def close(self):
+        close = getattr(self._stream, 'close', None)
+        if close is not None:
+            close()
+        self._finish()
+
+
+class _RecordedAsyncStream(_RecordedStream):
+    """Async iterator proxy collecting streamed text for the recorder."""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        return self._collect(chunk)
+
+    async def aclose(self):
+        aclose = getattr(self._stream, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+        self._finish()
+
+
+def record_action(action: str, **fields):
+    """Hook for input functions; no-op unless a recorder is active."""
+    recorder = _active
+    if recorder is not None:
+        recorder.record_action(action, **fields)
+
+
+class SessionReplayer:
+    """Read a recorded session and re-run its VLM requests.
+
+    Usage:
+        replayer = SessionReplayer("sessions/run1")
+        report = replayer.replay(client, model="qwen3-vl:8b", concurrency=4)
+        print(report['throughput'], report['agreement'])
+
+        # Feed the recorded frames back into an agent
+        agent = Agent(policy, capture=replayer.capture_source())
+    """
+
+    def __init__(self, path: str):
+        """Initialize replayer.
+
+        Args:
+            path: Session directory written by SessionRecorder
+        """
+        self.path = path
+        events_path = os.path.join(path, EVENTS_FILE)
+        if not os.path.exists(events_path):
+            raise RuntimeError(f"No recorded session at {path}")
+        with open(events_path) as f:
+            self.events = [json.loads(line) for line in f if line.strip()]
+        self._blob_files = {}
+        for name in os.listdir(os.path.join(path, BLOB_DIR)):
+            self._blob_files[name.split('.', 1)[0]] = name
+        self._frame_store = None
+
+    def events_of(self, *types: str) -> List[Dict[str, Any]]:
+        """Recorded events of the given types, in order."""
+        return [event for event in self.events if event['type'] in types]
+
+    def load_blob(self, digest: str) -> bytes:
+        """Load a stored image by hash."""
+        name = self._blob_files.get(digest)
+        if name is None:
+            raise KeyError(f"Blob {digest} not in session {self.path}")
+        with open(os.path.join(self.path, BLOB_DIR, name), 'rb') as f:
+            data = f.read()
+        return zlib.decompress(data) if name.endswith('.z') else data
+
+    def frames(self) -> Iterator[bytes]:
+        """Recorded screenshots in capture order, as CapturedImage."""
+        from .screen import CapturedImage, _sniff_format, image_size
+        for event in self.events_of('frame'):
+            if event.get('store') == 'tiles':
+                yield self._stored_frame(event)
+                continue
+            data = self.load_blob(event['hash'])
+            width, height = event.get('width'), event.get('height')
+            if width is None or height is None:
+                width, height = image_size(data)
+            yield CapturedImage(data, width, height, event.get('format') or _sniff_format(data))
+
+    def _stored_frame(self, event: Dict[str, Any]):
+        from .framestore import FrameStore
+        if self._frame_store is None:
+            self._frame_store = FrameStore(os.path.join(self.path, FRAME_STORE_DIR), max_bytes=None)
+        format = event.get('format')
+        return self._frame_store.get_image(event['hash'], format if format in ('ppm', 'png', 'jpeg') else 'ppm')
+
+    def capture_source(self, loop: bool = False):
+        """Callable returning the next recorded frame (for Agent(capture=...)).
+
+        Args:
+            loop: Start over after the last frame instead of raising
+        """
+        frames = list(self.frames())
+        if not frames:
+            raise RuntimeError(f"Session {self.path} has no frames")
+        position = [0]
+
+        def capture():
+            if position[0] >= len(frames):
+                if not loop:
+                    raise RuntimeError("End of recorded frames")
+                position[0] = 0
+            frame = frames[position[0]]
+            position[0] += 1
+            return frame
+        return capture
+
+    def _resend(self, client, event: Dict[str, Any], model: Optional[str]) -> Dict[str, Any]:
+        from .ollama_client import ImagePayload
+
+        images = [ImagePayload(self.load_blob(h)) for h in event['images']] or None
+        # Recorded prompts are the ones actually sent ('' = none); None lets the client default apply
+        system_prompt = event['system_prompt']
+        kwargs = dict(event['kwargs'])
+        actual_model = model or event['model']
+        start = time.perf_counter()
+        if event['type'] == 'chat':
+            messages = []
+            for message in event['request']:
+                message = dict(message)
+                if message.get('images'):
+                    message['images'] = [ImagePayload(self.load_blob(h)).base64 for h in message['images']]
+                messages.append(message)
+            response = client.chat(actual_model, messages, system_prompt=system_prompt,
+                                   images=images, **kwargs)
+            text = response['message']['content']
+        else:
+            response = client.generate(actual_model, event['request'], system_prompt=system_prompt,
+                                       images=images, **kwargs)
+            text = response['response']
+        elapsed = time.perf_counter() - start
+        return {'text': text, 'elapsed': elapsed, 'timings': _timings(response)}
+
+    def replay(self, client=None, model: Optional[str] = None, concurrency: int = 1,
+               tolerance: float = 20) -> Dict[str, Any]:
+        """Re-send every recorded VLM request and compare with the recording.
+
+        Coordinate answers are compared by pixel distance (a match is
+        within tolerance); other answers by exact text.
+
+        Args:
+            client: OllamaClient, OllamaPool or stub (shared client if None)
+            model: Model to replay against (recorded model if None)
+            concurrency: Requests in flight at once
+            tolerance: Pixel distance for coordinate answers to match
+
+        Returns:
+            Dict with requests, elapsed, throughput (requests/sec), latency
+            percentiles for the recording and the replay, agreement (fraction
+            of matching answers), mean_error_px and per-request results
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from .ollama_client import get_client
+
+        client = client if client is not None else get_client()
+        requests = self.events_of('chat', 'generate')
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            replies = list(executor.map(lambda event: self._resend(client, event, model), requests))
+        elapsed = time.perf_counter() - start
+
+        results = []
+        for event, reply in zip(requests, replies):
+            error = _answer_distance(event['response'], reply['text'])
+            matched = reply['text'].strip() == event['response'].strip() if error is None else error <= tolerance
+            results.append({'recorded': event['response'], 'replayed': reply['text'],
+                            'recorded_elapsed': event['elapsed'], 'replayed_elapsed': reply['elapsed'],
+                            'error_px': error, 'match': matched, 'timings': reply['timings']})
+
+        errors = [r['error_px'] for r in results if r['error_px'] is not None and math.isfinite(r['error_px'])]
+        return {
+            'requests': len(results),
+            'elapsed': elapsed,
+            'throughput': len(results) / elapsed if elapsed else 0.0,
+            'recorded_latency': _latency_summary([r['recorded_elapsed'] for r in results]),
+            'replayed_latency': _latency_summary([r['replayed_elapsed'] for r in results]),
+            'agreement': sum(r['match'] for r in results) / len(results) if results else 0.0,
+            'mean_error_px': statistics.fmean(errors) if errors else None,
+            'results': results,
+        }
+
+
+def _answer_distance(recorded: str, replayed: str) -> Optional[float]:
+    """Pixel distance between coordinate answers; None if the recording has none."""
+    from .coordinates import parse_coordinates
+    try:
+        x1, y1 = parse_coordinates(recorded)
+    except ValueError:
+        return None
+    try:
+        x2, y2 = parse_coordinates(replayed)
+    except ValueError:
+        return math.inf
+    return math.hypot(x1 - x2, y1 - y2)
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    from .tracing import percentile
+    ordered = sorted(values)
+    return {'p50_ms': percentile(ordered, 50) * 1000, 'p95_ms': percentile(ordered, 95) * 1000,
+            'mean_ms': statistics.fmean(ordered) * 1000}
@@ -0,0 +1,219 @@
+"""
+Content-addressed cache for VLM responses.
+
+Responses are keyed by (model, messages/prompt, system prompt, image
+hashes, options) so repeating a deterministic query on an unchanged frame
+returns instantly. Entries live in an in-memory LRU and, optionally, in
+an SQLite file that survives between runs.
+"""
+
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+# Disk access times are written in one transaction per this many hits
+_ACCESS_BATCH = 64
+
+
+def _to_dict(response: Any) -> Dict[str, Any]:
+    """Convert an ollama response object to a plain dict."""
+    if hasattr(response, 'model_dump'):
+        return response.model_dump(exclude_none=True)
+    return dict(response)
+
+
+def _from_dict(kind: str, data: Dict[str, Any]) -> Any:
+    """Rebuild an ollama response object from a stored dict."""
+    import ollama
+    response_cls = {'chat': getattr(ollama, 'ChatResponse', None),
+                    'generate': getattr(ollama, 'GenerateResponse', None)}.get(kind)
+    if response_cls is not None and hasattr(response_cls, 'model_validate'):
+        return response_cls.model_validate(data)
+    return data
+
+
+class ResponseCache:
+    """LRU response cache with an optional SQLite backend.
+
+    Usage:
+        cache = ResponseCache(max_entries=512, path="~/.cache/screenclicker.db")
+        client = OllamaClient(cache=cache)
+        client.chat(model, messages, images=[payload], cache=True,
+                    options={'temperature': 0})
+        print(cache.stats())
+    """
+
+    def __init__(self, max_entries: int = 256, path: Optional[str] = None,
+                 max_disk_entries: Optional[int] = 10000):
+        """Initialize response cache.
+
+        Args:
+            max_entries: Max responses kept in memory
+            path: SQLite file for persistent storage (memory only if None)
+            max_disk_entries: Max rows kept on disk, least recently used
+                evicted first (None = unbounded)
+        """
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got: {max_entries}")
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._accessed = {}  # key -> access time not yet written to disk
+        self._disk_entries = 0
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, kind TEXT, value TEXT, accessed REAL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self._db.commit()
+            self._disk_entries = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def make_key(kind: str, model: str, request: Any, system_prompt: Optional[str] = None,
+                 image_hashes: Optional[List[str]] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        """Build a cache key.
+
+        Args:
+            kind: 'chat' or 'generate'
+            model: Model name
+            request: Messages list (chat) or prompt string (generate)
+            system_prompt: Effective system prompt
+            image_hashes: Content hashes of attached images
+            options: Remaining request parameters (options, format, ...)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        material = json.dumps(
+            [kind, model, request, system_prompt, image_hashes or [], options or {}],
+            sort_keys=True, default=str
+        )
+        return f"{kind}:{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a response, counting the hit or miss.
+
+        Returns:
+            Cached response, or None if not cached
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT kind, value FROM responses WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self._touch(key)
+                    response = _from_dict(row[0], json.loads(row[1]))
+                    self._remember(key, response)
+                    self.hits += 1
+                    return response
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Any):
+        """Store a response."""
+        with self._lock:
+            self._remember(key, response)
+            if self._db is not None:
+                kind = key.split(':', 1)[0]
+                value = json.dumps(_to_dict(response), default=str)
+                now = time.time()
+                self._accessed.pop(key, None)
+                self._write_accesses()
+                cursor = self._db.execute(
+                    'INSERT OR IGNORE INTO responses (key, kind, value, accessed) VALUES (?, ?, ?, ?)',
+                    (key, kind, value, now)
+                )
+                if cursor.rowcount:
+                    self._disk_entries += 1
+                else:
+                    self._db.execute('UPDATE responses SET value = ?, accessed = ? WHERE key = ?',
+                                     (value, now, key))
+                # Prune only past the cap, oldest rows first via the accessed index
+                if self.max_disk_entries is not None and self._disk_entries > self.max_disk_entries:
+                    self._db.execute(
+                        'DELETE FROM responses WHERE key IN '
+                        '(SELECT key FROM responses ORDER BY accessed LIMIT ?)',
+                        (self._disk_entries - self.max_disk_entries,)
+                    )
+                    self._disk_entries = self.max_disk_entries
+                self._db.commit()
+
+    def _touch(self, key: str):
+        """Note a disk-backed access; written in batches rather than per hit."""
+        if self._db is None:
+            return
+        self._accessed[key] = time.time()
+        if len(self._accessed) >= _ACCESS_BATCH:
+            self._write_accesses()
+            self._db.commit()
+
+    def _write_accesses(self):
+        if self._accessed:
+            self._db.executemany('UPDATE responses SET accessed = ? WHERE key = ?',
+                                 [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _remember(self, key: str, response: Any):
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached responses (memory and disk) and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+                self._db.commit()
+                self._disk_entries = 0
+
+    def close(self):
+        """Close the SQLite connection, if any."""
+        with self._lock:
+            if self._db is not None:
+                self._write_accesses()
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits (0.0 if none yet)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and sizes."""
+        with self._lock:
+            disk_entries = self._disk_entries if self._db is not None else None
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+    def __len__(self) -> int:
+        return len(self._memory)
@@ -2,49 +2,312 @@
 
 import subprocess
 import tempfile
+import struct
 import os
 import json
+import copy
+import time
+import threading
+from typing import Any, NamedTuple, Optional
 
+from . import recorder, tracing
 
-def screenshot(output_path=None):
-    """Take a full screenshot using grim.
+# Formats accepted by the screenshot functions. 'raw' is captured as PPM
+# and decoded into a NumPy array.
+IMAGE_FORMATS = ('png', 'ppm', 'jpeg', 'raw')
+
+
+class CapturedImage(bytes):
+    """Encoded image bytes with their dimensions attached.
+
+    Behaves exactly like bytes, so existing callers keep working, but
+    also carries width, height and format so nobody has to decode the
+    image just to size it.
+    """
+
+    def __new__(cls, data, width, height, format):
+        obj = super().__new__(cls, data)
+        obj.width = width
+        obj.height = height
+        obj.format = format
+        return obj
+
+    def __reduce__(self):
+        return (CapturedImage, (bytes(self), self.width, self.height, self.format))
+
+    def __repr__(self):
+        return f"CapturedImage(format='{self.format}', width={self.width}, height={self.height}, size={len(self)})"
+
+
+def _sniff_format(data: bytes) -> Optional[str]:
+    """Format of encoded image bytes from their magic number ('png', 'jpeg', 'ppm' or None)."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if data[:2] == b'\xff\xd8':
+        return 'jpeg'
+    if data[:2] == b'P6':
+        return 'ppm'
+    return None
+
+
+class RawFrame(NamedTuple):
+    """Decoded RGB frame returned by format='raw'."""
+    pixels: Any  # numpy.ndarray of shape (height, width, 3), dtype uint8
+    width: int
+    height: int
+
+
+def _parse_ppm_header(data):
+    """Parse a binary PPM (P6) header.
+
+    Returns:
+        Tuple of (width, height, pixel data offset)
+
+    Raises:
+        ValueError: If data is not a P6 image or the header is cut short
+    """
+    if data[:2] != b'P6':
+        raise ValueError("Not a binary PPM image")
+    fields = []
+    pos = 2
+    end = len(data)
+    while len(fields) < 3:
+        # Skip whitespace and comments
+        while pos < end and data[pos:pos + 1].isspace():
+            pos += 1
+        if pos >= end:
+            raise ValueError("Truncated PPM header")
+        if data[pos:pos + 1] == b'#':
+            pos = data.find(b'\n', pos) + 1
+            if pos == 0:
+                raise ValueError("Truncated PPM header")
+            continue
+        start = pos
+        while pos < end and not data[pos:pos + 1].isspace():
+            pos += 1
+        if pos >= end:
+            raise ValueError("Truncated PPM header")
+        fields.append(int(data[start:pos]))
+    if fields[2] > 255:
+        raise ValueError(f"Unsupported PPM maxval: {fields[2]}")
+    # Exactly one whitespace byte separates the header from pixel data
+    return fields[0], fields[1], pos + 1
+
+
+def _jpeg_size(data):
+    """Read (width, height) from a JPEG's SOF marker."""
+    pos = 2
+    while pos + 9 < len(data):
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return width, height
+        if marker == 0xFF or marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            pos += 2 if marker != 0xFF else 1
+            continue
+        segment_length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        pos += 2 + segment_length
+    raise ValueError("No SOF marker found in JPEG data")
+
+
+def image_size(data):
+    """Get (width, height) of encoded PNG, PPM or JPEG data without decoding it.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        Tuple of (width, height)
+
+    Raises:
+        ValueError: If the format is not recognized
+    """
+    kind = _sniff_format(data)
+    if kind == 'png':
+        return struct.unpack('>II', data[16:24])
+    if kind == 'ppm':
+        width, height, _ = _parse_ppm_header(data)
+        return width, height
+    if kind == 'jpeg':
+        return _jpeg_size(data)
+    raise ValueError("Unrecognized image format")
+
+
+def _grim_args(grim_path, geometry, image_type, quality, compression):
+    """Build grim arguments (without the output path)."""
+    args = [grim_path]
+    if geometry:
+        args += ['-g', geometry]
+    if image_type != 'png':
+        args += ['-t', image_type]
+    if quality is not None and image_type == 'jpeg':
+        args += ['-q', str(quality)]
+    if compression is not None and image_type == 'png':
+        args += ['-l', str(compression)]
+    return args
+
+
+class CaptureBackend:
+    """Base class for screen capture backends.
+
+    A backend turns a grim-style geometry string ("x,y WxH", or None for
+    the whole screen) into encoded image bytes. Long-lived capturers (e.g.
+    a wlr-screencopy client) can subclass this and be installed with
+    set_capture_backend().
+    """
+
+    name = "base"
+
+    def capture(self, geometry=None, image_type='png', quality=None, compression=None):
+        """Capture the screen or a region.
+
+        Args:
+            geometry: Region as "x,y WxH", or None for the full screen
+            image_type: Encoding to produce: 'png', 'ppm' or 'jpeg'
+            quality: JPEG quality (0-100), ignored for other types
+            compression: PNG compression level (0-9), ignored for other types
+
+        Returns:
+            Encoded image bytes
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend."""
+        pass
+
+
+class GrimTempFileBackend(CaptureBackend):
+    """Capture by running grim into a temporary file and reading it back."""
+
+    name = "grim-tempfile"
+
+    def __init__(self, grim_path='grim', timeout=10):
+        self.grim_path = grim_path
+        self.timeout = timeout
+
+    def capture(self, geometry=None, image_type='png', quality=None, compression=None):
+        with tempfile.NamedTemporaryFile(suffix=f'.{image_type}', delete=False) as tmp:
+            tmp_path = tmp.name
+
+        try:
+            args = _grim_args(self.grim_path, geometry, image_type, quality, compression)
+            args.append(tmp_path)
+
+            with tracing.span('capture.grim', backend=self.name):
+                result = subprocess.run(args,
+                                        capture_output=True,
+                                        text=True,
+                                        timeout=self.timeout)
+            if result.returncode != 0:
+                raise RuntimeError(f"grim failed: {result.stderr}")
+            with tracing.span('capture.read', backend=self.name):
+                with open(tmp_path, 'rb') as f:
+                    return f.read()
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
+class GrimPipeBackend(CaptureBackend):
+    """Capture by streaming grim output over stdout (`grim -`).
+
+    The image never touches the filesystem; grim writes straight into
+    the pipe and the bytes are read into memory.
+    """
+
+    name = "grim-pipe"
+
+    def __init__(self, grim_path='grim', timeout=10):
+        self.grim_path = grim_path
+        self.timeout = timeout
+
+    def capture(self, geometry=None, image_type='png', quality=None, compression=None):
+        args = _grim_args(self.grim_path, geometry, image_type, quality, compression)
+        args.append('-')
+
+        # Reading the pipe happens inside run(), so one span covers both
+        with tracing.span('capture.grim', backend=self.name):
+            result = subprocess.run(args,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"grim failed: {result.stderr.decode('utf-8', 'replace')}")
+        return result.stdout
+
+
+# Active capture backend used by screenshot() and screenshot_region()
+_capture_backend = GrimPipeBackend()
+
+
+def set_capture_backend(backend):
+    """Set the capture backend used for screenshots.
+
+    Args:
+        backend: CaptureBackend instance
+
+    Returns:
+        The previously active backend
+    """
+    global _capture_backend
+    if not isinstance(backend, CaptureBackend):
+        raise TypeError(f"Expected a CaptureBackend, got: {type(backend)}")
+    previous = _capture_backend
+    _capture_backend = backend
+    return previous
+
+
+def get_capture_backend():
+    """Get the active capture backend."""
+    return _capture_backend
+
+
+def _capture(geometry, output_path, format='png', quality=None, compression=None):
+    """Capture via the active backend, saving to output_path if given."""
+    if format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported format '{format}'. Expected one of: {', '.join(IMAGE_FORMATS)}")
+    if format == 'raw' and output_path:
+        raise ValueError("format='raw' cannot be saved to a file")
+
+    image_type = 'ppm' if format == 'raw' else format
+    with tracing.span('capture', format=format, geometry=geometry):
+        data = _capture_backend.capture(geometry, image_type, quality, compression)
+    recorder.record_frame(data, image_type, geometry)
+
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return True
+
+    if format == 'raw':
+        import numpy as np
+        width, height, offset = _parse_ppm_header(data)
+        pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * 3, offset=offset)
+        return RawFrame(pixels.reshape(height, width, 3), width, height)
+
+    width, height = image_size(data)
+    return CapturedImage(data, width, height, format)
+
+
+def screenshot(output_path=None, format='png', quality=None, compression=None):
+    """Take a full screenshot using the active capture backend (grim by default).
     
     Args:
         output_path: Path to save screenshot. If None, returns image bytes.
+        format: 'png', 'ppm', 'jpeg' or 'raw' (NumPy array, cannot be saved)
+        quality: JPEG quality (0-100)
+        compression: PNG compression level (0-9, grim defaults to 6)
         
     Returns:
-        True if successful (when output_path provided), or bytes data
+        True if successful (when output_path provided), CapturedImage bytes
+        with width/height, or RawFrame for format='raw'
     """
     try:
-        if output_path:
-            # Save to specified path
-            result = subprocess.run(['grim', output_path], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=10)
-            if result.returncode == 0:
-                return True
-            else:
-                raise RuntimeError(f"grim failed: {result.stderr}")
-        else:
-            # Return bytes data
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-            
-            try:
-                result = subprocess.run(['grim', tmp_path], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=10)
-                if result.returncode == 0:
-                    with open(tmp_path, 'rb') as f:
-                        return f.read()
-                else:
-                    raise RuntimeError(f"grim failed: {result.stderr}")
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-                    
+        return _capture(None, output_path, format, quality, compression)
     except FileNotFoundError:
         raise RuntimeError("grim not found. Install with: apt install grim")
     except subprocess.TimeoutExpired:
@@ -53,49 +316,24 @@ def screenshot(output_path=None):
         raise RuntimeError(f"Screenshot failed: {e}")
 
 
-def screenshot_region(x, y, width, height, output_path=None):
-    """Take a screenshot of a specific region using grim.
+def screenshot_region(x, y, width, height, output_path=None, format='png', quality=None, compression=None):
+    """Take a screenshot of a specific region using the active capture backend.
     
     Args:
         x, y: Top-left coordinates of region
         width, height: Size of region
         output_path: Path to save screenshot. If None, returns image bytes.
+        format: 'png', 'ppm', 'jpeg' or 'raw' (NumPy array, cannot be saved)
+        quality: JPEG quality (0-100)
+        compression: PNG compression level (0-9, grim defaults to 6)
         
     Returns:
-        True if successful (when output_path provided), or bytes data
+        True if successful (when output_path provided), CapturedImage bytes
+        with width/height, or RawFrame for format='raw'
     """
     try:
         geometry = f"{x},{y} {width}x{height}"
-        
-        if output_path:
-            # Save to specified path
-            result = subprocess.run(['grim', '-g', geometry, output_path], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=10)
-            if result.returncode == 0:
-                return True
-            else:
-                raise RuntimeError(f"grim failed: {result.stderr}")
-        else:
-            # Return bytes data
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-            
-            try:
-                result = subprocess.run(['grim', '-g', geometry, tmp_path], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=10)
-                if result.returncode == 0:
-                    with open(tmp_path, 'rb') as f:
-                        return f.read()
-                else:
-                    raise RuntimeError(f"grim failed: {result.stderr}")
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-                    
+        return _capture(geometry, output_path, format, quality, compression)
     except FileNotFoundError:
         raise RuntimeError("grim not found. Install with: apt install grim")
     except subprocess.TimeoutExpired:
@@ -104,8 +342,8 @@ def screenshot_region(x, y, width, height, output_path=None):
         raise RuntimeError(f"Screenshot failed: {e}")
 
 
-def get_screen_info():
-    """Get screen/monitor information.
+def _query_screen_info(swaymsg_path='swaymsg'):
+    """Query monitor information from swaymsg (always forks).
     
     Returns:
         dict with screen information
@@ -113,7 +351,7 @@ def get_screen_info():
     try:
         # Try to get monitor info using swaymsg if available
         try:
-            result = subprocess.run(['swaymsg', '-t', 'get_outputs'], 
+            result = subprocess.run([swaymsg_path, '-t', 'get_outputs'], 
                                   capture_output=True, 
                                   text=True, 
                                   timeout=5)
@@ -161,15 +399,165 @@ def get_screen_info():
         }
 
 
-def screenshot_monitor(monitor_index=0, output_path=None):
+class MonitorTopology:
+    """Cached monitor layout with TTL and explicit invalidation.
+
+    swaymsg is only forked when the cached layout is older than ttl
+    seconds (None = never expires) or after invalidate(). With
+    start_watching(), a background thread follows
+    `swaymsg -t subscribe '["output"]'` and refreshes the cache on output
+    events, so readers never fork at all.
+
+    generation is bumped whenever the layout actually changes, letting
+    consumers (e.g. the virtual mouse) rebuild state only when needed.
+    """
+
+    def __init__(self, ttl=5.0, swaymsg_path='swaymsg'):
+        """Initialize topology cache.
+
+        Args:
+            ttl: Seconds before the cached layout is re-queried (None = never)
+            swaymsg_path: swaymsg executable to use
+        """
+        self.ttl = ttl
+        self.swaymsg_path = swaymsg_path
+        self.generation = 0
+        self._info = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._watch_process = None
+        self._watch_thread = None
+
+    def _is_fresh(self):
+        if self._info is None or self._fetched_at is None:
+            return False
+        if self.watching or self.ttl is None:
+            return True
+        return time.monotonic() - self._fetched_at < self.ttl
+
+    def get(self, refresh=False):
+        """Get monitor information, querying swaymsg only if stale.
+
+        Args:
+            refresh: Force a fresh query
+
+        Returns:
+            dict with screen information (a copy, safe to modify)
+        """
+        with self._lock:
+            if refresh or not self._is_fresh():
+                self._refresh_locked()
+            return copy.deepcopy(self._info)
+
+    def refresh(self):
+        """Re-query monitor information now."""
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        info = _query_screen_info(self.swaymsg_path)
+        if info != self._info:
+            self.generation += 1
+        self._info = info
+        self._fetched_at = time.monotonic()
+
+    def invalidate(self):
+        """Mark the cached layout stale so the next get() re-queries."""
+        with self._lock:
+            self._fetched_at = None
+
+    @property
+    def watching(self):
+        """True while the output event subscription is running."""
+        return self._watch_thread is not None and self._watch_thread.is_alive()
+
+    def start_watching(self):
+        """Refresh the cache from sway output events in a background thread.
+
+        Returns:
+            True if the subscription started, False if swaymsg is unavailable
+        """
+        if self.watching:
+            return True
+        try:
+            self._watch_process = subprocess.Popen(
+                [self.swaymsg_path, '-m', '-r', '-t', 'subscribe', '["output"]'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+        except FileNotFoundError:
+            return False
+
+        self._watch_thread = threading.Thread(target=self._watch, args=(self._watch_process,),
+                                              name='screenclicker-topology', daemon=True)
+        self._watch_thread.start()
+        return True
+
+    def _watch(self, process):
+        for line in process.stdout:
+            if line.strip():
+                self.refresh()
+        # Subscription ended; fall back to TTL-based refresh
+        self.invalidate()
+
+    def stop_watching(self):
+        """Stop the output event subscription."""
+        process, thread = self._watch_process, self._watch_thread
+        self._watch_process = None
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if thread is not None:
+            thread.join(timeout=2)
+        self._watch_thread = None
+
+
+# Process-wide topology cache used by get_screen_info()
+_topology = MonitorTopology()
+
+
+def get_monitor_topology():
+    """Get the process-wide MonitorTopology cache."""
+    return _topology
+
+
+def invalidate_screen_info():
+    """Drop the cached monitor layout so the next lookup re-queries swaymsg."""
+    _topology.invalidate()
+
+
+def get_screen_info(refresh=False):
+    """Get screen/monitor information.
+    
+    Served from the MonitorTopology cache; swaymsg is only run when the
+    cache is stale.
+    
+    Args:
+        refresh: Force a fresh swaymsg query
+        
+    Returns:
+        dict with screen information
+    """
+    return _topology.get(refresh)
+
+
+def screenshot_monitor(monitor_index=0, output_path=None, format='png', quality=None, compression=None):
     """Take a screenshot of a specific monitor.
     
     Args:
         monitor_index: Index of monitor to capture (0 = first monitor, 1 = second, etc.)
         output_path: Path to save screenshot. If None, returns image bytes.
+        format: 'png', 'ppm', 'jpeg' or 'raw' (NumPy array, cannot be saved)
+        quality: JPEG quality (0-100)
+        compression: PNG compression level (0-9, grim defaults to 6)
         
     Returns:
-        True if successful (when output_path provided), or bytes data
+        True if successful (when output_path provided), CapturedImage bytes
+        with width/height, or RawFrame for format='raw'
         
     Raises:
         RuntimeError: If monitor index is invalid or screenshot fails
@@ -190,7 +578,10 @@ def screenshot_monitor(monitor_index=0, output_path=None):
             monitor['y'], 
             monitor['width'], 
             monitor['height'], 
-            output_path
+            output_path,
+            format,
+            quality,
+            compression
         )
         
     except Exception as e:
@@ -0,0 +1,331 @@
+"""
+Opt-in latency tracing for capture, encoding, inference and input.
+
+Instrumented code wraps its hot sections in span(name). While tracing is
+disabled span() returns a shared no-op context manager, so the cost is
+one function call and a flag check. When enabled, every span is kept for
+per-name histograms (p50/p95/p99) and can be exported as Chrome trace
+JSON (open in chrome://tracing or https://ui.perfetto.dev).
+
+    tracing.enable()
+    run_agent()
+    print(tracing.report())
+    tracing.export_chrome_trace("trace.json")
+
+Set SCREENCLICKER_TRACE=1 to enable tracing at import.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Spans kept for the Chrome trace; durations for histograms are kept per name
+DEFAULT_MAX_SPANS = 100000
+
+_enabled = False
+_lock = threading.Lock()
+_spans = deque(maxlen=DEFAULT_MAX_SPANS)
+_durations: Dict[str, deque] = {}
+_origin = time.perf_counter()
+
+# Ollama response fields (nanoseconds) recorded by record_server_timings()
+_SERVER_TIMINGS = (
+    ('total_duration', 'ollama.server.total'),
+    ('load_duration', 'ollama.server.load'),
+    ('prompt_eval_duration', 'ollama.server.prompt_eval'),
+    ('eval_duration', 'ollama.server.eval'),
+)
+
+
+class _NullSpan:
+    """Context manager that does nothing; returned while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed section; records itself on exit."""
+
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        _record(self.name, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach extra arguments (shown in the Chrome trace)."""
+        self.args.update(args)
+
+
+def enable(max_spans: int = DEFAULT_MAX_SPANS):
+    """Start recording spans.
+
+    Args:
+        max_spans: Most recent spans (and samples per name) kept
+    """
+    global _enabled, _spans
+    with _lock:
+        if _spans.maxlen != max_spans:
+            _spans = deque(_spans, maxlen=max_spans)
+        _enabled = True
+
+
+def disable():
+    """Stop recording spans (already recorded data is kept)."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """True while spans are being recorded."""
+    return _enabled
+
+
+def reset():
+    """Drop all recorded spans and histograms."""
+    with _lock:
+        _spans.clear()
+        _durations.clear()
+
+
+def span(name: str, **args):
+    """Time a block of code: `with span("capture.grim"): ...`.
+
+    Args:
+        name: Span name; dotted prefixes group related spans
+        **args: Extra data for the Chrome trace
+
+    Returns:
+        Context manager (a shared no-op one while tracing is disabled)
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+class _TracedStream:
+    """Iterator proxy timing a streamed response as one span.
+
+    The request only runs while the stream is consumed, so the span lasts
+    from creation until the stream is exhausted, fails or is closed.
+    """
+
+    def __init__(self, name: str, stream, args: Dict[str, Any]):
+        self._name = name
+        self._stream = stream
+        self._args = args
+        self._start = time.perf_counter()
+        self._last = None
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._stream)
+        except StopIteration:
+            self._finish()
+            raise
+        except BaseException as e:
+            self._finish(type(e).__name__)
+            raise
+        self._last = chunk
+        return chunk
+
+    def _finish(self, error: Optional[str] = None):
+        if self._done:
+            return
+        self._done = True
+        end = time.perf_counter()
+        if error is not None:
+            self._args['error'] = error
+        _record(self._name, self._start, end - self._start, self._args)
+        record_server_timings(self._last, end)  # The final chunk carries them
+
+    def close(self):
+        close = getattr(self._stream, 'close', None)
+        if close is not None:
+            close()
+        self._finish()
+
+
+class _TracedAsyncStream(_TracedStream):
+    """Async iterator proxy timing a streamed response as one span."""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except BaseException as e:
+            self._finish(type(e).__name__)
+            raise
+        self._last = chunk
+        return chunk
+
+    async def aclose(self):
+        aclose = getattr(self._stream, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+        self._finish()
+
+
+def trace_stream(name: str, stream, /, **args):
+    """Time a response stream as one span ending when it is consumed or closed.
+
+    Returns the stream unchanged while tracing is disabled.
+    """
+    if not _enabled:
+        return stream
+    return _TracedStream(name, stream, args)
+
+
+def trace_async_stream(name: str, stream, /, **args):
+    """Async version of trace_stream()."""
+    if not _enabled:
+        return stream
+    return _TracedAsyncStream(name, stream, args)
+
+
+def record(name: str, seconds: float, end: Optional[float] = None, **args):
+    """Record a duration measured elsewhere (e.g. reported by a server).
+
+    Args:
+        name: Span name
+        seconds: Duration
+        end: perf_counter() time the span ended (default: now)
+        **args: Extra data for the Chrome trace
+    """
+    if not _enabled:
+        return
+    end = end if end is not None else time.perf_counter()
+    _record(name, end - seconds, seconds, args)
+
+
+def record_server_timings(response: Any, end: Optional[float] = None):
+    """Record Ollama's own timings from a chat/generate response.
+
+    Records total, load, prompt eval and eval durations as
+    ollama.server.* spans ending at `end`, with token counts attached.
+    """
+    if not _enabled or response is None:
+        return
+    end = end if end is not None else time.perf_counter()
+    counts = {key: _field(response, key) for key in ('prompt_eval_count', 'eval_count')}
+    counts = {key: value for key, value in counts.items() if value is not None}
+    for field, name in _SERVER_TIMINGS:
+        nanoseconds = _field(response, field)
+        if nanoseconds:
+            _record(name, end - nanoseconds / 1e9, nanoseconds / 1e9, dict(counts))
+
+
+def _field(response: Any, key: str) -> Any:
+    try:
+        return response[key]
+    except (KeyError, TypeError):
+        return getattr(response, key, None)
+
+
+def _record(name: str, start: float, duration: float, args: Dict[str, Any]):
+    with _lock:
+        _spans.append((name, start, duration, threading.get_ident(), args))
+        samples = _durations.get(name)
+        if samples is None:
+            samples = _durations[name] = deque(maxlen=_spans.maxlen)
+        samples.append(duration)
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted, non-empty values (pct in 0-100)."""
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def histograms() -> Dict[str, Dict[str, float]]:
+    """Summarize recorded spans per name.
+
+    Returns:
+        Dict of {name: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}
+    """
+    with _lock:
+        samples = {name: sorted(values) for name, values in _durations.items()}
+    return {
+        name: {
+            'count': len(ordered),
+            'mean_ms': sum(ordered) / len(ordered) * 1000,
+            'p50_ms': percentile(ordered, 50) * 1000,
+            'p95_ms': percentile(ordered, 95) * 1000,
+            'p99_ms': percentile(ordered, 99) * 1000,
+            'max_ms': ordered[-1] * 1000,
+        }
+        for name, ordered in sorted(samples.items()) if ordered
+    }
+
+
+def report() -> str:
+    """Format histograms() as a text table."""
+    lines = [f"{'span':<28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for name, h in histograms().items():
+        lines.append(f"{name:<28} {h['count']:>7} {h['p50_ms']:9.2f} {h['p95_ms']:9.2f} "
+                     f"{h['p99_ms']:9.2f} {h['max_ms']:9.2f}")
+    return '\n'.join(lines)
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """Recorded spans in Chrome trace event format."""
+    pid = os.getpid()
+    with _lock:
+        spans = list(_spans)
+    events = [{
+        'name': name,
+        'cat': name.split('.', 1)[0],
+        'ph': 'X',
+        'ts': (start - _origin) * 1e6,
+        'dur': duration * 1e6,
+        'pid': pid,
+        'tid': tid,
+        'args': args,
+    } for name, start, duration, tid, args in spans]
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path: str):
+    """Write recorded spans as Chrome trace JSON."""
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(), f, default=str)
+
+
+if os.environ.get('SCREENCLICKER_TRACE', '') not in ('', '0'):
+    enable()
@@ -0,0 +1,32 @@
+"""Shared fixtures: local stub Ollama servers from stubs.py."""
+
+import pytest
+
+from stubs import StubOllama
+
+
+def _start_stub():
+    return StubOllama(models=['qwen3-vl:30b']).start()
+
+
+@pytest.fixture
+def ollama_stub():
+    """Start a stub Ollama server for the duration of a test."""
+    server = _start_stub()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def ollama_stubs():
+    """Factory starting any number of stub Ollama servers: ollama_stubs(3)."""
+    servers = []
+
+    def start(count=1):
+        started = [_start_stub() for _ in range(count)]
+        servers.extend(started)
+        return started
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,306 @@
+"""
+Stand-ins for the system pieces screenclicker talks to, so benchmarks and
+tests run without Wayland, /dev/uinput or a GPU:
+
+- make_fake_grim() / make_fake_tools(): `grim` and `swaymsg` shell scripts
+  serving canned frames and output JSON
+- MockDevice / install_mock_uinput(): records uinput events in memory
+- StubOllama: local HTTP server answering the Ollama endpoints screenclicker
+  uses, with configurable replies and latency
+"""
+
+import io
+import json
+import os
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_GRIM = """#!/bin/sh
+# Log the arguments, then serve frame.<-t type> to a file or stdout ("-")
+echo "$@" > "{directory}/grim.args"
+type=png
+prev=
+for arg; do
+    if [ "$prev" = "-t" ]; then type=$arg; fi
+    prev=$arg
+done
+if [ "$prev" = "-" ]; then
+    exec cat "{directory}/frame.$type"
+else
+    exec cp "{directory}/frame.$type" "$prev"
+fi
+"""
+
+FAKE_SWAYMSG = """#!/bin/sh
+case "$*" in
+    *subscribe*) exec sleep 3600 ;;
+    *) exec cat "{directory}/outputs.json" ;;
+esac
+"""
+
+
+def render_frames(directory, width, height):
+    """Write frame.png/.ppm/.jpeg with a few button-like rectangles."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', (width, height), (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    for i in range(8):
+        x, y = 80 + i * 200, 120 + (i % 3) * 160
+        draw.rectangle((x, y, x + 160, y + 40), outline=(0, 0, 0), width=2)
+        draw.text((x + 12, y + 12), f"button {i}", fill=(0, 0, 0))
+    for type_, pil_format in (('png', 'PNG'), ('ppm', 'PPM'), ('jpeg', 'JPEG')):
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format)
+        with open(os.path.join(directory, f'frame.{type_}'), 'wb') as f:
+            f.write(buffer.getvalue())
+
+
+def _write_script(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def make_fake_grim(directory, frames=None):
+    """Create a fake grim in directory.
+
+    Each call writes its arguments to directory/grim.args and serves
+    directory/frame.<type> for the requested -t type (png by default).
+
+    Args:
+        directory: Directory for the script and frames
+        frames: Dict of type -> bytes to write as frame.<type> (None keeps
+            frames already there, e.g. from render_frames())
+
+    Returns:
+        Path of the grim script
+    """
+    for type_, data in (frames or {}).items():
+        with open(os.path.join(directory, f'frame.{type_}'), 'wb') as f:
+            f.write(data)
+    path = os.path.join(directory, 'grim')
+    _write_script(path, FAKE_GRIM.format(directory=directory))
+    return path
+
+
+def make_fake_tools(directory, width=1920, height=1080, monitors=1):
+    """Create fake grim and swaymsg in directory.
+
+    Monitors are laid out side by side, each width x height.
+
+    Returns:
+        Dict with 'grim' and 'swaymsg' paths
+    """
+    render_frames(directory, width, height)
+    outputs = [{
+        'name': f'BENCH-{i}', 'active': True, 'primary': i == 0,
+        'rect': {'x': i * width, 'y': 0, 'width': width, 'height': height},
+    } for i in range(monitors)]
+    with open(os.path.join(directory, 'outputs.json'), 'w') as f:
+        json.dump(outputs, f)
+
+    tools = {'grim': make_fake_grim(directory), 'swaymsg': os.path.join(directory, 'swaymsg')}
+    _write_script(tools['swaymsg'], FAKE_SWAYMSG.format(directory=directory))
+    return tools
+
+
+class MockDevice:
+    """In-memory replacement for uinput.Device."""
+
+    def __init__(self, *args, **kwargs):
+        self.events = 0
+        self.syncs = 0
+
+    def emit(self, event, value, syn=True):
+        self.events += 1
+        if syn:
+            self.syncs += 1
+
+    def syn(self):
+        self.syncs += 1
+
+    def destroy(self):
+        pass
+
+
+def install_mock_uinput():
+    """Make the shared mouse and keyboard use MockDevices (no init delay).
+
+    Returns:
+        Function restoring the real device factories
+    """
+    from screenclicker import keyboard, mouse
+
+    saved = (mouse._create_mouse_device, keyboard._create_keyboard_device)
+    mouse._create_mouse_device = lambda max_x=None, max_y=None: MockDevice()
+    keyboard._create_keyboard_device = lambda: MockDevice()
+    mouse.get_virtual_mouse().init_delay = 0.0
+    keyboard.get_virtual_keyboard().init_delay = 0.0
+
+    def restore():
+        mouse._create_mouse_device, keyboard._create_keyboard_device = saved
+        mouse.get_virtual_mouse().close()
+        keyboard.get_virtual_keyboard().close()
+    return restore
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body in one write, avoiding Nagle/delayed-ACK stalls
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.wfile.flush()
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, {}))
+        if not server.healthy:
+            return self._send_json({'error': 'unhealthy'}, 503)
+        if self.path == '/api/tags':
+            return self._send_json({'models': [{'model': m, 'name': m} for m in server.models]})
+        if self.path == '/api/ps':
+            return self._send_json({'models': [{'model': m, 'name': m} for m in server.loaded]})
+        self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        server = self.server
+        body = self._body()
+        with server.lock:
+            server.requests.append((self.path, body))
+        if not server.healthy:
+            return self._send_json({'error': 'unhealthy'}, 503)
+        if server.latency:
+            time.sleep(server.latency)
+
+        model = body.get('model', '')
+        if self.path in ('/api/chat', '/api/generate'):
+            return self._answer(model, body)
+        if self.path == '/api/embeddings':
+            prompt = body.get('prompt', '')
+            # Deterministic bag-of-letters embedding
+            vector = [float(prompt.lower().count(c)) for c in 'abcdefghijklmnopqrstuvwxyz']
+            return self._send_json({'embedding': vector})
+        if self.path == '/api/show':
+            return self._send_json({'details': {'family': 'stub'}, 'capabilities': ['vision'], 'model_info': {}})
+        self._send_json({'error': 'not found'}, 404)
+
+    def _answer(self, model, body):
+        server = self.server
+        with server.lock:
+            if model not in server.loaded:
+                server.loaded.append(model)
+        text = server.reply(self.path, body) if callable(server.reply) else server.reply
+        # Server-side total covers the simulated latency plus 1 us of "work"
+        timings = {'total_duration': 1000 + int(server.latency * 1e9), 'load_duration': 10,
+                   'prompt_eval_count': 5, 'prompt_eval_duration': 100, 'eval_count': 3, 'eval_duration': 200}
+        if self.path == '/api/chat':
+            make = lambda piece, done: {'model': model, 'message': {'role': 'assistant', 'content': piece}, 'done': done}
+        else:
+            make = lambda piece, done: {'model': model, 'response': piece, 'done': done}
+
+        if not body.get('stream', True):
+            return self._send_json({**make(text, True), **timings})
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        size = max(1, -(-len(text) // server.chunks))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        try:
+            for piece in pieces:
+                self._write_chunk(json.dumps(make(piece, False)) + '\n')
+            self._write_chunk(json.dumps({**make('', True), **timings}) + '\n')
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the stream
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b'\r\n')
+        self.wfile.flush()
+        if self.server.chunk_latency:
+            time.sleep(self.server.chunk_latency)
+
+
+class StubOllama(ThreadingHTTPServer):
+    """Local server mimicking the Ollama endpoints screenclicker uses.
+
+    Usage:
+        with StubOllama(latency=0.02) as server:
+            client = OllamaClient(host=server.url)
+
+    Attributes:
+        latency: Seconds each POST request waits before answering
+        chunk_latency: Seconds between the pieces of a streamed reply
+        reply: Text chat/generate answer with, or Callable(path, body) -> text
+        chunks: Number of pieces a streamed reply is split into
+        models: Names listed by /api/tags
+        loaded: Models that have answered a request, listed by /api/ps
+        healthy: When False every request gets a 503
+        requests: List of (path, body dict) received
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, reply="500,300", models=('bench-vl',)):
+        super().__init__(('127.0.0.1', 0), _OllamaHandler)
+        self.latency = latency
+        self.chunk_latency = 0.0
+        self.reply = reply
+        self.chunks = 4
+        self.models = list(models)
+        self.loaded = []
+        self.healthy = True
+        self.requests = []
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def request_count(self, path=None):
+        """Requests received, optionally only those for path."""
+        with self.lock:
+            return len([r for r in self.requests if path is None or r[0] == path])
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
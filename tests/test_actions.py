@@ -0,0 +1,97 @@
+"""Tests for typed actions and schema-constrained action requests."""
+
+import json
+import pytest
+from screenclicker.actions import (
+    Click, RightClick, Move, Type, Wait, ACTION_SCHEMA, action_schema, parse_action, action_to_dict
+)
+from screenclicker.frames import CoordinateTransform
+from screenclicker.ollama_client import OllamaClient
+
+
+@pytest.mark.parametrize("data,expected", [
+    ('{"action": "click", "x": 10, "y": 20}', Click(10, 20)),
+    ({'action': 'right_click', 'x': 1.6, 'y': 2}, RightClick(2, 2)),
+    ({'action': 'move', 'x': 5, 'y': 6, 'text': 'ignored'}, Move(5, 6)),
+    ({'action': 'type', 'text': 'hello'}, Type('hello')),
+    ({'action': 'wait', 'seconds': 1.5}, Wait(1.5)),
+])
+def test_parse_action(data, expected):
+    assert parse_action(data) == expected
+
+
+@pytest.mark.parametrize("data", [
+    'not json',
+    '[1, 2]',
+    '{"action": "jump"}',
+    '{"action": "click", "x": 10}',
+    '{"action": "click", "x": "10", "y": 20}',
+    '{"action": "type", "text": 5}',
+    '{"action": "wait", "seconds": -1}',
+])
+def test_parse_action_invalid(data):
+    with pytest.raises(ValueError):
+        parse_action(data)
+
+
+def test_parse_action_applies_transform_and_allowed():
+    transform = CoordinateTransform(100, 50, 0.5, 0.5)
+    assert parse_action({'action': 'click', 'x': 10, 'y': 10}, transform) == Click(120, 70)
+    with pytest.raises(ValueError):
+        parse_action({'action': 'type', 'text': 'x'}, allowed=('click',))
+
+
+def test_action_schema_and_dict_round_trip():
+    schema = action_schema('click')
+    assert schema['properties']['action']['enum'] == ['click']
+    assert ACTION_SCHEMA['properties']['action']['enum'] != ['click']
+    with pytest.raises(ValueError):
+        action_schema('fly')
+    assert action_to_dict(Type('hi')) == {'action': 'type', 'text': 'hi'}
+    assert parse_action(action_to_dict(Click(3, 4))) == Click(3, 4)
+
+
+def test_chat_action_sends_format_and_retries(ollama_stub):
+    answers = iter(['{"action": "click", "x": 10}', '{"action": "click", "x": 10, "y": 20}'])
+    ollama_stub.reply = lambda path, body: next(answers)
+    client = OllamaClient(host=ollama_stub.url)
+
+    action = client.chat_action("test", [{"role": "user", "content": "where?"}],
+                                images=[b'png-bytes'], schema=action_schema('click'))
+    assert action == Click(10, 20)
+
+    chats = [body for path, body in ollama_stub.requests if path == '/api/chat']
+    assert len(chats) == 2
+    assert chats[0]['format'] == action_schema('click')
+    # The retry resends the same image and explains the error
+    assert chats[1]['messages'][-1]['images'] == chats[0]['messages'][-1]['images']
+    assert chats[1]['messages'][-2]['role'] == 'assistant'
+    assert 'invalid' in chats[1]['messages'][-1]['content']
+
+
+def test_chat_action_gives_up(ollama_stub):
+    ollama_stub.reply = lambda path, body: json.dumps({'action': 'type', 'text': 'x'})
+    client = OllamaClient(host=ollama_stub.url)
+    with pytest.raises(ValueError):
+        client.chat_action("test", [{"role": "user", "content": "where?"}],
+                           schema=action_schema('click'), retries=1)
+    assert ollama_stub.request_count('/api/chat') == 2
+    with pytest.raises(ValueError, match="retries"):
+        client.chat_action("test", [{"role": "user", "content": "where?"}], retries=-1)
+    assert ollama_stub.request_count('/api/chat') == 2
+
+
+def test_chat_action_caches_only_valid_answers(ollama_stub):
+    from screenclicker.response_cache import ResponseCache
+
+    answers = iter(['{"action": "click"}', '{"action": "click", "x": 1, "y": 2}'])
+    ollama_stub.reply = lambda path, body: next(answers)
+    client = OllamaClient(host=ollama_stub.url, cache=ResponseCache())
+    messages = [{"role": "user", "content": "where?"}]
+    kwargs = dict(images=[b'png'], schema=action_schema('click'), cache=True, options={'temperature': 0})
+
+    assert client.chat_action("test", messages, **kwargs) == Click(1, 2)
+    assert len(client.cache) == 1
+    # Served from the cache: the valid answer, no new request
+    assert client.chat_action("test", messages, **kwargs) == Click(1, 2)
+    assert ollama_stub.request_count('/api/chat') == 2
@@ -0,0 +1,180 @@
+"""Tests for the pipelined agent loop."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from screenclicker.actions import Click, Type
+from screenclicker.agent import Agent, Frame, VLMPolicy, execute_action
+from screenclicker.ollama_client import OllamaClient
+from screenclicker.screen import RawFrame
+
+
+def _frame(value=0):
+    return RawFrame(np.full((64, 64, 3), value, dtype=np.uint8), 64, 64)
+
+
+def test_stages_overlap():
+    delay = 0.05
+
+    def capture():
+        time.sleep(delay)
+        return _frame()
+
+    def policy(frame):
+        time.sleep(delay)
+        return {'action': 'click', 'x': frame.index, 'y': 0}
+
+    executed = []
+
+    def execute(action):
+        time.sleep(delay)
+        executed.append(action)
+
+    agent = Agent(policy, capture=capture, execute=execute)
+    start = time.monotonic()
+    agent.run(steps=10)
+    elapsed = time.monotonic() - start
+
+    assert len(executed) >= 10
+    assert [a['x'] for a in executed[:10]] == list(range(10))
+    # Serial would take 10 * 3 * delay = 1.5s; pipelined is ~(10 + 2) * delay
+    assert elapsed < 10 * 3 * delay * 0.7
+    stats = agent.stats()
+    assert stats['steps'] >= 10
+    assert stats['steps_per_minute'] > 0
+    assert stats['stage_ms']['infer'] >= delay * 1000 * 0.8
+
+
+def test_backpressure_bounds_capture():
+    captured = []
+    release = threading.Event()
+
+    def capture():
+        captured.append(1)
+        return _frame()
+
+    def policy(frame):
+        release.wait()
+        return None
+
+    agent = Agent(policy, capture=capture, execute=lambda a: None, queue_size=1)
+    agent.start()
+    time.sleep(0.3)
+    # One frame in the policy, one queued, one blocked in put()
+    assert len(captured) <= 3
+    release.set()
+    agent.stop()
+    assert not agent.running
+
+
+def test_max_rate_limits_capture():
+    captured = []
+    agent = Agent(lambda frame: None, capture=lambda: captured.append(1) or _frame(),
+                  execute=lambda a: None, max_rate=20)
+    agent.run(duration=0.5)
+    assert 5 <= len(captured) <= 13
+
+
+def test_skip_unchanged_frames():
+    frames = iter([_frame(0), _frame(0), _frame(0), _frame(255)] + [_frame(255)] * 1000)
+    seen = []
+
+    def policy(frame):
+        seen.append(frame.index)
+        return {'action': 'noop'}
+
+    agent = Agent(policy, capture=lambda: next(frames), execute=lambda a: None,
+                  skip_unchanged=True, max_rate=100)
+    agent.run(steps=2)
+    assert seen[:2] == [0, 1]
+    assert agent.stats()['skipped'] >= 2
+
+
+def test_policy_errors_are_counted():
+    calls = []
+
+    def policy(frame):
+        calls.append(frame.index)
+        if len(calls) == 1:
+            raise RuntimeError("model crashed")
+        return {'action': 'noop'}
+
+    agent = Agent(policy, capture=_frame, execute=lambda a: None)
+    agent.run(steps=1)
+    assert agent.errors == 1
+    assert isinstance(agent.last_error, RuntimeError)
+
+
+def test_capture_errors_back_off():
+    def capture():
+        raise RuntimeError("grim failed")
+
+    agent = Agent(lambda frame: {'action': 'noop'}, capture=capture, execute=lambda a: None)
+    agent.start()
+    time.sleep(0.3)
+    agent.stop()
+    assert 1 <= agent.errors < 5
+    assert str(agent.last_error) == "grim failed"
+
+
+def test_warmup_failure_does_not_block_start():
+    class Policy:
+        def __call__(self, frame):
+            return {'action': 'noop'}
+
+        def warmup(self):
+            raise RuntimeError("Ollama unreachable")
+
+    agent = Agent(Policy(), capture=_frame, execute=lambda a: None)
+    agent.run(steps=1)
+    assert agent.steps == 1
+    deadline = time.monotonic() + 1
+    while agent.errors == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert agent.errors == 1
+    assert str(agent.last_error) == "Ollama unreachable"
+
+
+def test_invalid_queue_size():
+    with pytest.raises(ValueError):
+        Agent(lambda frame: None, queue_size=0)
+
+
+def test_execute_action_dispatch(monkeypatch):
+    import screenclicker.mouse as mouse
+    import screenclicker.keyboard as keyboard
+    calls = []
+    monkeypatch.setattr(mouse, 'left_click', lambda x, y, m=None: calls.append(('click', x, y, m)) or True)
+    monkeypatch.setattr(keyboard, 'text', lambda s: calls.append(('type', s)) or True)
+
+    assert execute_action(Click(5, 6), 1)
+    assert execute_action(Type('hi'))
+    assert execute_action({'action': 'click', 'x': 7, 'y': 8})
+    assert not execute_action(None)
+    assert calls == [('click', 5, 6, 1), ('type', 'hi'), ('click', 7, 8, None)]
+    with pytest.raises(ValueError):
+        execute_action({'action': 'jump'})
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_vlm_policy(ollama_stub, stream):
+    ollama_stub.reply = lambda path, body: "The button is at 10,20"
+    policy = VLMPolicy("click the button", client=OllamaClient(host=ollama_stub.url),
+                       model="test", stream=stream)
+    action = policy(Frame(0, _frame(), time.monotonic()))
+    assert action == Click(10, 20)
+
+    ollama_stub.reply = lambda path, body: "I don't know"
+    assert policy(Frame(1, _frame(), time.monotonic())) is None
+
+
+def test_vlm_policy_structured(ollama_stub):
+    ollama_stub.reply = lambda path, body: '{"action": "type", "text": "wood"}'
+    policy = VLMPolicy("gather wood", client=OllamaClient(host=ollama_stub.url),
+                       model="test", actions=('click', 'type'))
+    assert policy(Frame(0, _frame(), time.monotonic())) == Type('wood')
+    body = ollama_stub.requests[-1][1]
+    assert body['format']['properties']['action']['enum'] == ['click', 'type']
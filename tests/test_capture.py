@@ -0,0 +1,158 @@
+"""Tests for screen capture backends using a fake grim executable."""
+
+import io
+import struct
+import pickle
+import zlib
+import numpy as np
+import pytest
+from PIL import Image
+from stubs import make_fake_grim
+from screenclicker.screen import (
+    CaptureBackend, GrimPipeBackend, GrimTempFileBackend, CapturedImage, RawFrame,
+    set_capture_backend, get_capture_backend, screenshot, screenshot_region, image_size
+)
+
+
+def _png_header(width, height):
+    """PNG signature plus IHDR chunk, enough for image_size()."""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr
+            + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr)))
+
+
+FRAME = _png_header(640, 480) + b'fake frame data' * 100
+PPM_PIXELS = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(3, 4, 3)
+PPM_FRAME = b'P6\n# grim\n4 3\n255\n' + PPM_PIXELS.tobytes()
+
+
+@pytest.fixture
+def fake_grim(tmp_path):
+    """Create a fake grim serving FRAME (PPM_FRAME for -t ppm)."""
+    grim_path = make_fake_grim(str(tmp_path), {'png': FRAME, 'jpeg': FRAME, 'ppm': PPM_FRAME})
+    return grim_path, tmp_path / 'grim.args'
+
+
+@pytest.fixture
+def restore_backend():
+    """Restore the active capture backend after the test."""
+    previous = get_capture_backend()
+    yield
+    set_capture_backend(previous)
+
+
+def test_default_backend_is_pipe():
+    assert isinstance(get_capture_backend(), GrimPipeBackend)
+
+
+@pytest.mark.parametrize("backend_cls", [GrimPipeBackend, GrimTempFileBackend])
+def test_backend_capture(fake_grim, backend_cls):
+    grim_path, args_log = fake_grim
+    backend = backend_cls(grim_path)
+    assert backend.capture() == FRAME
+    assert backend.capture("10,20 300x200") == FRAME
+    assert args_log.read_text().startswith("-g 10,20 300x200")
+
+
+def test_pipe_backend_writes_to_stdout(fake_grim):
+    grim_path, args_log = fake_grim
+    GrimPipeBackend(grim_path).capture()
+    assert args_log.read_text().strip() == "-"
+
+
+def test_screenshot_uses_active_backend(fake_grim, restore_backend, tmp_path):
+    grim_path, args_log = fake_grim
+    set_capture_backend(GrimPipeBackend(grim_path))
+
+    assert screenshot() == FRAME
+    assert screenshot_region(0, 0, 200, 150) == FRAME
+    assert args_log.read_text().startswith("-g 0,0 200x150")
+
+    out = tmp_path / 'out.png'
+    assert screenshot(str(out)) is True
+    assert out.read_bytes() == FRAME
+
+
+def test_custom_backend(restore_backend):
+    class StaticBackend(CaptureBackend):
+        def capture(self, geometry=None, image_type='png', quality=None, compression=None):
+            self.geometry = geometry
+            return FRAME
+
+    backend = StaticBackend()
+    set_capture_backend(backend)
+    assert screenshot() == FRAME
+    assert backend.geometry is None
+    assert screenshot_region(1, 2, 3, 4) == FRAME
+    assert backend.geometry == '1,2 3x4'
+
+
+def test_set_capture_backend_rejects_non_backend():
+    with pytest.raises(TypeError):
+        set_capture_backend(object())
+
+
+def test_capture_failure_raises_runtime_error(restore_backend):
+    set_capture_backend(GrimPipeBackend('/nonexistent/grim'))
+    with pytest.raises(RuntimeError):
+        screenshot()
+
+
+def test_captured_image_carries_dimensions(fake_grim, restore_backend):
+    grim_path, _ = fake_grim
+    set_capture_backend(GrimPipeBackend(grim_path))
+
+    img = screenshot_region(0, 0, 640, 480)
+    assert isinstance(img, bytes)
+    assert isinstance(img, CapturedImage)
+    assert (img.width, img.height, img.format) == (640, 480, 'png')
+    assert pickle.loads(pickle.dumps(img)).width == 640
+
+
+def test_raw_format_returns_numpy_frame(fake_grim, restore_backend):
+    grim_path, args_log = fake_grim
+    set_capture_backend(GrimPipeBackend(grim_path))
+
+    frame = screenshot_region(0, 0, 4, 3, format='raw')
+    assert isinstance(frame, RawFrame)
+    assert (frame.width, frame.height) == (4, 3)
+    assert np.array_equal(frame.pixels, PPM_PIXELS)
+    assert '-t ppm' in args_log.read_text()
+
+
+@pytest.mark.parametrize("data", [b'P6', b'P6\n', b'P6\n# grim', b'P6\n4 3', b'P6\n4 3\n255'])
+def test_truncated_ppm_header_raises(data):
+    with pytest.raises(ValueError, match="Truncated PPM header"):
+        image_size(data)
+
+
+def test_partial_grim_output_raises_runtime_error(restore_backend):
+    class PartialBackend(CaptureBackend):
+        def capture(self, geometry=None, image_type='png', quality=None, compression=None):
+            return b'P6\n4 3'
+
+    set_capture_backend(PartialBackend())
+    with pytest.raises(RuntimeError, match="Truncated PPM header"):
+        screenshot(format='raw')
+
+
+def test_format_arguments_passed_to_grim(fake_grim, restore_backend):
+    grim_path, args_log = fake_grim
+    set_capture_backend(GrimPipeBackend(grim_path))
+
+    screenshot(format='jpeg', quality=75)
+    assert '-t jpeg -q 75' in args_log.read_text()
+    screenshot(compression=1)
+    assert '-l 1' in args_log.read_text()
+
+    with pytest.raises(RuntimeError):
+        screenshot(format='bmp')
+    with pytest.raises(RuntimeError):
+        screenshot('out.ppm', format='raw')
+
+
+@pytest.mark.parametrize("fmt", ["PNG", "PPM", "JPEG"])
+def test_image_size_matches_pil(fmt):
+    buffer = io.BytesIO()
+    Image.new('RGB', (123, 45)).save(buffer, format=fmt)
+    assert image_size(buffer.getvalue()) == (123, 45)
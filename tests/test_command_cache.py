@@ -0,0 +1,52 @@
+"""Tests for the embedding-keyed command cache."""
+
+import numpy as np
+import pytest
+from screenclicker.command_cache import CommandCache
+from screenclicker.ollama_client import OllamaClient
+
+
+def _embedding_requests(stub):
+    return [body for path, body in stub.requests if path == '/api/embeddings']
+
+
+def test_paraphrase_matches_resolved_command(ollama_stub):
+    # The stub embeds text as letter counts
+    commands = CommandCache(client=OllamaClient(host=ollama_stub.url), threshold=0.9)
+    assert commands.lookup("click the close button") is None  # Empty index
+    commands.add("Click the close button")
+    assert "click the close button" in commands
+
+    match = commands.lookup("click  the CLOSE button")
+    assert match == ("click the close button", 1.0)
+    match = commands.lookup("click on the close button")
+    assert match.command == "click the close button" and 0.9 <= match.similarity < 1.0
+    assert commands.lookup("zzz") is None
+
+
+def test_embeddings_computed_once_per_command(ollama_stub):
+    commands = CommandCache(client=OllamaClient(host=ollama_stub.url))
+    commands.add("stoke fire")
+    for _ in range(3):
+        commands.lookup("stoke the fire")
+        commands.lookup("Stoke  Fire")
+    assert commands.embed_calls == 2
+    assert len(_embedding_requests(ollama_stub)) == 2
+    assert np.linalg.norm(commands.embed("stoke fire")) == pytest.approx(1.0)
+
+
+def test_index_persists_between_runs(ollama_stub, tmp_path):
+    path = str(tmp_path / 'commands.npz')
+    client = OllamaClient(host=ollama_stub.url)
+    commands = CommandCache(path, client=client)
+    commands.add("click the close button")
+    commands.embed("unresolved command")
+    commands.save()
+
+    reloaded = CommandCache(path, client=client)
+    assert reloaded.stats() == {'embedded': 2, 'resolved': 1, 'embed_calls': 0}
+    assert reloaded.lookup("click on the close button").command == "click the close button"
+    assert reloaded.discard("click the close button") and len(reloaded) == 0
+
+    # An index built with another embedding model is not reused
+    assert len(CommandCache(path, client=client, model="other-embed")) == 0
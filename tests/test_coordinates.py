@@ -0,0 +1,91 @@
+"""Tests for coordinate parsing and multi-sample voting."""
+
+import time
+import pytest
+from screenclicker.coordinates import (
+    parse_coordinates, median_point, vote_coordinates, largest_cluster, CoordinateVoter,
+    CoordinateStreamParser, stream_coordinates
+)
+from screenclicker.frames import CoordinateTransform
+from screenclicker.ollama_client import OllamaClient
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("500,300", (500, 300)),
+    ("(12, 34)", (12, 34)),
+    ("The button is at 640, 480.", (640, 480)),
+])
+def test_parse_coordinates(text, expected):
+    assert parse_coordinates(text) == expected
+
+
+def test_parse_coordinates_failure():
+    with pytest.raises(ValueError):
+        parse_coordinates("no numbers here")
+
+
+def test_median_point_ignores_single_outlier():
+    assert median_point([(100, 100), (102, 98), (1800, 1000)]) == (102, 100)
+
+
+def test_vote_uses_largest_cluster():
+    points = [(1800, 1000), (100, 100), (104, 96), (98, 102)]
+    assert sorted(largest_cluster(points, 10)) == [(98, 102), (100, 100), (104, 96)]
+    assert vote_coordinates(points, tolerance=10) == (100, 100)
+
+
+def test_vote_empty_raises():
+    with pytest.raises(ValueError):
+        vote_coordinates([])
+
+
+def test_voter_early_exit():
+    voter = CoordinateVoter(tolerance=15, agree=2)
+    assert voter.add((500, 300)) is False
+    assert voter.add((900, 100)) is False
+    assert voter.add((505, 310)) is True
+    assert voter.done
+    assert voter.result() == (502, 305)
+
+
+def test_voter_without_agree_never_finishes_early():
+    voter = CoordinateVoter()
+    for _ in range(5):
+        assert voter.add((1, 1)) is False
+
+
+def test_stream_parser_waits_for_complete_pair():
+    parser = CoordinateStreamParser()
+    assert parser.feed("Sure: (12") is None
+    assert parser.feed(", 3") is None
+    assert parser.feed("4") is None
+    assert parser.feed(") because") == (12, 34)
+
+
+def test_stream_parser_ignores_thinking():
+    parser = CoordinateStreamParser()
+    assert parser.feed("<think>maybe 1,2 or ") is None
+    assert parser.feed("3,4?</think>Answer: 500,300\n") == (500, 300)
+
+
+def test_stream_parser_finish_and_transform():
+    parser = CoordinateStreamParser(CoordinateTransform(10, 10, 0.5, 0.5))
+    parser.feed("100,50")
+    assert parser.point is None
+    assert parser.finish() == (210, 110)
+    with pytest.raises(ValueError):
+        CoordinateStreamParser().finish()
+
+
+def test_stream_coordinates_cancels_early(ollama_stub):
+    ollama_stub.reply = lambda path, body: "500,300 " + "and then the model keeps rambling " * 20
+    ollama_stub.chunks = 40
+    ollama_stub.chunk_latency = 0.02
+    client = OllamaClient(host=ollama_stub.url)
+
+    start = time.monotonic()
+    point, text = stream_coordinates(client, "m", [{"role": "user", "content": "where?"}])
+    assert point == (500, 300)
+    assert text.startswith("500,300")
+    # Full stream would take 40+ chunks x 20 ms
+    assert time.monotonic() - start < 0.5
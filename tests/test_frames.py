@@ -0,0 +1,161 @@
+"""Tests for frame differencing."""
+
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from screenclicker import screen
+from screenclicker.screen import RawFrame, CaptureBackend, set_capture_backend
+from screenclicker.ollama_client import ImagePayload
+from screenclicker.frames import (
+    FrameChangeDetector, frame_to_array, average_hash, hamming_distance,
+    CoordinateTransform, DirtyRegionCapturer, pad_region
+)
+
+
+def _frame(width=256, height=128, value=40):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_first_frame_is_full_change():
+    change = FrameChangeDetector().update(_frame())
+    assert change.changed
+    assert change.regions == [(0, 0, 256, 128)]
+
+
+def test_static_frame_unchanged():
+    detector = FrameChangeDetector()
+    detector.update(_frame())
+    noisy = _frame()
+    noisy[5, 5] = 255  # A single pixel stays under the threshold
+    change = detector.update(noisy)
+    assert not change.changed
+    assert change.regions == []
+    assert change.bounding_box is None
+
+
+def test_changed_regions_located():
+    detector = FrameChangeDetector(tile_size=32)
+    detector.update(_frame())
+    frame = _frame()
+    frame[40:60, 70:90] = 255
+    change = detector.update(frame)
+
+    assert change.changed
+    assert change.regions == [(64, 32, 32, 32)]
+    assert change.bounding_box == (64, 32, 32, 32)
+    assert change.score == pytest.approx(1 / 32)
+
+
+def test_edge_tiles_clipped():
+    detector = FrameChangeDetector(tile_size=32)
+    detector.update(_frame(100, 50))
+    frame = _frame(100, 50)
+    frame[40:48, 96:100] = 255
+    change = detector.update(frame)
+    assert change.regions == [(96, 32, 4, 18)]
+
+
+def test_size_change_resets():
+    detector = FrameChangeDetector()
+    detector.update(_frame())
+    assert detector.update(_frame(128, 128)).score == 1.0
+
+
+def test_frame_to_array_inputs():
+    pixels = np.random.randint(0, 255, (6, 8, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG')
+    png = buffer.getvalue()
+    ppm = b'P6\n8 6\n255\n' + pixels.tobytes()
+
+    for frame in (pixels, RawFrame(pixels, 8, 6), png, ImagePayload(png), ppm):
+        assert np.array_equal(frame_to_array(frame), pixels)
+    with pytest.raises(TypeError):
+        frame_to_array(42)
+
+
+def test_average_hash_tolerates_noise():
+    rng = np.random.default_rng(0)
+    base = np.zeros((64, 64, 3), dtype=np.uint8)
+    base[:, 32:] = 200
+    noisy = np.clip(base + rng.integers(0, 10, base.shape), 0, 255).astype(np.uint8)
+    inverted = 255 - base
+    assert hamming_distance(average_hash(base), average_hash(noisy)) <= 2
+    assert hamming_distance(average_hash(base), average_hash(inverted)) > 32
+
+
+def test_tile_size_must_match_downsample():
+    with pytest.raises(ValueError):
+        FrameChangeDetector(tile_size=30, downsample_factor=4)
+
+
+class ScreenBackend(CaptureBackend):
+    """Serves crops of an in-memory screen as PPM."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.geometries = []
+
+    def capture(self, geometry=None, image_type='png', quality=None, compression=None):
+        self.geometries.append(geometry)
+        position, size = geometry.split(' ')
+        x, y = map(int, position.split(','))
+        w, h = map(int, size.split('x'))
+        crop = self.screen[y:y + h, x:x + w]
+        return b'P6\n%d %d\n255\n' % (crop.shape[1], crop.shape[0]) + crop.tobytes()
+
+
+@pytest.fixture
+def fake_screen(monkeypatch):
+    screen_pixels = _frame(740, 480)  # DP-2 spans x 100..740
+    backend = ScreenBackend(screen_pixels)
+    previous = set_capture_backend(backend)
+    monitors = {'monitors': [
+        {'name': 'DP-1', 'x': 0, 'y': 0, 'width': 1000, 'height': 800, 'primary': True},
+        {'name': 'DP-2', 'x': 100, 'y': 0, 'width': 640, 'height': 480, 'primary': False},
+    ]}
+    monkeypatch.setattr(screen, 'get_screen_info', lambda refresh=False: monitors)
+    yield screen_pixels, backend
+    set_capture_backend(previous)
+
+
+def test_dirty_region_capture(fake_screen):
+    pixels, backend = fake_screen
+    capturer = DirtyRegionCapturer(monitor_index=1, padding=16, min_size=64, format='ppm')
+
+    first = capturer.capture()
+    assert first.region == (0, 0, 640, 480)
+
+    assert capturer.capture() is None
+
+    pixels[200:220, 400:430] = 255  # Monitor-relative x 300..330
+    capture = capturer.capture()
+    x, y, w, h = capture.region
+    assert (x, y) == (272, 176) and (w, h) == (96, 64)
+    # One grim call per capture; the region is cropped from that frame
+    assert backend.geometries == ["100,0 640x480"] * 3
+    assert frame_to_array(capture.image).tolist() == pixels[y:y + h, 100 + x:100 + x + w].tolist()
+    assert capture.transform.to_monitor(10, 5) == (282, 181)
+
+
+def test_dirty_region_forced(fake_screen):
+    capturer = DirtyRegionCapturer(monitor_index=1, format='ppm')
+    capturer.capture()
+    assert capturer.capture(force=True).region == (0, 0, 640, 480)
+
+
+@pytest.mark.parametrize("region,expected", [
+    ((100, 100, 10, 10), (90, 90, 30, 30)),
+    ((0, 0, 10, 10), (0, 0, 64, 64)),
+    ((630, 470, 10, 10), (576, 416, 64, 64)),
+])
+def test_pad_region(region, expected):
+    padding, min_size = (10, 0) if expected[2] == 30 else (10, 64)
+    assert pad_region(region, padding, 640, 480, min_size) == expected
+
+
+def test_coordinate_transform_round_trip():
+    transform = CoordinateTransform(100, 50).scaled(0.5, 0.5)
+    assert transform.to_monitor(10, 20) == (120, 90)
+    assert transform.from_monitor(120, 90) == (10, 20)
@@ -0,0 +1,91 @@
+"""Tests for the tile-deduplicating frame store."""
+
+import io
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from screenclicker.framestore import FrameStore
+
+
+def _frame(seed=0, width=200, height=130):
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    pixels[:, :, 0] = np.arange(width, dtype=np.uint8)
+    pixels[10:20, 10:20] = seed
+    return pixels
+
+
+def test_put_get_roundtrip_with_edge_tiles(tmp_path):
+    with FrameStore(str(tmp_path / 'store'), tile_size=64) as store:
+        pixels = _frame(7)
+        key = store.put(pixels)
+        assert np.array_equal(store.get(key), pixels)
+        assert key in store and len(store) == 1
+
+
+def test_same_pixels_same_key_across_formats(tmp_path):
+    pixels = _frame(3)
+    png = io.BytesIO()
+    Image.fromarray(pixels).save(png, format='PNG')
+    ppm = f"P6\n200 130\n255\n".encode() + pixels.tobytes()
+    with FrameStore(str(tmp_path / 'store')) as store:
+        assert store.put(png.getvalue()) == store.put(ppm)
+        assert len(store) == 1
+
+
+def test_near_identical_frames_share_tiles(tmp_path):
+    with FrameStore(str(tmp_path / 'store'), tile_size=64) as store:
+        first = store.put(_frame(1))
+        tiles_one = store.stats()['tiles']
+        second = store.put(_frame(2))  # Only the top-left tile differs
+        stats = store.stats()
+        assert first != second
+        assert stats['tiles'] == tiles_one + 1
+        assert stats['dedup_ratio'] > 1.5
+        assert store.get(first)[15, 15, 1] == 1 and store.get(second)[15, 15, 1] == 2
+
+
+def test_reused_capture_buffer_is_not_aliased(tmp_path):
+    with FrameStore(str(tmp_path / 'store'), tile_size=64) as store:
+        buffer = _frame(1)
+        first = store.put(buffer)
+        buffer[10:20, 10:20] = 2  # Next capture written into the same buffer
+        second = store.put(buffer)
+        assert first != second
+        assert store.get(second)[15, 15, 1] == 2
+
+
+def test_lru_eviction_and_compaction(tmp_path):
+    frame_bytes = 64 * 64 * 3
+    with FrameStore(str(tmp_path / 'store'), max_bytes=2 * frame_bytes, tile_size=64) as store:
+        keys = [store.put(np.full((64, 64, 3), i, dtype=np.uint8)) for i in range(3)]
+        assert keys[0] not in store and store.evictions == 1
+        store.get(keys[1])  # Most recently used now
+        store.put(np.full((64, 64, 3), 9, dtype=np.uint8))
+        assert keys[1] in store and keys[2] not in store
+        assert store.stats()['stored_bytes'] <= 2 * frame_bytes
+
+        store._compact()
+        assert store.stats()['pack_bytes'] == 2 * frame_bytes
+        assert store.get(keys[1])[0, 0, 0] == 1
+
+
+def test_reopen_persists_index(tmp_path):
+    path = str(tmp_path / 'store')
+    with FrameStore(path, tile_size=32) as store:
+        key = store.put(_frame(5))
+    with FrameStore(path) as store:
+        assert store.tile_size == 32
+        assert np.array_equal(store.get(key), _frame(5))
+        other = store.put(_frame(6))
+        assert store.get_image(other, 'png').width == 200
+    with pytest.raises(KeyError):
+        FrameStore(path).get('missing')
+
+
+def test_temporary_store_is_removed():
+    store = FrameStore()
+    store.put(_frame())
+    path = store.path
+    store.close()
+    assert not os.path.exists(path)
@@ -0,0 +1,100 @@
+"""Tests for the persistent virtual keyboard using a fake uinput device."""
+
+import time
+import pytest
+import uinput
+from screenclicker import keyboard
+from screenclicker.keyboard import VirtualKeyboard
+
+
+class FakeDevice:
+    """Records emitted events instead of talking to /dev/uinput."""
+
+    instances = []
+
+    def __init__(self, events):
+        self.events = events
+        self.emitted = []
+        self.destroyed = False
+        FakeDevice.instances.append(self)
+
+    def emit(self, event, value, syn=True):
+        self.emitted.append((event, value))
+        if syn:
+            self.syn()
+
+    def syn(self):
+        self.emitted.append('SYN')
+
+    def destroy(self):
+        self.destroyed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_device(monkeypatch):
+    FakeDevice.instances = []
+    monkeypatch.setattr(keyboard.uinput, 'Device', FakeDevice)
+
+
+def _replay(emitted):
+    """Reconstruct typed characters from the event stream."""
+    reverse = {mapping: char for char, mapping in keyboard._KEY_MAP.items()}
+    shift = False
+    chars = []
+    for event in emitted:
+        if event == 'SYN':
+            continue
+        key, value = event
+        if key == uinput.KEY_LEFTSHIFT:
+            shift = bool(value)
+        elif value == 1:
+            chars.append(reverse[(key, shift)])
+    return ''.join(chars)
+
+
+def test_device_reused_across_calls():
+    with VirtualKeyboard(rate=None, init_delay=0) as kb:
+        kb.type("abc")
+        kb.type("def")
+    assert len(FakeDevice.instances) == 1
+    assert FakeDevice.instances[0].destroyed
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_typed_events_round_trip(batched):
+    string = "Hello, World! 1+1=2 (ok) ll"
+    with VirtualKeyboard(rate=None, init_delay=0) as kb:
+        assert kb.type(string, batched=batched) == len(string)
+        emitted = FakeDevice.instances[0].emitted
+    assert _replay(emitted) == string
+
+
+def test_batched_uses_fewer_syncs():
+    string = "abcdefghij"
+    with VirtualKeyboard(rate=None, init_delay=0) as kb:
+        kb.type(string)
+        emitted = FakeDevice.instances[0].emitted
+    assert emitted.count('SYN') == len(string) + 1
+    # All keys end up released
+    assert emitted[-2] == (uinput.KEY_J, 0)
+
+
+def test_unsupported_characters_skipped():
+    with VirtualKeyboard(rate=None, init_delay=0) as kb:
+        assert kb.type("aéb") == 2
+
+
+def test_rate_limit():
+    with VirtualKeyboard(rate=400, batch_size=4, init_delay=0) as kb:
+        start = time.monotonic()
+        kb.type("a" * 40)
+        elapsed = time.monotonic() - start
+    assert elapsed >= 0.09
+
+
+def test_text_uses_shared_keyboard(monkeypatch):
+    monkeypatch.setattr(keyboard, '_virtual_keyboard', VirtualKeyboard(rate=None, init_delay=0))
+    assert keyboard.text("one") is True
+    assert keyboard.text("two") is True
+    assert len(FakeDevice.instances) == 1
+    keyboard.get_virtual_keyboard().close()
@@ -0,0 +1,84 @@
+"""Tests for the template locator."""
+
+import numpy as np
+import pytest
+from screenclicker.locator import TemplateLocator, match_template, normalize_command
+
+
+def _screen(seed=0, width=640, height=400):
+    """Flat background with a few distinct textured widgets."""
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 240, dtype=np.uint8)
+    for x, y in ((60, 50), (300, 200), (500, 80)):
+        pixels[y:y + 40, x:x + 80] = rng.integers(0, 255, (40, 80, 3), dtype=np.uint8)
+    return pixels
+
+
+def _shift(pixels, dx, dy):
+    shifted = np.full_like(pixels, 240)
+    shifted[dy:, dx:] = pixels[:pixels.shape[0] - dy, :pixels.shape[1] - dx]
+    return shifted
+
+
+def test_match_template_finds_exact_position():
+    image = np.random.default_rng(1).random((50, 70))
+    scores = match_template(image, image[20:30, 33:45])
+    assert scores.shape == (41, 59)
+    assert np.unravel_index(np.argmax(scores), scores.shape) == (20, 33)
+    assert scores.max() == pytest.approx(1.0)
+
+
+def test_locate_same_and_moved_target():
+    locator = TemplateLocator()
+    screen = _screen()
+    assert locator.remember("Click  the Widget", screen, 340, 220)
+    assert "click the widget" in locator
+
+    match = locator.locate("click the widget", screen)
+    assert (match.x, match.y) == (340, 220) and match.score > 0.99
+
+    # Moved beyond the local search margin: found by the whole-frame search
+    match = locator.locate("click the widget", _shift(screen, 200, 120))
+    assert (match.x, match.y) == (540, 340)
+    assert locator.stats()['hits'] == 2
+
+
+def test_low_confidence_and_flat_crops_fall_back():
+    locator = TemplateLocator()
+    screen = _screen()
+    assert not locator.remember("background", screen, 200, 350)  # No texture
+    assert locator.locate("background", screen) is None
+
+    locator.remember("widget", screen, 340, 220)
+    assert locator.locate("widget", _screen(seed=5)) is None
+    assert locator.locate("unknown", screen) is None
+    assert locator.stats()['misses'] == 1  # Only commands with templates count
+
+
+def test_repeated_elements_are_ambiguous():
+    screen = np.full((300, 600, 3), 240, dtype=np.uint8)
+    button = np.random.default_rng(2).integers(0, 255, (40, 80, 3), dtype=np.uint8)
+    for x in (40, 240, 440):
+        screen[100:140, x:x + 80] = button
+    locator = TemplateLocator(search_margin=10)
+    locator.remember("button", screen, 80, 120)
+    # Near the remembered spot the position prior decides
+    assert locator.locate("button", screen)[:2] == (80, 120)
+    # Whole-frame search cannot tell the copies apart
+    assert locator.locate("button", _shift(screen, 0, 150)) is None
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / 'locator.npz')
+    locator = TemplateLocator(path)
+    locator.remember("widget", _screen(), 340, 220)
+    locator.save()
+
+    reloaded = TemplateLocator(path)
+    assert len(reloaded) == 1
+    assert reloaded.locate("widget", _screen())[:2] == (340, 220)
+    assert reloaded.forget("widget") and not reloaded.forget("widget")
+
+
+def test_normalize_command():
+    assert normalize_command("  Click\tthe  BUTTON ") == "click the button"
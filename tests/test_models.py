@@ -0,0 +1,64 @@
+"""Tests for ModelManager preloading and keep-alive pings."""
+
+import time
+import pytest
+from screenclicker.agent import Agent, VLMPolicy
+from screenclicker.models import ModelManager
+from screenclicker.ollama_client import OllamaClient
+from screenclicker.pool import OllamaPool
+
+
+def _generates(server):
+    return [body for path, body in server.requests if path == '/api/generate']
+
+
+def test_warmup_preloads_with_keep_alive(ollama_stub):
+    manager = ModelManager("qwen3-vl:4b", OllamaClient(host=ollama_stub.url), keep_alive="1h")
+    assert not manager.is_loaded()
+
+    manager.warmup()
+    body = _generates(ollama_stub)[0]
+    assert body['prompt'] == ''
+    assert body['keep_alive'] == '1h'
+    assert manager.is_loaded()
+
+    status = manager.status()
+    assert status['loaded']
+    assert status['capabilities'] == ['vision']
+    assert status['last_load_time'] is not None
+
+
+def test_warmup_with_image_sends_one_token_request(ollama_stub):
+    manager = ModelManager("m", OllamaClient(host=ollama_stub.url))
+    manager.warmup(image=b'png')
+    bodies = _generates(ollama_stub)
+    assert len(bodies) == 2
+    assert bodies[1]['images'] and bodies[1]['options']['num_predict'] == 1
+
+
+def test_ping_thread_refreshes_keep_alive(ollama_stub):
+    with ModelManager("m", OllamaClient(host=ollama_stub.url), ping_interval=0.05) as manager:
+        assert manager.running
+        time.sleep(0.3)
+    assert not manager.running
+    assert len(_generates(ollama_stub)) >= 4
+
+
+def test_pool_preloads_every_endpoint(ollama_stubs):
+    servers = ollama_stubs(2)
+    ModelManager("m", OllamaPool([s.url for s in servers]), ping_interval=None).warmup()
+    assert [len(_generates(s)) for s in servers] == [1, 1]
+
+
+def test_preload_failure_raises():
+    manager = ModelManager("m", OllamaClient(host="http://127.0.0.1:1"))
+    with pytest.raises(RuntimeError):
+        manager.preload()
+
+
+def test_agent_warms_up_policy(ollama_stub):
+    policy = VLMPolicy("goal", client=OllamaClient(host=ollama_stub.url), model="m")
+    agent = Agent(policy, capture=lambda: None, execute=lambda a: None)
+    agent.start()
+    agent.stop()
+    assert _generates(ollama_stub)[0]['prompt'] == ''
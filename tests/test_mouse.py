@@ -0,0 +1,91 @@
+"""Tests for the persistent virtual mouse using a fake uinput device."""
+
+import pytest
+import uinput
+from screenclicker import mouse
+from screenclicker.mouse import VirtualMouse
+
+
+class FakeDevice:
+    """Records emitted events instead of talking to /dev/uinput."""
+
+    instances = []
+
+    def __init__(self, events):
+        self.events = events
+        self.emitted = []
+        self.destroyed = False
+        FakeDevice.instances.append(self)
+
+    def emit(self, event, value, syn=True):
+        self.emitted.append((event, value, syn))
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class FakeTopology:
+    def __init__(self, monitors):
+        self.monitors = monitors
+        self.generation = 1
+
+    def get(self, refresh=False):
+        return {'monitors': [dict(m) for m in self.monitors]}
+
+
+@pytest.fixture
+def topology(monkeypatch):
+    FakeDevice.instances = []
+    monkeypatch.setattr(mouse.uinput, 'Device', FakeDevice)
+    fake = FakeTopology([
+        {'name': 'DP-1', 'x': 0, 'y': 0, 'width': 1920, 'height': 1080, 'primary': True},
+        {'name': 'DP-2', 'x': 1920, 'y': 0, 'width': 2560, 'height': 1440, 'primary': False},
+    ])
+    from screenclicker import screen
+    monkeypatch.setattr(screen, 'get_monitor_topology', lambda: fake)
+    return fake
+
+
+def test_device_created_once(topology):
+    with VirtualMouse(init_delay=0) as vm:
+        for _ in range(5):
+            assert vm.click(10, 20) is True
+    assert len(FakeDevice.instances) == 1
+    assert FakeDevice.instances[0].destroyed
+
+
+def test_click_offsets_to_monitor(topology):
+    with VirtualMouse(init_delay=0) as vm:
+        vm.click(100, 200, uinput.BTN_RIGHT, monitor_index=1)
+        emitted = FakeDevice.instances[0].emitted
+    assert emitted == [
+        (uinput.ABS_X, 2020, False),
+        (uinput.ABS_Y, 200, True),
+        (uinput.BTN_RIGHT, 1, True),
+        (uinput.BTN_RIGHT, 0, True),
+    ]
+
+
+def test_rebuilt_only_when_layout_size_changes(topology):
+    with VirtualMouse(init_delay=0) as vm:
+        vm.click(0, 0)
+
+        # Generation change with identical size keeps the device
+        topology.generation += 1
+        vm.click(0, 0)
+        assert len(FakeDevice.instances) == 1
+
+        topology.monitors[1]['width'] = 3840
+        topology.generation += 1
+        vm.click(0, 0)
+        assert len(FakeDevice.instances) == 2
+        assert FakeDevice.instances[0].destroyed
+        assert not FakeDevice.instances[1].destroyed
+
+
+def test_left_click_uses_shared_mouse(topology, monkeypatch):
+    monkeypatch.setattr(mouse, '_virtual_mouse', VirtualMouse(init_delay=0))
+    assert mouse.left_click(5, 5) is True
+    assert mouse.right_click(6, 6) is True
+    assert len(FakeDevice.instances) == 1
+    mouse.get_virtual_mouse().close()
@@ -0,0 +1,194 @@
+"""Tests for the Ollama clients against a local stub server."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+import threading
+import pytest
+from screenclicker.config import get_config, reset_config
+from screenclicker.screen import CapturedImage
+from screenclicker.ollama_client import (
+    OllamaClient, AsyncOllamaClient, ImagePayload, async_describe_image, describe_image_batch,
+    describe_image, get_client, clear_clients, quick_chat, quick_generate, _encode_images
+)
+
+IMAGE = b'\x89PNG fake image bytes'
+
+
+def test_chat_attaches_images_without_mutating_messages(ollama_stub):
+    client = OllamaClient(host=ollama_stub.url)
+    messages = [{"role": "user", "content": "where?"}]
+    response = client.chat("m", messages, images=[IMAGE])
+
+    assert response['message']['content'] == "500,300"
+    assert 'images' not in messages[0]
+    _, body = ollama_stub.requests[-1]
+    assert body['messages'][-1]['images'] == [base64.b64encode(IMAGE).decode()]
+
+
+def test_async_client_surface(ollama_stub):
+    client = AsyncOllamaClient(host=ollama_stub.url)
+
+    async def run():
+        chat = await client.chat("m", [{"role": "user", "content": "hi"}], system_prompt="sys")
+        generate = await client.generate("m", "hi", images=[IMAGE])
+        models = await client.list()
+        embedding = await client.embeddings("m", "abc")
+        return chat, generate, models, embedding, await client.is_connected()
+
+    chat, generate, models, embedding, connected = asyncio.run(run())
+    assert chat['message']['content'] == "500,300"
+    assert generate['response'] == "500,300"
+    assert [m['model'] for m in models['models']] == ['qwen3-vl:30b']
+    assert len(embedding['embedding']) == 26
+    assert connected is True
+
+    chat_body = ollama_stub.requests[0][1]
+    assert chat_body['messages'][0] == {'role': 'system', 'content': 'sys'}
+
+
+def test_async_requests_run_concurrently(ollama_stub):
+    ollama_stub.latency = 0.2
+    client = AsyncOllamaClient(host=ollama_stub.url)
+
+    async def run():
+        return await asyncio.gather(*[
+            async_describe_image(IMAGE, "where?", model="m", client=client) for _ in range(4)
+        ])
+
+    start = time.monotonic()
+    answers = asyncio.run(run())
+    assert answers == ["500,300"] * 4
+    assert time.monotonic() - start < 0.6
+
+
+def test_async_is_connected_false_when_unreachable():
+    client = AsyncOllamaClient(host="http://127.0.0.1:9")
+    assert asyncio.run(client.is_connected()) is False
+
+
+def test_image_payload_encodes_once(monkeypatch):
+    calls = []
+    real_b64encode = base64.b64encode
+    monkeypatch.setattr(base64, 'b64encode', lambda data: calls.append(1) or real_b64encode(data))
+
+    payload = ImagePayload(IMAGE)
+    encoded = [_encode_images([payload]) for _ in range(5)]
+    assert encoded[0] == [real_b64encode(IMAGE).decode()]
+    assert len(calls) == 1
+
+
+def test_image_payload_hash_and_metadata():
+    img = CapturedImage(IMAGE, 640, 480, 'png')
+    payload = ImagePayload(img)
+    assert payload.hash == hashlib.sha256(IMAGE).hexdigest()
+    assert (payload.width, payload.height) == (640, 480)
+    assert payload == ImagePayload(bytes(IMAGE))
+    assert ImagePayload.from_base64(payload.base64).data == IMAGE
+    with pytest.raises(TypeError):
+        ImagePayload("not bytes")
+
+
+def test_payload_accepted_by_chat_and_generate(ollama_stub):
+    client = OllamaClient(host=ollama_stub.url)
+    payload = ImagePayload(IMAGE)
+    client.chat("m", [{"role": "user", "content": "where?"}], images=[payload])
+    client.generate("m", "where?", images=[payload])
+
+    chat_body = ollama_stub.requests[0][1]
+    generate_body = ollama_stub.requests[1][1]
+    assert chat_body['messages'][-1]['images'] == [payload.base64]
+    assert generate_body['images'] == [payload.base64]
+
+
+def test_describe_image_batch_structured(ollama_stub):
+    ollama_stub.reply = lambda path, body: json.dumps({'q1': '12 wood', 'q2': 'stoke fire'})
+    client = OllamaClient(host=ollama_stub.url)
+    answers = describe_image_batch(IMAGE, {'wood': "How much wood?", 'buttons': "Which buttons?"},
+                                   model="m", client=client, keep_alive="10m")
+
+    assert answers == {'wood': '12 wood', 'buttons': 'stoke fire'}
+    assert ollama_stub.request_count('/api/chat') == 1
+    _, body = ollama_stub.requests[-1]
+    assert body['format']['required'] == ['q1', 'q2']
+    assert body['keep_alive'] == '10m'
+    assert "How much wood?" in body['messages'][-1]['content']
+
+
+def test_describe_image_batch_falls_back_for_missing_answers(ollama_stub):
+    ollama_stub.reply = lambda path, body: (
+        json.dumps({'q1': 'yes'}) if 'format' in body else "fallback answer")
+    client = OllamaClient(host=ollama_stub.url)
+    answers = describe_image_batch(IMAGE, ["Is it day?", "Is it night?"], model="m", client=client)
+    assert answers == {"Is it day?": "yes", "Is it night?": "fallback answer"}
+    assert ollama_stub.request_count('/api/chat') == 2
+
+
+def test_describe_image_batch_conversation_shares_prefix(ollama_stub):
+    ollama_stub.reply = lambda path, body: f"answer {len(body['messages'])}"
+    client = OllamaClient(host=ollama_stub.url)
+    answers = describe_image_batch(IMAGE, ["a?", "b?", "c?"], model="m", client=client,
+                                   mode='conversation', system_prompt="")
+
+    assert list(answers) == ["a?", "b?", "c?"]
+    bodies = [body for path, body in ollama_stub.requests if path == '/api/chat']
+    assert len(bodies) == 3
+    encoded = base64.b64encode(IMAGE).decode()
+    for body in bodies:
+        # Image only on the first turn; later requests extend the same prefix
+        assert body['messages'][0]['images'] == [encoded]
+        assert all('images' not in m for m in body['messages'][1:])
+    assert bodies[2]['messages'][:3] == bodies[1]['messages'][:3]
+
+
+def test_describe_image_batch_conversation_is_cached_by_image(ollama_stub):
+    from screenclicker.response_cache import ResponseCache
+    ollama_stub.reply = lambda path, body: f"answer {len(body['messages'])}"
+    client = OllamaClient(host=ollama_stub.url, cache=ResponseCache())
+    ask = lambda image: describe_image_batch(image, ["a?", "b?"], model="m", client=client,
+                                             mode='conversation', system_prompt="", cache=True)
+
+    assert ask(IMAGE) == ask(IMAGE)
+    assert ollama_stub.request_count('/api/chat') == 2
+    # Follow-up turns carry the image on the first message; a new image misses
+    ask(IMAGE + b'changed')
+    assert ollama_stub.request_count('/api/chat') == 4
+
+
+def test_describe_image_batch_invalid_mode():
+    with pytest.raises(ValueError):
+        describe_image_batch(IMAGE, ["a?"], mode='parallel')
+
+
+def test_quick_functions_honor_configured_url(ollama_stub):
+    port = int(ollama_stub.url.rsplit(':', 1)[1])
+    get_config().update(host='127.0.0.1', port=port)
+    try:
+        assert quick_chat("m", "where?") == "500,300"
+        assert quick_generate("m", "where?") == "500,300"
+        assert describe_image(IMAGE, "where?", model="m") == "500,300"
+        assert ollama_stub.request_count('/api/chat') == 2
+        assert ollama_stub.request_count('/api/generate') == 1
+        assert get_client() is get_client(ollama_stub.url)
+    finally:
+        reset_config()
+        clear_clients()
+
+
+def test_get_client_is_shared_across_threads(ollama_stub):
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_client(ollama_stub.url)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        assert len({id(c) for c in clients}) == 1
+        assert quick_chat("m", "hi", host=ollama_stub.url) == "500,300"
+    finally:
+        clear_clients()
+    assert get_client(ollama_stub.url) is not clients[0]
+    clear_clients()
@@ -0,0 +1,129 @@
+"""Tests for the multi-host Ollama pool against local stub servers."""
+
+import threading
+import time
+import pytest
+from screenclicker.config import get_config, reset_config, set_endpoints
+from screenclicker.pool import OllamaPool
+
+MESSAGES = [{"role": "user", "content": "where?"}]
+
+
+def test_config_endpoints(monkeypatch):
+    try:
+        assert get_config().endpoints == [get_config().url]
+        set_endpoints(['gpu1', 'gpu2:1234', 'https://gpu3:443/'])
+        assert get_config().endpoints == ['http://gpu1:11434', 'http://gpu2:1234', 'https://gpu3:443']
+        with pytest.raises(ValueError):
+            set_endpoints([])
+        monkeypatch.setenv('OLLAMA_HOSTS', 'a:1, b:2')
+        reset_config()
+        assert get_config().endpoints == ['http://a:1', 'http://b:2']
+    finally:
+        monkeypatch.delenv('OLLAMA_HOSTS', raising=False)
+        reset_config()
+
+
+def test_round_robin_spreads_requests(ollama_stubs):
+    servers = ollama_stubs(3)
+    pool = OllamaPool([s.url for s in servers], strategy='round_robin')
+    for _ in range(6):
+        assert pool.chat("m", MESSAGES)['message']['content'] == "500,300"
+    assert [s.request_count('/api/chat') for s in servers] == [2, 2, 2]
+
+
+def test_least_outstanding_uses_idle_hosts(ollama_stubs):
+    servers = ollama_stubs(2)
+    servers[0].latency = servers[1].latency = 0.2
+    pool = OllamaPool([s.url for s in servers])
+
+    threads = [threading.Thread(target=pool.chat, args=("m", MESSAGES)) for _ in range(4)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [s.request_count('/api/chat') for s in servers] == [2, 2]
+    assert time.monotonic() - start < 0.7
+    assert all(e['outstanding'] == 0 for e in pool.stats())
+
+
+def test_failed_host_is_ejected_and_retried_later(ollama_stubs):
+    good, bad = ollama_stubs(2)
+    bad.healthy = False
+    pool = OllamaPool([bad.url, good.url], strategy='round_robin', eject_seconds=0.2)
+
+    for _ in range(4):
+        pool.chat("m", MESSAGES)
+    # The bad host got one request, failed over, then sat out the cooldown
+    assert bad.request_count('/api/chat') == 1
+    assert good.request_count('/api/chat') == 4
+    assert [e['healthy'] for e in pool.stats()] == [False, True]
+
+    bad.healthy = True
+    time.sleep(0.25)
+    pool.chat("m", MESSAGES)
+    pool.chat("m", MESSAGES)
+    assert bad.request_count('/api/chat') == 2
+    assert [e['healthy'] for e in pool.stats()] == [True, True]
+
+
+def test_only_gateway_errors_eject_a_host():
+    import httpx
+    import ollama
+    from screenclicker.pool import _is_host_failure
+    assert _is_host_failure(ollama.ResponseError("bad gateway", 502))
+    assert _is_host_failure(ollama.ResponseError("unavailable", 503))
+    assert _is_host_failure(httpx.ConnectError("refused"))
+    # A model that fails to load errors the same way on every host
+    assert not _is_host_failure(ollama.ResponseError("model failed to load", 500))
+    assert not _is_host_failure(ollama.ResponseError("not found", 404))
+
+
+def test_all_hosts_down_raises(ollama_stubs):
+    servers = ollama_stubs(2)
+    for server in servers:
+        server.healthy = False
+    pool = OllamaPool([s.url for s in servers])
+    with pytest.raises(RuntimeError):
+        pool.chat("m", MESSAGES)
+    with pytest.raises(RuntimeError):
+        pool.chat("m", MESSAGES)
+
+
+def test_check_health_and_stream(ollama_stubs):
+    good, bad = ollama_stubs(2)
+    bad.healthy = False
+    pool = OllamaPool([good.url, bad.url])
+    assert pool.check_health() == {good.url: True, bad.url: False}
+    assert pool.is_connected()
+
+    chunks = list(pool.chat("m", MESSAGES, stream=True))
+    assert ''.join(c['message']['content'] for c in chunks) == "500,300"
+    assert pool.stats()[0]['outstanding'] == 0
+
+
+def test_stream_fails_over_before_first_chunk(ollama_stubs):
+    import socket
+    good, bad = ollama_stubs(2)
+    bad.healthy = False
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        dead = f"http://127.0.0.1:{s.getsockname()[1]}"
+    pool = OllamaPool([bad.url, dead, good.url], strategy='round_robin')
+
+    chunks = list(pool.chat("m", MESSAGES, stream=True))
+    assert ''.join(c['message']['content'] for c in chunks) == "500,300"
+    assert [(e['healthy'], e['failures']) for e in pool.stats()] == [(False, 1), (False, 1), (True, 0)]
+    assert all(e['outstanding'] == 0 for e in pool.stats())
+
+
+def test_dropped_stream_releases_endpoint(ollama_stub):
+    pool = OllamaPool([ollama_stub.url])
+    stream = pool.chat("m", MESSAGES, stream=True)
+    assert pool.stats()[0]['outstanding'] == 1
+    stream.close()
+    assert pool.stats()[0]['outstanding'] == 0
+
+    pool.chat("m", MESSAGES, stream=True)  # Never iterated, dropped at once
+    assert pool.stats()[0]['outstanding'] == 0
@@ -0,0 +1,59 @@
+"""Tests for VLM image preprocessing."""
+
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from screenclicker.coordinates import parse_coordinates
+from screenclicker.frames import CoordinateTransform
+from screenclicker.preprocess import prepare_image, target_size
+from screenclicker.screen import CapturedImage, RawFrame
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (10, 20, 30)).save(buffer, format='PNG')
+    return CapturedImage(buffer.getvalue(), width, height, 'png')
+
+
+@pytest.mark.parametrize("kwargs,expected", [
+    ({}, (1920, 1080)),
+    ({'max_side': 960}, (960, 540)),
+    ({'max_side': 4000}, (1920, 1080)),
+    ({'token_budget': 1000}, (1176, 644)),
+])
+def test_target_size(kwargs, expected):
+    assert target_size(1920, 1080, **kwargs) == expected
+
+
+def test_token_budget_respected():
+    width, height = target_size(3840, 2160, token_budget=1024)
+    assert (width // 28) * (height // 28) <= 1024
+    assert width % 28 == 0 and height % 28 == 0
+
+
+def test_small_image_passed_through():
+    img = _png(640, 480)
+    prepared = prepare_image(img, max_side=1280)
+    assert prepared.image is img
+    assert prepared.transform == CoordinateTransform()
+
+
+def test_downscale_maps_coordinates_back():
+    prepared = prepare_image(_png(1920, 1080), max_side=960)
+    assert (prepared.width, prepared.height) == (960, 540)
+    assert prepared.image[:8] == b'\x89PNG\r\n\x1a\n'
+    assert parse_coordinates("480,270", prepared.transform) == (960, 540)
+
+
+def test_crop_offset_composes_with_scale():
+    frame = RawFrame(np.zeros((400, 800, 3), dtype=np.uint8), 800, 400)
+    prepared = prepare_image(frame, max_side=400, format='jpeg', transform=CoordinateTransform(100, 50))
+    assert prepared.image.format == 'jpeg'
+    assert prepared.image[:2] == b'\xff\xd8'
+    assert parse_coordinates("(200, 100)", prepared.transform) == (500, 250)
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        prepare_image(_png(10, 10), format='raw')
@@ -0,0 +1,142 @@
+"""Tests for session recording and replay."""
+
+import json
+import pytest
+from stubs import make_fake_grim
+from screenclicker import recorder
+from screenclicker.keyboard import text
+from screenclicker.ollama_client import ImagePayload, OllamaClient
+from screenclicker.recorder import SessionRecorder, SessionReplayer
+from screenclicker.screen import GrimPipeBackend, screenshot_region, set_capture_backend
+
+PPM = b'P6\n2 1\n255\n\x01\x02\x03\x04\x05\x06'
+
+
+@pytest.fixture
+def fake_grim(tmp_path):
+    grim = make_fake_grim(str(tmp_path), {'png': PPM, 'ppm': PPM})
+    previous = set_capture_backend(GrimPipeBackend(grim))
+    yield
+    set_capture_backend(previous)
+
+
+def _events(path):
+    return [json.loads(line) for line in (path / 'events.jsonl').read_text().splitlines()]
+
+
+def test_inactive_hooks_record_nothing(tmp_path, fake_grim):
+    SessionRecorder(str(tmp_path / 's'))
+    screenshot_region(0, 0, 2, 1, format='ppm')
+    assert recorder.active_recorder() is None
+    assert not (tmp_path / 's' / 'events.jsonl').exists()
+
+
+def test_frames_are_deduplicated(tmp_path, fake_grim):
+    session = tmp_path / 's'
+    with SessionRecorder(str(session)):
+        for _ in range(3):
+            screenshot_region(0, 0, 2, 1, format='ppm')
+    frames = _events(session)
+    assert [e['type'] for e in frames] == ['frame'] * 3
+    assert len({e['hash'] for e in frames}) == 1
+    assert len(list((session / 'blobs').iterdir())) == 1
+    assert frames[0]['width'] == 2 and frames[0]['region'] == '0,0 2x1'
+
+    replayed = list(SessionReplayer(str(session)).frames())
+    assert replayed[0] == PPM and replayed[0].width == 2 and replayed[0].format == 'ppm'
+
+
+def test_records_chat_stream_and_replays(tmp_path, ollama_stub):
+    session = tmp_path / 's'
+    client = OllamaClient(host=ollama_stub.url)
+    messages = [{"role": "user", "content": "Where? x,y"}]
+    with SessionRecorder(str(session)):
+        client.chat("m", messages, images=[ImagePayload(PPM)])
+        for _ in client.generate("m", "x,y?", stream=True):
+            pass
+        with pytest.raises(RuntimeError):
+            text("")  # No keyboard here; failed input is not recorded
+
+    events = _events(session)
+    chat, generate = events
+    assert chat['type'] == 'chat' and chat['response'] == '500,300'
+    assert chat['images'] and chat['timings']['total_duration'] == 1000
+    assert generate['type'] == 'generate' and generate['stream'] and generate['response'] == '500,300'
+
+    ollama_stub.reply = lambda path, body: "510,300" if path == '/api/chat' else "nothing"
+    report = SessionReplayer(str(session)).replay(client, model="other")
+    assert report['requests'] == 2
+    assert [r['match'] for r in report['results']] == [True, False]
+    assert report['results'][0]['error_px'] == pytest.approx(10)
+    assert report['agreement'] == 0.5
+    assert 'p95_ms' in report['replayed_latency']
+    # The image was re-sent from the blob store
+    chat_body = [body for path, body in ollama_stub.requests if path == '/api/chat'][-1]
+    assert chat_body['model'] == 'other' and chat_body['messages'][-1]['images']
+
+
+def test_capture_source_and_single_active_recorder(tmp_path, fake_grim):
+    session = tmp_path / 's'
+    with SessionRecorder(str(session)):
+        screenshot_region(0, 0, 2, 1, format='ppm')
+        with pytest.raises(RuntimeError):
+            SessionRecorder(str(tmp_path / 'other')).start()
+        recorder.record_action('click', x=1, y=2, monitor=None)
+
+    replayer = SessionReplayer(str(session))
+    assert replayer.events_of('action')[0]['x'] == 1
+    capture = replayer.capture_source()
+    assert capture() == PPM
+    with pytest.raises(RuntimeError):
+        capture()
+    assert SessionReplayer(str(session)).capture_source(loop=True)() == PPM
+
+
+def test_tiled_session_roundtrip(tmp_path, fake_grim):
+    session = tmp_path / 's'
+    with SessionRecorder(str(session), tiled=True):
+        screenshot_region(0, 0, 2, 1, format='ppm')
+        screenshot_region(0, 0, 2, 1, format='ppm')
+    assert not list((session / 'blobs').iterdir())
+    frames = list(SessionReplayer(str(session)).frames())
+    assert frames == [PPM, PPM]
+
+
+def test_replay_sends_the_recorded_system_prompt(tmp_path, ollama_stub):
+    from screenclicker.config import reset_config, set_system_prompt
+
+    session = tmp_path / 's'
+    client = OllamaClient(host=ollama_stub.url)
+    try:
+        set_system_prompt("Answer with x,y only")
+        with SessionRecorder(str(session)):
+            client.chat("m", [{"role": "user", "content": "Where?"}])  # Config default applies
+            client.chat("m", [{"role": "user", "content": "Where?"}], system_prompt="")
+        set_system_prompt("Something else")
+        SessionReplayer(str(session)).replay(client)
+    finally:
+        reset_config()
+
+    first, second = [body['messages'] for path, body in ollama_stub.requests if path == '/api/chat'][2:]
+    assert first[0] == {'role': 'system', 'content': "Answer with x,y only"}
+    assert [m['role'] for m in second] == ['user']
+
+
+def test_records_async_requests_and_streams(tmp_path, ollama_stub):
+    import asyncio
+    from screenclicker.ollama_client import AsyncOllamaClient
+
+    session = tmp_path / 's'
+    client = AsyncOllamaClient(host=ollama_stub.url)
+    ollama_stub.chunks = 3
+
+    async def run():
+        await client.chat("m", [{"role": "user", "content": "Where?"}])
+        chunks = [chunk async for chunk in await client.generate("m", "x,y?", stream=True)]
+        return len(chunks)
+
+    with SessionRecorder(str(session)):
+        assert asyncio.run(run()) > 1
+    chat, generate = _events(session)
+    assert chat['type'] == 'chat' and not chat['stream']
+    assert generate['stream'] and generate['response'] == '500,300'
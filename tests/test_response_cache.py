@@ -0,0 +1,105 @@
+"""Tests for the VLM response cache."""
+
+import pytest
+from screenclicker.ollama_client import OllamaClient, ImagePayload
+from screenclicker.response_cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "where is the button?"}]
+
+
+def test_lru_eviction_and_counters():
+    cache = ResponseCache(max_entries=2)
+    cache.put('chat:a', {'v': 1})
+    cache.put('chat:b', {'v': 2})
+    assert cache.get('chat:a') == {'v': 1}
+    cache.put('chat:c', {'v': 3})  # Evicts b, the least recently used
+
+    assert cache.get('chat:b') is None
+    assert cache.get('chat:c') == {'v': 3}
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.stats()['memory_entries'] == 2
+
+
+def test_make_key_depends_on_every_field():
+    base = dict(kind='chat', model='m', request=MESSAGES, system_prompt=None,
+                image_hashes=['abc'], options={'options': {'temperature': 0}})
+    key = ResponseCache.make_key(**base)
+    assert key == ResponseCache.make_key(**base)
+    for field, value in [('model', 'other'), ('system_prompt', 'sys'),
+                         ('image_hashes', ['def']), ('options', {'options': {'temperature': 1}})]:
+        assert ResponseCache.make_key(**{**base, field: value}) != key
+
+
+def test_client_cache_is_opt_in(ollama_stub):
+    client = OllamaClient(host=ollama_stub.url, cache=ResponseCache())
+    payload = ImagePayload(b'frame-1')
+
+    client.chat("m", MESSAGES, images=[payload])
+    client.chat("m", MESSAGES, images=[payload])
+    assert ollama_stub.request_count('/api/chat') == 2
+
+    first = client.chat("m", MESSAGES, images=[payload], cache=True)
+    second = client.chat("m", MESSAGES, images=[payload], cache=True)
+    assert ollama_stub.request_count('/api/chat') == 3
+    assert second is first
+
+    # A changed frame misses
+    client.chat("m", MESSAGES, images=[ImagePayload(b'frame-2')], cache=True)
+    assert ollama_stub.request_count('/api/chat') == 4
+    assert client.cache.stats()['hits'] == 1
+
+
+def test_generate_cached(ollama_stub):
+    client = OllamaClient(host=ollama_stub.url, cache=ResponseCache())
+    client.generate("m", "hi", cache=True)
+    assert client.generate("m", "hi", cache=True)['response'] == "500,300"
+    assert ollama_stub.request_count('/api/generate') == 1
+
+
+def test_sqlite_backend_persists(ollama_stub, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    client = OllamaClient(host=ollama_stub.url, cache=ResponseCache(path=path))
+    client.chat("m", MESSAGES, images=[b'frame'], cache=True)
+    client.cache.close()
+
+    reopened = OllamaClient(host=ollama_stub.url, cache=ResponseCache(path=path))
+    response = reopened.chat("m", MESSAGES, images=[b'frame'], cache=True)
+    assert response['message']['content'] == "500,300"
+    assert ollama_stub.request_count('/api/chat') == 1
+    assert reopened.cache.stats()['disk_entries'] == 1
+
+
+def test_sqlite_size_cap(tmp_path):
+    cache = ResponseCache(max_entries=10, path=str(tmp_path / 'cache.db'), max_disk_entries=2)
+    for i in range(5):
+        cache.put(f'chat:{i}', {'v': i})
+    assert cache.stats()['disk_entries'] == 2
+
+
+def test_sqlite_hits_are_written_in_batches(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResponseCache(path=path, max_disk_entries=2)
+    cache.put('raw:a', {'v': 'a'})
+    cache.put('raw:b', {'v': 'b'})
+    cache.close()
+
+    cache = ResponseCache(path=path, max_disk_entries=2)
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    for _ in range(10):
+        assert cache.get('raw:a') == {'v': 'a'}
+    assert not [s for s in statements if s.startswith(('UPDATE', 'COMMIT'))]
+
+    # The pending access is flushed before pruning, so 'b' is the oldest
+    cache.put('raw:c', {'v': 'c'})
+    assert len([s for s in statements if s.startswith('DELETE')]) == 1
+    cache.close()
+    cache = ResponseCache(path=path)
+    assert cache.get('raw:a') == {'v': 'a'}
+    assert cache.get('raw:b') is None
+    assert cache.stats()['disk_entries'] == 2
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        ResponseCache(max_entries=0)
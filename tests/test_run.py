@@ -0,0 +1,88 @@
+"""Tests for the run.py command-line flow."""
+
+import io
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import run  # noqa: E402
+from screenclicker.config import get_config, reset_config  # noqa: E402
+from screenclicker.screen import CapturedImage  # noqa: E402
+
+
+@pytest.fixture
+def run_main(ollama_stub, monkeypatch):
+    """Call run.main() against the stub with a fake screenshot; returns clicks."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600), (200, 200, 200)).save(buffer, format='PNG')
+    image = CapturedImage(buffer.getvalue(), 800, 600, 'png')
+    clicks = []
+    monkeypatch.setattr(run, 'screenshot_monitor', lambda monitor: image)
+    monkeypatch.setattr(run, 'left_click', lambda x, y: clicks.append((x, y)))
+    get_config().update(host='127.0.0.1', port=int(ollama_stub.url.rsplit(':', 1)[1]), endpoints=None)
+
+    def main(*argv):
+        monkeypatch.setattr(sys, 'argv', ['run.py', *argv])
+        run.main()
+        return clicks
+    yield main
+    reset_config()
+
+
+def test_stream_ignores_numbers_in_think_block(run_main, ollama_stub):
+    ollama_stub.reply = lambda path, body: "<think>Not the icon at 10,20 but the button.</think>500,300"
+    ollama_stub.chunks = 4
+    assert run_main("click the button", "--stream", "--samples", "1") == [(500, 300)]
+
+
+def test_stream_maps_downscaled_coordinates(run_main, ollama_stub):
+    ollama_stub.reply = lambda path, body: "<think>maybe 1,1</think>200,150"
+    assert run_main("click the button", "--stream", "--samples", "1", "--max-side", "400") == [(400, 300)]
+
+
+def test_hosts_are_stripped_and_normalized(run_main, ollama_stub):
+    port = ollama_stub.url.rsplit(':', 1)[1]
+    assert run_main("click the button", "--samples", "1", "--hosts", f" 127.0.0.1:{port} ,,") == [(500, 300)]
+    assert get_config().endpoints == [ollama_stub.url]
+
+
+def test_hosts_without_servers_is_an_error(run_main):
+    with pytest.raises(SystemExit):
+        run_main("click the button", "--hosts", " , ")
+
+
+def test_paraphrase_reuses_known_command_but_vlm_gets_original(run_main, ollama_stub, tmp_path, capsys):
+    from screenclicker.command_cache import CommandCache
+    path = str(tmp_path / 'commands.npz')
+    known = CommandCache(path)
+    known.add("click the close button")
+    known.save()
+
+    assert run_main("click close button", "--samples", "1", "--commands", path, "--similarity", "0.8",
+                    "--locator", str(tmp_path / 'locator.npz')) == [(500, 300)]
+    assert "Same as: click the close button" in capsys.readouterr().out
+    prompt = [body for p, body in ollama_stub.requests if p == '/api/chat'][0]['messages'][-1]['content']
+    assert "Task: click close button\n" in prompt
+    # What the VLM resolved is indexed under the user's wording, not the matched command
+    assert "click close button" in CommandCache(path)
+
+
+def test_remember_uses_the_users_wording(run_main, ollama_stub, tmp_path, monkeypatch):
+    from screenclicker.command_cache import CommandCache, CommandMatch
+    from screenclicker.locator import TemplateLocator
+    monkeypatch.setattr(CommandCache, 'lookup', lambda self, command: CommandMatch("open the file", 0.95))
+    remembered = []
+    monkeypatch.setattr(TemplateLocator, 'remember',
+                        lambda self, command, frame, x, y: remembered.append(command) or False)
+
+    run_main("close the file", "--samples", "1", "--commands", str(tmp_path / 'commands.npz'),
+             "--locator", str(tmp_path / 'locator.npz'))
+    assert remembered == ["close the file"]
+
+
+def test_commands_requires_locator(run_main, tmp_path):
+    with pytest.raises(SystemExit):
+        run_main("click the button", "--commands", str(tmp_path / 'commands.npz'))
@@ -0,0 +1,117 @@
+"""Tests for the cached monitor topology using a fake swaymsg executable."""
+
+import os
+import stat
+import time
+import pytest
+from screenclicker.screen import MonitorTopology
+
+OUTPUTS = '[{"name": "DP-1", "active": true, "primary": true, "rect": {"x": 0, "y": 0, "width": 2560, "height": 1440}}]'
+
+FAKE_SWAYMSG = """#!/bin/sh
+echo call >> "{calls}"
+case " $* " in
+    *" subscribe "*)
+        # Emit one output event, then block like a real subscription
+        echo '{{"change": "unspecified"}}'
+        exec sleep 30
+        ;;
+    *)
+        cat "{outputs}"
+        ;;
+esac
+"""
+
+
+@pytest.fixture
+def fake_swaymsg(tmp_path):
+    """Create a fake swaymsg that logs each invocation."""
+    outputs = tmp_path / 'outputs.json'
+    outputs.write_text(OUTPUTS)
+    calls = tmp_path / 'calls.txt'
+    path = tmp_path / 'swaymsg'
+    path.write_text(FAKE_SWAYMSG.format(calls=calls, outputs=outputs))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    def call_count():
+        return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+    return str(path), outputs, call_count
+
+
+def test_cached_until_invalidated(fake_swaymsg):
+    path, _, call_count = fake_swaymsg
+    topology = MonitorTopology(ttl=None, swaymsg_path=path)
+
+    info = topology.get()
+    assert info['monitors'][0]['width'] == 2560
+    topology.get()
+    topology.get()
+    assert call_count() == 1
+
+    topology.invalidate()
+    topology.get()
+    assert call_count() == 2
+
+
+def test_ttl_expiry(fake_swaymsg):
+    path, _, call_count = fake_swaymsg
+    topology = MonitorTopology(ttl=0.05, swaymsg_path=path)
+
+    topology.get()
+    topology.get()
+    assert call_count() == 1
+    time.sleep(0.1)
+    topology.get()
+    assert call_count() == 2
+
+
+def test_generation_bumps_only_on_change(fake_swaymsg):
+    path, outputs, _ = fake_swaymsg
+    topology = MonitorTopology(ttl=None, swaymsg_path=path)
+
+    topology.get()
+    generation = topology.generation
+    topology.get(refresh=True)
+    assert topology.generation == generation
+
+    outputs.write_text(OUTPUTS.replace('2560', '3840'))
+    info = topology.get(refresh=True)
+    assert info['monitors'][0]['width'] == 3840
+    assert topology.generation == generation + 1
+
+
+def test_get_returns_copy(fake_swaymsg):
+    path, _, _ = fake_swaymsg
+    topology = MonitorTopology(swaymsg_path=path)
+    topology.get()['monitors'].clear()
+    assert len(topology.get()['monitors']) == 1
+
+
+def test_missing_swaymsg_falls_back():
+    topology = MonitorTopology(swaymsg_path='/nonexistent/swaymsg')
+    info = topology.get()
+    assert info['monitors'][0]['name'] == 'default'
+    assert topology.start_watching() is False
+
+
+def test_watching_refreshes_from_events(fake_swaymsg):
+    path, outputs, call_count = fake_swaymsg
+    topology = MonitorTopology(ttl=0.01, swaymsg_path=path)
+    outputs.write_text(OUTPUTS.replace('2560', '1920'))
+
+    try:
+        assert topology.start_watching() is True
+        deadline = time.monotonic() + 5
+        while topology.generation == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert topology.watching
+
+        # While watching, reads are served from cache regardless of TTL
+        calls = call_count()
+        time.sleep(0.05)
+        assert topology.get()['monitors'][0]['width'] == 1920
+        assert call_count() == calls
+    finally:
+        topology.stop_watching()
+    assert not topology.watching
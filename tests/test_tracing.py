@@ -0,0 +1,96 @@
+"""Tests for opt-in tracing spans and histograms."""
+
+import json
+import time
+import pytest
+from stubs import make_fake_grim
+from screenclicker import tracing
+from screenclicker.ollama_client import OllamaClient
+from screenclicker.screen import GrimPipeBackend, screenshot_region, set_capture_backend
+
+
+@pytest.fixture
+def traced():
+    tracing.reset()
+    tracing.enable()
+    yield tracing
+    tracing.disable()
+    tracing.reset()
+
+
+def test_disabled_spans_are_shared_noops():
+    tracing.disable()
+    assert tracing.span('a') is tracing.span('b')
+    with tracing.span('a') as s:
+        s.set(x=1)
+    tracing.record('a', 1.0)
+    assert 'a' not in tracing.histograms()
+
+
+def test_histograms_and_chrome_trace(traced, tmp_path):
+    for seconds in [0.001] * 98 + [0.010, 0.100]:
+        tracing.record('step', seconds, frame=1)
+    with tracing.span('block') as s:
+        time.sleep(0.01)
+        s.set(extra=True)
+
+    h = tracing.histograms()
+    assert h['step']['count'] == 100
+    assert h['step']['p50_ms'] == pytest.approx(1.0)
+    assert h['step']['p99_ms'] == pytest.approx(10.0)
+    assert h['step']['max_ms'] == pytest.approx(100.0)
+    assert h['block']['p50_ms'] >= 9
+    assert 'block' in tracing.report()
+
+    path = tmp_path / 'trace.json'
+    tracing.export_chrome_trace(str(path))
+    events = json.loads(path.read_text())['traceEvents']
+    block = [e for e in events if e['name'] == 'block'][0]
+    assert block['ph'] == 'X' and block['dur'] >= 9000 and block['args'] == {'extra': True}
+
+
+def test_span_records_errors(traced):
+    with pytest.raises(ValueError):
+        with tracing.span('fails'):
+            raise ValueError
+    assert tracing.chrome_trace()['traceEvents'][0]['args'] == {'error': 'ValueError'}
+
+
+def test_chat_records_encode_request_and_server_timings(traced, ollama_stub):
+    OllamaClient(host=ollama_stub.url).chat("m", [{"role": "user", "content": "hi"}], images=[b'png'])
+    h = tracing.histograms()
+    for name in ('encode.base64', 'ollama.chat', 'ollama.server.total', 'ollama.server.load',
+                 'ollama.server.prompt_eval', 'ollama.server.eval'):
+        assert h[name]['count'] == 1, name
+    # Stub reports total_duration=1000ns
+    assert h['ollama.server.total']['p50_ms'] == pytest.approx(0.001)
+    server_event = [e for e in tracing.chrome_trace()['traceEvents'] if e['name'] == 'ollama.server.eval'][0]
+    assert server_event['args'] == {'prompt_eval_count': 5, 'eval_count': 3}
+
+
+def test_streamed_chat_span_covers_the_stream(traced, ollama_stub):
+    ollama_stub.chunk_latency = 0.02
+    client = OllamaClient(host=ollama_stub.url)
+    chunks = list(client.chat("m", [{"role": "user", "content": "hi"}], stream=True))
+    assert ''.join(c['message']['content'] for c in chunks) == "500,300"
+
+    stream = client.generate("m", "hi", stream=True)
+    next(stream)
+    stream.close()
+    h = tracing.histograms()
+    # Four content chunks plus the final one, 20 ms apart
+    assert h['ollama.chat']['p50_ms'] >= 80
+    assert h['ollama.generate']['count'] == 1
+    assert h['ollama.server.total']['count'] == 1  # From the chat's final chunk
+
+
+def test_capture_spans(traced, tmp_path):
+    grim = make_fake_grim(str(tmp_path), {'ppm': b'P6\n1 1\n255\n\x01\x02\x03'})
+    previous = set_capture_backend(GrimPipeBackend(grim))
+    try:
+        screenshot_region(0, 0, 1, 1, format='ppm')
+    finally:
+        set_capture_backend(previous)
+    h = tracing.histograms()
+    assert h['capture']['count'] == 1
+    assert h['capture.grim']['count'] == 1